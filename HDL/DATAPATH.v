@@ -1,4 +1,7 @@
-module DATAPATH (
+module DATAPATH #(
+    parameter integer UART_CLK_FREQ  = 100_000_000,   // Hz, uart_clk
+    parameter integer UART_BAUD_RATE = 9_600
+)(
     input clk,
     input reset,
     input        MemWrite,
@@ -82,7 +85,10 @@ wire [31:0] uart_read_data;
 wire uart_write_en = MemWrite && (ALUResult == 32'h00000400);
 wire uart_read_en  = !MemWrite && (ALUResult == 32'h00000404);
 
-UART_Peripheral uart (
+UART_Peripheral #(
+    .CLK_FREQ(UART_CLK_FREQ),
+    .BAUD_RATE(UART_BAUD_RATE)
+) uart (
     .clk(uart_clk),
     .rst(reset),
     .write_en(uart_write_en),
@@ -4,9 +4,18 @@ output [(BYTE_SIZE*8)-1:0] RD
 );
 
 reg [7:0] mem [255:0];
+localparam PATH_CHARS = 1024;
+reg [8*PATH_CHARS-1:0] program_file;
 
+// program image is a run-time choice (+PROGRAM=<file>), so one compiled
+// simulator can run any number of programs
 initial begin
-$readmemh("Instructions.hex", mem, 0); // You will need this for real tests
+if (!$value$plusargs("PROGRAM=%s", program_file))
+	program_file = "Instructions.hex";
+// a path that fills the whole register may have lost its leading characters
+if (program_file[8*PATH_CHARS-1 -: 8] != 0)
+	$fatal(1, "+PROGRAM path must be shorter than %0d characters", PATH_CHARS);
+$readmemh(program_file, mem, 0); // You will need this for real tests
 end
 genvar i;
 generate
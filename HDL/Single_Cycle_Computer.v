@@ -2,6 +2,11 @@
 //  Single-cycle RV32I computer – top level
 // ---------------------------------------------------------------------------
 module Single_Cycle_Computer
+#(
+    // UART timing; simulations override these (-P) to shorten frames
+    parameter integer UART_CLK_FREQ  = 100_000_000,
+    parameter integer UART_BAUD_RATE = 9_600
+)
 (
     input              clk,
     input              reset,
@@ -35,7 +40,10 @@ module Single_Cycle_Computer
     //-----------------------------------------------------------------------
     //  Datapath
     //-----------------------------------------------------------------------
-    DATAPATH datapath_i (
+    DATAPATH #(
+        .UART_CLK_FREQ(UART_CLK_FREQ),
+        .UART_BAUD_RATE(UART_BAUD_RATE)
+    ) datapath_i (
     .clk(clk),
     .reset(reset),
     .MemWrite(MemWrite),
@@ -111,7 +111,9 @@ module UART_Peripheral #(
                     if (rx_cnt == 4'd9) begin         // stop bit sampled
                         rx_active <= 1'b0;
                         if (!fifo_full && (rx_sync == 1'b1)) begin
-                            fifo[fifo_head] <= rx_shift[8:1];
+                            // start bit sits in [1], data in [9:2]: the stop
+                            // bit is only being shifted in on this edge
+                            fifo[fifo_head] <= rx_shift[9:2];
                             fifo_head  <= fifo_head + 1'b1;
                             fifo_count <= fifo_count + 1'b1;
                         end
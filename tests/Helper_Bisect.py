@@ -0,0 +1,332 @@
+"""
+First-divergence search between the DUT and the reference model
+===============================================================
+
+Input is a DUT trace with one ``(next PC, written register, value)`` record
+per cycle, either
+
+* a ``.rvgt`` file in the golden-trace format of ``Helper_Trace``
+  (``TB_DUT_TRACE=dut.rvgt make`` records the DUT side of a cocotb run), or
+* a VCD of the DUT: ``fetchPC`` and the register-file write port
+  (``write_enable``, ``A3``, ``WD3``) sampled at every falling clock edge
+  after reset – the core's registers (``Register_rsten_neg``) update on
+  ``negedge clk``.  Icarus FST dumps need converting first (``fst2vcd``).
+
+The search never single-steps the whole program:
+
+1. one pass over the DUT trace keeps its PC and registers every
+   ``interval`` cycles;
+2. the model runs at full speed (optionally block-translated) under a
+   ``Checkpointer`` with the same interval;
+3. the first checkpoint whose PC/registers differ from the DUT bounds the
+   divergence, and bisection inside that interval (restore + run per probe)
+   finds the first cycle whose state differs;
+4. only the window around that cycle is stepped and printed, model and DUT
+   side by side.
+
+The trace carries no memory, so PC and registers are all that is compared:
+a wrong store shows up at the first load that reads it back.  A divergence
+that heals again before the next checkpoint is not seen.
+
+Public API
+----------
+read_dut_trace(path, fmt)              -> [(next_pc, rd, value), ...]
+read_vcd(path, signals)                -> same, from a VCD
+DutState(records, interval)            -> DUT PC/registers at any cycle
+find_divergence(sim, records, …)       -> (Divergence | None, Checkpointer)
+format_window(cpr, records, div, …)    -> side-by-side listing around div
+main(argv)                             -> CLI, see ``python Helper_Bisect.py -h``
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from typing import NamedTuple
+
+from Helper_Checkpoint import Checkpointer
+from Helper_Decode import DECODED_FIELDS, format_instr
+from Helper_lib import read_file_to_list
+from Helper_ISS import RV32ISim
+from Helper_Trace import MAGIC, TraceReader, image_hash
+
+# role → VCD signal, matched against the end of the hierarchical name
+# (the shortest match wins, i.e. the one closest to the top level)
+VCD_SIGNALS = {
+    "clk":   "clk",
+    "reset": "reset",
+    "pc":    "fetchPC",
+    "we":    "RF.write_enable",
+    "rd":    "RF.A3",
+    "wd":    "RF.WD3",
+}
+
+_XZ = str.maketrans("xXzZ", "0000")
+
+
+# --------------------------------------------------------------------------- #
+#  DUT traces                                                                 #
+# --------------------------------------------------------------------------- #
+def read_vcd(path: str | os.PathLike, signals: dict[str, str] | None = None) -> list[tuple]:
+    """
+    One record per falling ``clk`` edge with ``reset`` low: the PC after the
+    edge, and the register written by it (``A3``/``WD3`` just before the
+    edge, when ``write_enable`` is set).  X/Z bits read as 0.
+    """
+    signals = {**VCD_SIGNALS, **(signals or {})}
+    with open(path, "r", encoding="ascii", errors="replace") as fh:
+        scope: list[str] = []
+        decls: list[tuple[str, str]] = []
+        for line in fh:
+            tok = line.split()
+            if not tok:
+                continue
+            if tok[0] == "$scope":
+                scope.append(tok[2])
+            elif tok[0] == "$upscope":
+                scope.pop()
+            elif tok[0] == "$var":
+                decls.append((".".join((*scope, tok[4])), tok[3]))
+            elif tok[0] == "$enddefinitions":
+                break
+
+        roles: dict[str, list[str]] = {}        # VCD id code → roles
+        for role, want in signals.items():
+            hits = sorted((len(name), name, code) for name, code in decls
+                          if name == want or name.endswith("." + want))
+            if not hits:
+                raise ValueError(f"{path}: no VCD signal matches {want!r} ({role})")
+            roles.setdefault(hits[0][2], []).append(role)
+
+        cur  = dict.fromkeys(signals, 0)
+        pre  = dict(cur)
+        recs = []
+
+        def edge() -> None:
+            if pre["clk"] and not cur["clk"] and not pre["reset"]:
+                rd = pre["rd"] & 0x1F if pre["we"] else 0
+                recs.append((cur["pc"] & 0xFFFF_FFFF, rd,
+                             pre["wd"] & 0xFFFF_FFFF if rd else 0))
+
+        for line in fh:
+            c = line[:1]
+            if c == "#":
+                edge()
+                pre = dict(cur)
+                continue
+            if c in "bB":
+                value, code = line[1:].split()
+            elif c in "01xXzZ":
+                value, code = c, line[1:].strip()
+            else:                               # $dumpvars, $end, reals, …
+                continue
+            for role in roles.get(code, ()):
+                cur[role] = int(value.translate(_XZ), 2)
+        edge()
+    return recs
+
+
+def _is_rvgt(path: str | os.PathLike) -> bool:
+    with open(path, "rb") as fh:
+        return fh.read(len(MAGIC)) == MAGIC
+
+
+def read_dut_trace(path: str | os.PathLike, fmt: str = "auto",
+                   signals: dict[str, str] | None = None) -> list[tuple]:
+    """Records from an ``.rvgt`` file or a VCD (*fmt*: auto, rvgt, vcd)."""
+    if fmt == "auto":
+        fmt = "rvgt" if _is_rvgt(path) else "vcd"
+    if fmt == "rvgt":
+        return list(TraceReader(path))
+    return read_vcd(path, signals)
+
+
+class DutState:
+    """DUT ``(pc, registers)`` after any cycle, from snapshots every *interval*."""
+
+    __slots__ = ("records", "interval", "_snaps")
+
+    def __init__(self, records: list[tuple], interval: int):
+        self.records  = records
+        self.interval = interval
+        pc, rf = 0, [0] * 32
+        self._snaps = [(pc, tuple(rf))]
+        for n, (pc, rd, val) in enumerate(records, 1):
+            if rd:
+                rf[rd] = val
+            if not n % interval:
+                self._snaps.append((pc, tuple(rf)))
+
+    def at(self, cycle: int) -> tuple[int, tuple[int, ...]]:
+        k = cycle // self.interval
+        pc, rf = self._snaps[k]
+        rf = list(rf)
+        for pc, rd, val in self.records[k * self.interval : cycle]:
+            if rd:
+                rf[rd] = val
+        return pc, tuple(rf)
+
+
+# --------------------------------------------------------------------------- #
+#  Search                                                                     #
+# --------------------------------------------------------------------------- #
+class Divergence(NamedTuple):
+    cycle:  int                 # first cycle whose resulting state differs
+    pc:     int                 # PC of the instruction executed in that cycle
+    model:  tuple | None        # (pc, rf) after the cycle, None: model halted
+    dut:    tuple               # same for the DUT
+    reason: str
+
+
+def _state(sim) -> tuple[int, tuple[int, ...]]:
+    return sim.pc, tuple(sim.rf)
+
+
+def find_divergence(sim: RV32ISim, records: list[tuple], interval: int = 1000,
+                    engine=None, max_steps: int | None = None):
+    """
+    Run *sim* against the DUT *records*; return ``(Divergence or None,
+    Checkpointer)``.  The checkpointer is left holding the run's checkpoints
+    for :func:`format_window`.  A DUT trace that ends while the model is
+    still running is not a divergence (the test may have stopped early).
+    """
+    dut = DutState(records, interval)
+    cpr = Checkpointer(sim, interval)
+    limit = len(records) if max_steps is None else min(max_steps, len(records))
+    cpr.run(limit, engine)
+    end = sim.retired
+
+    bad = next((cp for cp in cpr.checkpoints
+                if (cp.pc, cp.rf) != dut.at(cp.retired)), None)
+    if bad is None:
+        if end < limit:                         # only a halt stops run() early
+            return Divergence(end + 1, sim.pc, None, dut.at(end + 1),
+                              "model halted, DUT trace continues"), cpr
+        return None, cpr
+
+    # bisect (lo, hi]: state matches after lo cycles, differs after hi
+    lo, hi = cpr.before(bad.retired - 1).retired, bad.retired
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        cpr.seek(mid, engine)
+        if _state(sim) == dut.at(mid):
+            cpr.take()                          # later probes start from here
+            lo = mid
+        else:
+            hi = mid
+    cpr.seek(lo, engine)
+    pc = sim.pc
+    cpr.seek(hi, engine)
+    return Divergence(hi, pc, _state(sim), dut.at(hi), "state differs"), cpr
+
+
+# --------------------------------------------------------------------------- #
+#  Report                                                                     #
+# --------------------------------------------------------------------------- #
+def _disasm(sim, pc: int) -> str:
+    idx = pc >> 2
+    if idx >= len(sim.decoded):
+        return "(outside the image)"
+    ins = sim.decoded[idx]
+    return format_instr(*(getattr(ins, name) for name, _ in DECODED_FIELDS))
+
+
+def _rec(rec) -> str:
+    if rec is None:
+        return "-"
+    pc, rd, val = rec
+    return f"->0x{pc:08X} " + (f"x{rd:02d}={val:08x}" if rd else "-" * 12)
+
+
+def format_window(cpr: Checkpointer, records: list[tuple], div: Divergence,
+                  window: int = 8) -> str:
+    """Cycles ``div.cycle ± window``: model instruction, model and DUT records."""
+    sim   = cpr.sim
+    first = max(1, div.cycle - window)
+    rows  = [f"first divergence at cycle {div.cycle} (PC 0x{div.pc:08X}): {div.reason}"]
+    if div.model is not None and div.dut is not None:
+        if div.model[0] != div.dut[0]:
+            rows.append(f"  pc   model=0x{div.model[0]:08X}  dut=0x{div.dut[0]:08X}")
+        rows += [f"  x{i:02d}  model=0x{m:08X}  dut=0x{d:08X}"
+                 for i, (m, d) in enumerate(zip(div.model[1], div.dut[1])) if m != d]
+    rows.append("")
+
+    cpr.seek(first - 1)
+    rf = sim.rf
+    for cycle in range(first, div.cycle + window + 1):
+        dut = records[cycle - 1] if cycle <= len(records) else None
+        if sim.halted():
+            model, text = None, "(halted)"
+        else:
+            pc   = sim.pc
+            rd   = sim.written[pc >> 2]
+            text = f"0x{pc:08X}  {_disasm(sim, pc)}"
+            try:
+                sim.step()
+            except (AssertionError, ValueError) as exc:
+                rows.append(f"   [{cycle:8d}] {text:38}  model stops: {exc}")
+                break
+            model = (sim.pc, rd, rf[rd])
+        if model is None and dut is None:
+            break
+        mark = ">>" if cycle == div.cycle else " !" if model != dut else "  "
+        rows.append(f"{mark} [{cycle:8d}] {text:38}  model {_rec(model):27}  dut {_rec(dut)}")
+    return "\n".join(rows)
+
+
+# --------------------------------------------------------------------------- #
+#  CLI                                                                        #
+# --------------------------------------------------------------------------- #
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(
+        description="Find the first cycle where a DUT trace leaves the reference model.")
+    ap.add_argument("hex", help="instruction image the DUT ran")
+    ap.add_argument("trace", help="DUT trace: .rvgt (TB_DUT_TRACE) or VCD")
+    ap.add_argument("--format", choices=("auto", "rvgt", "vcd"), default="auto")
+    ap.add_argument("--signal", metavar="ROLE=NAME", action="append", default=[],
+                    help=f"VCD signal for a role ({', '.join(VCD_SIGNALS)}), repeatable")
+    ap.add_argument("--interval", type=int, default=1000,
+                    help="cycles between checkpoints (default: %(default)s)")
+    ap.add_argument("--window", type=int, default=8,
+                    help="cycles shown before/after the divergence")
+    ap.add_argument("--mem-size", type=int, default=RV32ISim.MEM_SIZE)
+    ap.add_argument("--jit", action="store_true",
+                    help="run the model block-translated (see Helper_JIT)")
+    args = ap.parse_args(argv)
+
+    hex_lines = read_file_to_list(args.hex)
+    fmt = args.format
+    if fmt == "auto":
+        fmt = "rvgt" if _is_rvgt(args.trace) else "vcd"
+    if fmt == "rvgt" and TraceReader(args.trace).digest != image_hash(hex_lines):
+        ap.error(f"{args.trace} was recorded for a different program")
+    signals = dict(s.split("=", 1) for s in args.signal)
+
+    t0 = time.perf_counter()
+    records = read_dut_trace(args.trace, fmt, signals)
+
+    sim = RV32ISim(hex_lines, args.mem_size)
+    engine = None
+    if args.jit:
+        from Helper_JIT import BlockJIT
+        engine = BlockJIT(sim)
+    div, cpr = find_divergence(sim, records, args.interval, engine)
+    dt = time.perf_counter() - t0
+
+    print(f"{len(records)} DUT cycles, {len(cpr.checkpoints)} checkpoints "
+          f"({cpr.footprint() / 1024:.1f} KiB of pages), {dt:.2f}s")
+    if div is None:
+        print("no divergence: the DUT matches the model on every cycle")
+        if not sim.halted():
+            print(f"(the DUT trace ends at cycle {len(records)}, the model has not halted)")
+        return 0
+    print(format_window(cpr, records, div, args.window))
+    return 1
+
+
+if __name__ == "__main__":
+    # same module identity for the handlers as Helper_ISS.__main__ (JIT)
+    from Helper_Bisect import main as _main
+    sys.exit(_main())
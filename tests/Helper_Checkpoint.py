@@ -0,0 +1,152 @@
+"""
+Checkpoints of the reference model
+==================================
+
+A checkpoint is the model's architectural state after ``retired``
+instructions: PC, the 32 registers, the MMIO counters, the state of every
+device on the bus (``Device.snapshot``: UART FIFO, ``read_data``, TX log,
+RX input position) and data memory cut into fixed-size pages.  Memory is kept
+copy-on-write: a new checkpoint compares every page with the previous one
+and copies only the pages that changed, unchanged pages are the very same
+``bytes`` object in both.  Checkpointing a long run every few thousand
+cycles therefore costs a few dirty pages per checkpoint, not one memory
+image each.
+
+:meth:`Checkpointer.restore` writes the state back *in place* (``sim.rf``,
+``sim.mem``), so translations in ``sim.jit_cache`` that hold on to them stay
+valid.  A UART fed from a pipe or terminal cannot rewind its input: once
+the program has read from it, restoring an earlier checkpoint raises
+``ValueError``, and the run has to be replayed from cycle 0.
+
+Public API
+----------
+Checkpoint                             -> NamedTuple (retired, pc, rf, pages, …)
+Checkpointer(sim, interval, page_size) -> checkpoint store bound to one RV32ISim
+Checkpointer.take()                    -> checkpoint of the current state
+Checkpointer.run(max_steps, engine)    -> run, checkpointing every interval
+Checkpointer.restore(cp)               -> put the model back into cp's state
+Checkpointer.seek(cycle, engine)       -> restore + run up to *cycle*
+Checkpointer.before(cycle)             -> latest checkpoint at or before cycle
+Checkpointer.footprint()               -> bytes of page data held
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from typing import NamedTuple
+
+
+class Checkpoint(NamedTuple):
+    retired:     int
+    pc:          int
+    rf:          tuple[int, ...]
+    pages:       dict[int, bytes]      # page address → contents
+    devices:     tuple                 # Device.snapshot() per bus device
+    mmio_reads:  int
+    mmio_writes: int
+
+
+class Checkpointer:
+    """Checkpoints of *sim* sorted by ``retired``; one every *interval* in :meth:`run`."""
+
+    __slots__ = ("sim", "interval", "page_size", "checkpoints", "_cycles", "_last")
+
+    def __init__(self, sim, interval: int = 1000, page_size: int = 256):
+        if interval <= 0 or page_size <= 0:
+            raise ValueError("interval and page_size must be positive")
+        self.sim         = sim
+        self.interval    = interval
+        self.page_size   = page_size
+        self.checkpoints: list[Checkpoint] = []
+        self._cycles:     list[int] = []
+        self._last:       dict[int, bytes] = {}     # pages of the latest take()
+
+    # ------------- memory pages ----------------------------------------- #
+    def _pages(self):
+        """``(address, writable view)`` of every page-sized piece of memory."""
+        ps = self.page_size
+        for base, region in self.sim.mem.regions():
+            view = memoryview(region)
+            for off in range(0, len(view), ps):
+                yield base + off, view[off:off + ps]
+
+    # ------------- take / restore --------------------------------------- #
+    def take(self) -> Checkpoint:
+        """Checkpoint the current state (replacing one at the same cycle)."""
+        sim, last = self.sim, self._last
+        pages = {}
+        for addr, view in self._pages():
+            old = last.get(addr)
+            pages[addr] = old if old is not None and old == view else bytes(view)
+        self._last = pages
+        cp = Checkpoint(sim.retired, sim.pc, tuple(sim.rf), pages,
+                        tuple(dev.snapshot() for dev in sim.bus.devices),
+                        sim.mmio_reads, sim.mmio_writes)
+        i = bisect_right(self._cycles, cp.retired)
+        if i and self._cycles[i - 1] == cp.retired:
+            self.checkpoints[i - 1] = cp
+        else:
+            self._cycles.insert(i, cp.retired)
+            self.checkpoints.insert(i, cp)
+        return cp
+
+    def restore(self, cp: Checkpoint) -> None:
+        sim = self.sim
+        # devices first: an RX source that cannot rewind raises before registers
+        # and memory change
+        for dev, state in zip(sim.bus.devices, cp.devices):
+            dev.restore(state)
+        seen = set()
+        for addr, view in self._pages():
+            seen.add(addr)
+            data = cp.pages.get(addr)
+            if data is None:                    # page first touched after cp
+                data = bytes(len(view))
+            if view != data:
+                view[:] = data
+        for addr in cp.pages.keys() - seen:     # memory object lost the page
+            sim.mem.write_bytes(addr, cp.pages[addr])
+        sim.rf[:]   = cp.rf
+        sim.pc      = cp.pc
+        sim.retired = cp.retired
+        sim.mmio_reads, sim.mmio_writes = cp.mmio_reads, cp.mmio_writes
+        self._last = cp.pages
+
+    def before(self, cycle: int) -> Checkpoint:
+        i = bisect_right(self._cycles, cycle)
+        if not i:
+            raise LookupError(f"no checkpoint at or before cycle {cycle}")
+        return self.checkpoints[i - 1]
+
+    # ------------- running ---------------------------------------------- #
+    def run(self, max_steps: int | None = None, engine=None) -> int:
+        """
+        Run *engine* (default: the model itself, e.g. a ``BlockJIT``) and take
+        a checkpoint at the start, at every multiple of ``interval`` and at
+        the end.  Returns the steps taken.
+        """
+        sim    = self.sim
+        engine = sim if engine is None else engine
+        if not self._cycles or self._cycles[-1] != sim.retired:
+            self.take()
+        steps = 0
+        while steps != max_steps and not sim.halted():
+            n = self.interval - sim.retired % self.interval
+            if max_steps is not None:
+                n = min(n, max_steps - steps)
+            steps += engine.run(n)
+            self.take()
+        return steps
+
+    def seek(self, cycle: int, engine=None) -> None:
+        """Restore the nearest checkpoint and run forward to *cycle*."""
+        cp = self.before(cycle)
+        self.restore(cp)
+        engine = self.sim if engine is None else engine
+        if cycle > cp.retired:
+            engine.run(cycle - cp.retired)
+
+    def footprint(self) -> int:
+        """Bytes of page data over all checkpoints, shared pages counted once."""
+        unique = {id(p): len(p) for cp in self.checkpoints for p in cp.pages.values()}
+        return sum(unique.values())
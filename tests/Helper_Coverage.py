@@ -0,0 +1,253 @@
+"""
+Functional ISA coverage for the reference model
+===============================================
+
+The bin space is fixed (``ALL_BINS``) so coverage from different runs can be
+merged by plain addition:
+
+    op:<mnemonic>                 every RV32I instruction of the project + NOT
+    imm:<mnemonic>:neg|zero|pos   sign of the immediate (branches/JAL: neg|pos)
+    shamt:<mnemonic>:0|mid|31     shift amount, register shifts use rs2's value
+    br:<mnemonic>:taken|not_taken branch outcome
+
+Sampling is cheap: per-PC static bins (opcode, immediate, immediate shifts)
+are computed once per image and only the PC hit is counted per cycle; the
+register-shift amount and the branch outcome are the only per-cycle work.
+
+The database is one small JSON file: bin → hit count, plus a bitmask of the
+bins each program hit.  The report picks a greedy set cover over those masks
+and lists the programs outside it as redundant.  Merges take an exclusive
+``flock`` on ``<db>.lock`` and replace the file atomically, so parallel
+regression jobs can all merge into the same path.
+
+Public API
+----------
+ALL_BINS                               -> every bin name, in database order
+Coverage(sim)                          -> collector for one RV32ISim image
+Coverage.sample(pc, next_pc, rs2_val)  -> record one retired instruction
+Coverage.collect(max_steps)            -> run the model to the end, sampling
+Coverage.bins()                        -> Counter of hit bins
+merge(db_path, bins, program)          -> add one run to the database
+report(db_path)                        -> coverage summary, uncovered bins,
+                                          redundant programs
+main(argv)                             -> CLI, see ``python Helper_Coverage.py -h``
+"""
+
+from __future__ import annotations
+
+import argparse
+import fcntl
+import hashlib
+import json
+import os
+import sys
+from collections import Counter
+from pathlib import Path
+
+from Helper_Decode import DECODED_FIELDS, format_instr
+from Helper_lib import read_file_to_list
+from Helper_ISS import RV32ISim
+
+VERSION = 1
+
+_ALU_R   = ("add", "sub", "sll", "slt", "sltu", "xor", "srl", "sra", "or", "and", "not")
+_ALU_I   = ("addi", "slti", "sltiu", "xori", "ori", "andi", "slli", "srli", "srai")
+_LOADS   = ("lb", "lh", "lw", "lbu", "lhu")
+_STORES  = ("sb", "sh", "sw")
+_BRANCH  = ("beq", "bne", "blt", "bge", "bltu", "bgeu")
+_JUMPS   = ("jal", "jalr")
+_UPPER   = ("lui", "auipc")
+_SHIFT_R = ("sll", "srl", "sra")
+_SHIFT_I = ("slli", "srli", "srai")
+_SIGNED_IMM = ("addi", "slti", "sltiu", "xori", "ori", "andi",
+               *_LOADS, *_STORES, "jalr")
+
+
+def _space() -> tuple[str, ...]:
+    bins = [f"op:{m}" for m in (*_ALU_R, *_ALU_I, *_LOADS, *_STORES,
+                                *_BRANCH, *_JUMPS, *_UPPER)]
+    bins += [f"imm:{m}:{s}" for m in _SIGNED_IMM for s in ("neg", "zero", "pos")]
+    bins += [f"imm:{m}:{s}" for m in (*_BRANCH, "jal") for s in ("neg", "pos")]
+    bins += [f"shamt:{m}:{s}" for m in (*_SHIFT_R, *_SHIFT_I) for s in ("0", "mid", "31")]
+    bins += [f"br:{m}:{s}" for m in _BRANCH for s in ("taken", "not_taken")]
+    return tuple(bins)
+
+
+ALL_BINS   = _space()
+_INDEX     = {name: i for i, name in enumerate(ALL_BINS)}
+SPACE_HASH = hashlib.sha256("\n".join(ALL_BINS).encode()).hexdigest()[:16]
+
+
+def _sign(v: int) -> str:
+    return "neg" if v < 0 else "zero" if v == 0 else "pos"
+
+
+def _shamt(v: int) -> str:
+    v &= 0x1F
+    return "0" if v == 0 else "31" if v == 31 else "mid"
+
+
+def _mnemonic(ins) -> str:
+    return format_instr(*(getattr(ins, name) for name, _ in DECODED_FIELDS)).split()[0]
+
+
+# --------------------------------------------------------------------------- #
+#  Collector                                                                  #
+# --------------------------------------------------------------------------- #
+class Coverage:
+    """Per-PC hit counts plus the two dynamic bin families."""
+
+    __slots__ = ("sim", "hits", "dynamic", "_static", "_reg_shift", "_branch")
+
+    def __init__(self, sim: RV32ISim):
+        self.sim = sim
+        self.reset()
+
+    def reset(self) -> None:
+        """Zero the counters and re-derive the static bins of the current image."""
+        self.dynamic: Counter[str] = Counter()
+        self._static:    list[tuple[str, ...]] = []
+        self._reg_shift: dict[int, str] = {}
+        self._branch:    dict[int, str] = {}
+        for idx, ins in enumerate(self.sim.decoded):
+            m = _mnemonic(ins)
+            if m == ".word":
+                self._static.append(())
+                continue
+            static = [f"op:{m}"]
+            if m in _SIGNED_IMM or m == "jal" or m in _BRANCH:
+                static.append(f"imm:{m}:{_sign(ins.imm)}")
+            if m in _SHIFT_I:
+                static.append(f"shamt:{m}:{_shamt(ins.rs2)}")
+            elif m in _SHIFT_R:
+                self._reg_shift[idx] = m
+            if m in _BRANCH:
+                self._branch[idx] = m
+            self._static.append(tuple(b for b in static if b in _INDEX))
+        self.hits = [0] * len(self._static)
+
+    def sample(self, pc: int, next_pc: int, rs2_val: int = 0) -> None:
+        """*rs2_val*: value of rs2 *before* the instruction executed."""
+        idx = pc >> 2
+        self.hits[idx] += 1
+        if idx in self._reg_shift:
+            self.dynamic[f"shamt:{self._reg_shift[idx]}:{_shamt(rs2_val)}"] += 1
+        elif idx in self._branch:
+            outcome = "not_taken" if next_pc == pc + 4 else "taken"
+            self.dynamic[f"br:{self._branch[idx]}:{outcome}"] += 1
+
+    def collect(self, max_steps: int | None = None) -> int:
+        """Step the model to completion, sampling every instruction."""
+        sim, rf = self.sim, self.sim.rf
+        budget = -1 if max_steps is None else max_steps
+        steps  = 0
+        try:
+            while steps != budget and not sim.halted():
+                pc  = sim.pc
+                rs2 = rf[sim.decoded[pc >> 2].rs2]
+                sim.step()
+                self.sample(pc, sim.pc, rs2)
+                steps += 1
+        finally:
+            sim.bus.flush()
+        return steps
+
+    def bins(self) -> Counter[str]:
+        out = Counter(self.dynamic)
+        for n, static in zip(self.hits, self._static):
+            if n:
+                for b in static:
+                    out[b] += n
+        return out
+
+
+# --------------------------------------------------------------------------- #
+#  Database                                                                   #
+# --------------------------------------------------------------------------- #
+def _empty_db() -> dict:
+    return {"version": VERSION, "space": SPACE_HASH, "runs": 0,
+            "bins": {}, "programs": {}}
+
+
+def _load(path: Path) -> dict:
+    if not path.exists() or not path.stat().st_size:
+        return _empty_db()
+    db = json.loads(path.read_text())
+    if db.get("version") != VERSION or db.get("space") != SPACE_HASH:
+        raise ValueError(f"{path}: coverage database from a different bin space")
+    return db
+
+
+def _mask(bins) -> int:
+    return sum(1 << _INDEX[b] for b in bins if b in _INDEX)
+
+
+def merge(db_path: str | os.PathLike, bins: Counter[str], program: str | None = None) -> None:
+    """Add *bins* (one run) to the database at *db_path*, creating it if needed."""
+    path = Path(db_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_name(path.name + ".lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)           # released when the file closes
+        db = _load(path)
+        db["runs"] += 1
+        for name, n in bins.items():
+            db["bins"][name] = db["bins"].get(name, 0) + n
+        if program is not None:
+            old = int(db["programs"].get(program, "0"), 16)
+            db["programs"][program] = f"{old | _mask(bins):x}"
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(db, separators=(",", ":"), sort_keys=True))
+        os.replace(tmp, path)
+
+
+def report(db_path: str | os.PathLike) -> str:
+    db      = _load(Path(db_path))
+    hit     = {b for b, n in db["bins"].items() if n}
+    missing = [b for b in ALL_BINS if b not in hit]
+    rows = [f"coverage: {len(hit)}/{len(ALL_BINS)} bins "
+            f"({100 * len(hit) / len(ALL_BINS):.1f}%) over {db['runs']} runs"]
+    if missing:
+        rows.append("uncovered:")
+        groups: dict[str, list[str]] = {}
+        for b in missing:
+            kind, rest = b.split(":", 1)
+            groups.setdefault(kind, []).append(rest)
+        rows += [f"  {kind:6} " + "  ".join(names) for kind, names in groups.items()]
+
+    # greedy set cover: programs outside it add no bin the others miss
+    masks = {p: int(m, 16) for p, m in db["programs"].items()}
+    if len(masks) > 1:
+        covered, keep = 0, set()
+        while True:
+            best = max(masks, key=lambda p: (bin(masks[p] & ~covered).count("1"), p))
+            if not masks[best] & ~covered:
+                break
+            covered |= masks[best]
+            keep.add(best)
+        redundant = sorted(set(masks) - keep)
+        rows.append(f"programs not needed for this coverage: {len(redundant)}/{len(masks)}")
+        rows += [f"  {p}" for p in redundant]
+    return "\n".join(rows)
+
+
+# --------------------------------------------------------------------------- #
+#  CLI                                                                        #
+# --------------------------------------------------------------------------- #
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(
+        description="Collect ISA coverage with the reference model and report it.")
+    ap.add_argument("programs", nargs="*", help="hex images to run and merge")
+    ap.add_argument("--db", default="coverage.json", help="coverage database")
+    ap.add_argument("--max-steps", type=int, default=None)
+    args = ap.parse_args(argv)
+
+    for prog in args.programs:
+        cov = Coverage(RV32ISim(read_file_to_list(prog)))
+        cov.collect(args.max_steps)
+        merge(args.db, cov.bins(), Path(prog).name)
+    print(report(args.db))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+Vectorised whole-image decoder and disassembler
+===============================================
+
+``RISCVInstruction`` decodes one word at a time; this module decodes an entire
+hex image in a handful of NumPy array operations.  The result is a structured
+array with one record per word and the same fields as ``RISCVInstruction``
+(``word, opcode, rd, rs1, rs2, funct3, funct7, imm_i, imm_s, imm_b, imm_u,
+imm_j``), so static analysis and coverage tools can work on columns instead
+of Python objects.
+
+Images are parsed straight from the file bytes: whitespace is dropped, the
+remaining hex digits are converted through a lookup table and every eight
+digits form one word.  ``byteorder="auto"`` picks the interpretation in which
+more words carry a known opcode, so both ``Instructions.hex`` (little-endian
+lines, the project's format) and compact big-endian dumps are accepted.
+
+NumPy is optional for the rest of the test-bench; only this module needs it.
+
+Public API
+----------
+parse_hex(data, byteorder)             -> uint32 array of instruction words
+load_hex(path, byteorder)              -> same, from a file
+decode_words(words)                    -> structured array (DECODED_DTYPE)
+disassemble(decoded, base)             -> ["_XX: mnemonic operands", ...]
+format_instr(word, opcode, ...)        -> one disassembled instruction
+main(argv)                             -> CLI, see ``python Helper_Decode.py -h``
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+
+try:
+    import numpy as np
+except ImportError:                        # pragma: no cover - optional dependency
+    np = None
+
+DECODED_FIELDS = (
+    ("word",   "<u4"), ("opcode", "u1"), ("rd",     "u1"), ("rs1",   "u1"),
+    ("rs2",    "u1"),  ("funct3", "u1"), ("funct7", "u1"),
+    ("imm_i",  "<i4"), ("imm_s",  "<i4"), ("imm_b", "<i4"),
+    ("imm_u",  "<u4"), ("imm_j",  "<i4"),
+)
+DECODED_DTYPE = None if np is None else np.dtype(list(DECODED_FIELDS))
+
+_KNOWN_OPCODES = (0x33, 0x13, 0x03, 0x23, 0x63, 0x6F, 0x67, 0x17, 0x37)
+
+if np is not None:
+    # ASCII → nibble value; 0xFE for separators, 0xFF for anything else
+    _NIBBLE = np.full(256, 0xFF, dtype=np.uint8)
+    _NIBBLE[list(b" \t\r\n")] = 0xFE
+    for _i, _c in enumerate(b"0123456789abcdef"):
+        _NIBBLE[_c] = _i
+    for _i, _c in enumerate(b"ABCDEF", 10):
+        _NIBBLE[_c] = _i
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("Helper_Decode needs NumPy (pip install numpy)")
+
+
+# --------------------------------------------------------------------------- #
+#  Parsing                                                                    #
+# --------------------------------------------------------------------------- #
+def _known(words) -> int:
+    return int(np.isin(words & 0x7F, _KNOWN_OPCODES).sum())
+
+
+def parse_hex(data: bytes | str, byteorder: str = "little"):
+    """
+    Words of a hex image.  *byteorder* is how the bytes of each line are
+    written: ``"little"`` (``93 0F 20 43``), ``"big"`` (``43200F93``) or
+    ``"auto"``.  Every word must be eight hex digits; separators are free.
+    """
+    _require_numpy()
+    if isinstance(data, str):
+        data = data.encode("ascii")
+    raw = np.frombuffer(data, dtype=np.uint8)
+    nib = _NIBBLE[raw]
+    bad = np.flatnonzero(nib == 0xFF)
+    if bad.size:
+        raise ValueError(f"not a hex image: unexpected character {chr(raw[bad[0]])!r}")
+    nib = nib[nib < 16]
+    if nib.size % 8:
+        raise ValueError(f"not a hex image: {nib.size} digits is not a whole number of words")
+    octets = (nib[0::2] << 4) | nib[1::2]
+    little = octets.view("<u4")
+    if byteorder == "auto":
+        big = octets.view(">u4")
+        byteorder = "big" if _known(big) > _known(little) else "little"
+    words = octets.view("<u4" if byteorder == "little" else ">u4")
+    return words.astype(np.uint32)
+
+
+def load_hex(path: str | os.PathLike, byteorder: str = "little"):
+    with open(path, "rb") as fh:
+        return parse_hex(fh.read(), byteorder)
+
+
+# --------------------------------------------------------------------------- #
+#  Decoding                                                                   #
+# --------------------------------------------------------------------------- #
+def _sign_extend(value, bits: int):
+    sign = np.int32(1 << (bits - 1))
+    return (value.astype(np.int32) ^ sign) - sign
+
+
+def decode_words(words):
+    """One structured record per word, fields as in ``RISCVInstruction``."""
+    _require_numpy()
+    w = np.asarray(words, dtype=np.uint32)
+    out = np.empty(w.shape, dtype=DECODED_DTYPE)
+    out["word"]   = w
+    out["opcode"] =  w        & 0x7F
+    out["rd"]     = (w >>  7) & 0x1F
+    out["funct3"] = (w >> 12) & 0x07
+    out["rs1"]    = (w >> 15) & 0x1F
+    out["rs2"]    = (w >> 20) & 0x1F
+    out["funct7"] = (w >> 25) & 0x7F
+
+    out["imm_i"] = _sign_extend(w >> 20, 12)
+    out["imm_s"] = _sign_extend(((w >> 7) & 0x1F) | ((w >> 20) & 0xFE0), 12)
+    out["imm_b"] = _sign_extend(((w >> 7) & 0x1E)  | ((w >> 20) & 0x7E0)
+                                | ((w << 4) & 0x800) | ((w >> 19) & 0x1000), 13)
+    out["imm_u"] = w & 0xFFFFF000
+    out["imm_j"] = _sign_extend(((w >> 20) & 0x7FE) | ((w >> 9) & 0x800)
+                                | (w & 0xFF000)     | ((w >> 11) & 0x100000), 21)
+    return out
+
+
+# --------------------------------------------------------------------------- #
+#  Disassembly                                                                #
+# --------------------------------------------------------------------------- #
+_R_NAMES = {
+    (0x0, 0x00): "add", (0x0, 0x20): "sub", (0x1, 0x20): "not",
+    (0x5, 0x00): "srl", (0x5, 0x20): "sra",
+}
+_R_ANY   = {0x1: "sll", 0x2: "slt", 0x3: "sltu", 0x4: "xor", 0x6: "or", 0x7: "and"}
+_I_NAMES = {0x0: "addi", 0x2: "slti", 0x3: "sltiu", 0x4: "xori", 0x6: "ori",
+            0x7: "andi", 0x1: "slli"}
+_LOADS   = {0x0: "lb", 0x1: "lh", 0x2: "lw", 0x4: "lbu", 0x5: "lhu"}
+_STORES  = {0x0: "sb", 0x1: "sh", 0x2: "sw"}
+_BRANCH  = {0x0: "beq", 0x1: "bne", 0x4: "blt", 0x5: "bge", 0x6: "bltu", 0x7: "bgeu"}
+
+
+def format_instr(word, opcode, rd, rs1, rs2, funct3, funct7,
+                 imm_i, imm_s, imm_b, imm_u, imm_j) -> str:
+    """Assembly text for one decoded word (``.word`` when it is not RV32I)."""
+    op = lambda m, args: f"{m:<7} {args}"
+    if opcode == 0x33:
+        name = _R_NAMES.get((funct3, funct7)) or _R_ANY.get(funct3)
+        if name == "not":
+            return op(name, f"x{rd}, x{rs1}")
+        if name:
+            return op(name, f"x{rd}, x{rs1}, x{rs2}")
+    elif opcode == 0x13:
+        if funct3 == 0x5:
+            return op("srli" if funct7 == 0 else "srai", f"x{rd}, x{rs1}, {rs2}")
+        name = _I_NAMES[funct3]
+        return op(name, f"x{rd}, x{rs1}, {rs2 if funct3 == 0x1 else imm_i}")
+    elif opcode == 0x03 and funct3 in _LOADS:
+        return op(_LOADS[funct3], f"x{rd}, {imm_i}(x{rs1})")
+    elif opcode == 0x23 and funct3 in _STORES:
+        return op(_STORES[funct3], f"x{rs2}, {imm_s}(x{rs1})")
+    elif opcode == 0x63 and funct3 in _BRANCH:
+        return op(_BRANCH[funct3], f"x{rs1}, x{rs2}, {imm_b}")
+    elif opcode == 0x6F:
+        return op("jal", f"x{rd}, {imm_j}")
+    elif opcode == 0x67:
+        return op("jalr", f"x{rd}, {imm_i}(x{rs1})")
+    elif opcode == 0x37:
+        return op("lui", f"x{rd}, 0x{imm_u >> 12:X}")
+    elif opcode == 0x17:
+        return op("auipc", f"x{rd}, 0x{imm_u >> 12:X}")
+    return op(".word", f"0x{word:08X}")
+
+
+def disassemble(decoded, base: int = 0) -> list[str]:
+    """``_XX: ...`` lines in the style of ``instructions.s``."""
+    columns = [decoded[name].tolist() for name, _ in DECODED_FIELDS]
+    return [f"_{base + 4 * i:02X}: {format_instr(*fields)}"
+            for i, fields in enumerate(zip(*columns))]
+
+
+# --------------------------------------------------------------------------- #
+#  CLI                                                                        #
+# --------------------------------------------------------------------------- #
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Disassemble a hex instruction image.")
+    ap.add_argument("hex", nargs="?", default="Instructions.hex")
+    ap.add_argument("--byteorder", choices=("little", "big", "auto"), default="little",
+                    help="byte order of each line (default: %(default)s)")
+    ap.add_argument("--base", type=lambda s: int(s, 0), default=0,
+                    help="address of the first word")
+    ap.add_argument("--keep-padding", action="store_true",
+                    help="also list the trailing all-zero words")
+    args = ap.parse_args(argv)
+
+    words = load_hex(args.hex, args.byteorder)
+    if not args.keep_padding:
+        nz = np.flatnonzero(words)
+        words = words[: nz[-1] + 2 if nz.size else 0]   # keep the halting word
+    for line in disassemble(decode_words(words), args.base):
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
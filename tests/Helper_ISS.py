@@ -0,0 +1,513 @@
+"""
+Stand-alone RV32I instruction-set simulator
+===========================================
+
+The reference model used by ``tbdeneme.TB`` – minus cocotb.  It runs an
+``Instructions.hex`` image in plain Python so golden results can be produced
+offline and the Icarus run only has to be compared against them.
+
+Public API
+----------
+RV32ISim(instr_hex, mem_size, mem, bus) -> simulator (rf, pc, mem, bus, retired,
+                                          mmio_reads, mmio_writes)
+RV32ISim.step()                        -> execute one instruction
+RV32ISim.run(max_steps)                -> run until the zero word / budget
+resolve_op(instr)                      -> (handler, rd, rs1, rs2, imm) tuple
+written_reg(instr)                     -> destination register or 0
+main(argv)                             -> CLI, see ``python Helper_ISS.py -h``
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+from Helper_lib import (
+    ByteAddressableMemory,
+    RISCVInstruction,
+    SparseMemory,
+    decode_image,
+    image_words,
+    is_signed,
+    sra,
+    read_file_to_list,
+)
+from Helper_MMIO import DeviceBus, UARTDevice
+from Helper_Profile import Profile
+
+
+class RV32ISim:
+    """Architectural state plus an interpreter for the project's RV32I subset."""
+
+    MEM_SIZE  = 1024           # bytes, matches ``Memory.v`` DEPTH
+    UART_BASE = 0x0000_0400    # +0 store → TX byte, +4 load → pop RX FIFO
+    UART_TX   = UART_BASE
+    UART_RX   = UART_BASE + 4
+
+    def __init__(self, instr_hex: list[str], mem_size: int = MEM_SIZE,
+                 mem=None, bus: DeviceBus | None = None):
+        self.rf         = [0] * 32
+        self.pc         = 0
+        self.mem_size   = mem_size
+        # any object with the ByteAddressableMemory API, e.g. SparseMemory
+        self.mem        = ByteAddressableMemory(mem_size) if mem is None else mem
+        self.retired    = 0
+        self.mmio_reads = self.mmio_writes = 0
+        # memory-mapped devices; by default just the UART at UART_BASE
+        if bus is None:
+            bus = DeviceBus()
+            bus.register(UARTDevice(), self.UART_BASE)
+        self.bus        = bus
+        self.io         = bus.map
+        self.load_program(instr_hex)
+
+    @property
+    def uart(self) -> UARTDevice | None:
+        return self.bus.find(UARTDevice)
+
+    @property
+    def uart_tx(self) -> bytearray:
+        """Every byte the program has written to the UART."""
+        return self.uart.transmitted
+
+    # ------------- instruction image ------------------------------------ #
+    def load_program(self, instr_hex: list[str]) -> None:
+        """(Re)load the instruction image and predecode it once."""
+        self.instr_hex = [h.replace(" ", "") for h in instr_hex]
+        self._invalidate_decode()
+
+    def write_instr(self, index: int, hex_word: str) -> None:
+        """Rewrite one instruction word (file byte order) at ``PC // 4``."""
+        self.instr_hex[index] = hex_word.replace(" ", "")
+        self._invalidate_decode()
+
+    def _invalidate_decode(self) -> None:
+        # PC-indexed tables: raw words (halt check) and decoded records
+        self.instr_words = image_words(self.instr_hex)
+        self.decoded     = decode_image(self.instr_hex)
+        # handler table, resolved once; ``None`` marks the halting zero word
+        resolved: dict[int, tuple] = {}
+        self._ops = [
+            None if word == 0 else
+            resolved.get(word) or resolved.setdefault(word, resolve_op(ins))
+            for word, ins in zip(self.instr_words, self.decoded)
+        ]
+        # destination register per PC (0 when nothing is written)
+        self.written = [written_reg(ins) for ins in self.decoded]
+        # translated blocks (Helper_JIT), keyed by start PC
+        self.jit_cache: dict[int, tuple | None] = {}
+
+    def halted(self) -> bool:
+        """True once PC runs off the image or sits on an all-zero word."""
+        idx = self.pc >> 2
+        return idx >= len(self._ops) or self._ops[idx] is None
+
+    # ------------- one instruction -------------------------------------- #
+    def step(self) -> None:
+        """Execute the instruction at PC."""
+        pc = self.pc
+        fn, rd, rs1, rs2, imm = self._ops[pc >> 2] or _HALT_OP
+        self.pc = fn(self, pc, rd, rs1, rs2, imm) & 0xFFFF_FFFF
+        self.retired += 1
+
+    # ------------- whole program ---------------------------------------- #
+    def run(self, max_steps: int | None = None) -> int:
+        """Step until :meth:`halted` (or *max_steps*); return steps taken."""
+        ops   = self._ops
+        n_ops = len(ops)
+        start = self.retired
+        stop  = -1 if max_steps is None else start + max_steps
+        pc    = self.pc
+        try:
+            # ``retired`` is kept exact per step: it is the devices' clock
+            while self.retired != stop:
+                idx = pc >> 2
+                if idx >= n_ops:
+                    break
+                op = ops[idx]
+                if op is None:                  # all-zero word → end of program
+                    break
+                fn, rd, rs1, rs2, imm = op
+                pc = fn(self, pc, rd, rs1, rs2, imm) & 0xFFFF_FFFF
+                self.retired += 1
+        finally:
+            self.pc = pc
+            self.bus.flush()
+        return self.retired - start
+
+
+# --------------------------------------------------------------------------- #
+#  Handlers                                                                   #
+# --------------------------------------------------------------------------- #
+#  Every handler has the signature ``fn(sim, pc, rd, rs1, rs2, imm) -> next_pc``
+#  and is bound to its instruction once, at decode time (see ``resolve_op``).
+#  ALU-style handlers never see rd == 0: such instructions resolve to
+#  ``_op_next`` because their only effect would be a write to x0.
+
+def _op_next(sim, pc, rd, rs1, rs2, imm):
+    return pc + 4
+
+
+def _illegal(msg):
+    def _op_illegal(sim, pc, rd, rs1, rs2, imm):
+        raise AssertionError(msg)
+    return _op_illegal
+
+
+_HALT_OP = (_illegal("Executed the all-zero word"), 0, 0, 0, 0)
+
+
+# ---- R-type --------------------------------------------------------------- #
+def _op_add(sim, pc, rd, rs1, rs2, imm):
+    rf = sim.rf; rf[rd] = (rf[rs1] + rf[rs2]) & 0xFFFF_FFFF; return pc + 4
+
+def _op_sub(sim, pc, rd, rs1, rs2, imm):
+    rf = sim.rf; rf[rd] = (rf[rs1] - rf[rs2]) & 0xFFFF_FFFF; return pc + 4
+
+def _op_and(sim, pc, rd, rs1, rs2, imm):
+    rf = sim.rf; rf[rd] = rf[rs1] & rf[rs2]; return pc + 4
+
+def _op_or(sim, pc, rd, rs1, rs2, imm):
+    rf = sim.rf; rf[rd] = rf[rs1] | rf[rs2]; return pc + 4
+
+def _op_xor(sim, pc, rd, rs1, rs2, imm):
+    rf = sim.rf; rf[rd] = rf[rs1] ^ rf[rs2]; return pc + 4
+
+def _op_sll(sim, pc, rd, rs1, rs2, imm):
+    rf = sim.rf; rf[rd] = (rf[rs1] << (rf[rs2] & 0x1F)) & 0xFFFF_FFFF; return pc + 4
+
+def _op_srl(sim, pc, rd, rs1, rs2, imm):
+    rf = sim.rf; rf[rd] = rf[rs1] >> (rf[rs2] & 0x1F); return pc + 4
+
+def _op_sra(sim, pc, rd, rs1, rs2, imm):
+    rf = sim.rf; rf[rd] = sra(rf[rs1], rf[rs2] & 0x1F); return pc + 4
+
+def _op_slt(sim, pc, rd, rs1, rs2, imm):
+    rf = sim.rf; rf[rd] = int(is_signed(rf[rs1]) < is_signed(rf[rs2])); return pc + 4
+
+def _op_sltu(sim, pc, rd, rs1, rs2, imm):
+    rf = sim.rf; rf[rd] = int(rf[rs1] < rf[rs2]); return pc + 4
+
+def _op_not(sim, pc, rd, rs1, rs2, imm):
+    # custom NOT rd,rs1  (funct7=0x20, funct3=FUNCT3_SLL=1)
+    rf = sim.rf; rf[rd] = (~rf[rs1]) & 0xFFFF_FFFF; return pc + 4
+
+
+# ---- I-type ALU ----------------------------------------------------------- #
+def _op_addi(sim, pc, rd, rs1, rs2, imm):
+    rf = sim.rf; rf[rd] = (rf[rs1] + imm) & 0xFFFF_FFFF; return pc + 4
+
+def _op_andi(sim, pc, rd, rs1, rs2, imm):
+    rf = sim.rf; rf[rd] = (rf[rs1] & imm) & 0xFFFF_FFFF; return pc + 4
+
+def _op_ori(sim, pc, rd, rs1, rs2, imm):
+    rf = sim.rf; rf[rd] = (rf[rs1] | imm) & 0xFFFF_FFFF; return pc + 4
+
+def _op_xori(sim, pc, rd, rs1, rs2, imm):
+    rf = sim.rf; rf[rd] = (rf[rs1] ^ imm) & 0xFFFF_FFFF; return pc + 4
+
+def _op_slti(sim, pc, rd, rs1, rs2, imm):
+    rf = sim.rf; rf[rd] = int(is_signed(rf[rs1]) < imm); return pc + 4
+
+def _op_sltiu(sim, pc, rd, rs1, rs2, imm):
+    # compares against the *signed* immediate, exactly like the old model
+    rf = sim.rf; rf[rd] = int(rf[rs1] < imm); return pc + 4
+
+def _op_slli(sim, pc, rd, rs1, rs2, imm):
+    rf = sim.rf; rf[rd] = (rf[rs1] << (imm & 0x1F)) & 0xFFFF_FFFF; return pc + 4
+
+def _op_srli(sim, pc, rd, rs1, rs2, imm):
+    rf = sim.rf; rf[rd] = rf[rs1] >> (imm & 0x1F); return pc + 4
+
+def _op_srai(sim, pc, rd, rs1, rs2, imm):
+    rf = sim.rf; rf[rd] = sra(rf[rs1], imm & 0x1F); return pc + 4
+
+
+# ---- U-type / jumps ------------------------------------------------------- #
+def _op_lui(sim, pc, rd, rs1, rs2, imm):
+    sim.rf[rd] = imm; return pc + 4
+
+def _op_auipc(sim, pc, rd, rs1, rs2, imm):
+    sim.rf[rd] = (pc + imm) & 0xFFFF_FFFF; return pc + 4
+
+def _op_jal(sim, pc, rd, rs1, rs2, imm):
+    if rd:
+        sim.rf[rd] = (pc + 4) & 0xFFFF_FFFF
+    return pc + imm
+
+def _op_jalr(sim, pc, rd, rs1, rs2, imm):
+    rf = sim.rf
+    target = (rf[rs1] + imm) & ~1       # read rs1 before rd may overwrite it
+    if rd:
+        rf[rd] = (pc + 4) & 0xFFFF_FFFF
+    return target
+
+
+# ---- branches ------------------------------------------------------------- #
+def _op_beq(sim, pc, rd, rs1, rs2, imm):
+    rf = sim.rf; return pc + imm if rf[rs1] == rf[rs2] else pc + 4
+
+def _op_bne(sim, pc, rd, rs1, rs2, imm):
+    rf = sim.rf; return pc + imm if rf[rs1] != rf[rs2] else pc + 4
+
+def _op_blt(sim, pc, rd, rs1, rs2, imm):
+    rf = sim.rf
+    return pc + imm if is_signed(rf[rs1]) < is_signed(rf[rs2]) else pc + 4
+
+def _op_bge(sim, pc, rd, rs1, rs2, imm):
+    rf = sim.rf
+    return pc + imm if is_signed(rf[rs1]) >= is_signed(rf[rs2]) else pc + 4
+
+def _op_bltu(sim, pc, rd, rs1, rs2, imm):
+    rf = sim.rf; return pc + imm if rf[rs1] < rf[rs2] else pc + 4
+
+def _op_bgeu(sim, pc, rd, rs1, rs2, imm):
+    rf = sim.rf; return pc + imm if rf[rs1] >= rf[rs2] else pc + 4
+
+
+# ---- loads / stores ------------------------------------------------------- #
+def _make_load(size: int, signed: bool):
+    bits = 8 * size
+    sign = 1 << (bits - 1)
+    def _op_load(sim, pc, rd, rs1, rs2, imm):
+        addr = sim.rf[rs1] + imm
+        dev  = sim.io.get(addr)
+        if dev is not None:
+            sim.mmio_reads += 1
+            # device word goes through the same extension as ReadDataExtend
+            val = dev.read(addr - dev.base, size, sim.retired) & ((1 << bits) - 1)
+            if signed:
+                val = ((val ^ sign) - sign) & 0xFFFF_FFFF
+        else:
+            if addr + 4 > sim.mem_size:
+                raise ValueError(f"Memory access out of range: {hex(addr)} (+4)")
+            val = int.from_bytes(sim.mem.read_bytes(addr, size), "little",
+                                 signed=signed) & 0xFFFF_FFFF
+        if rd:
+            sim.rf[rd] = val
+        return pc + 4
+    return _op_load
+
+
+def _make_store(size: int):
+    mask = (1 << (8 * size)) - 1
+    def _op_store(sim, pc, rd, rs1, rs2, imm):
+        addr = sim.rf[rs1] + imm
+        data = sim.rf[rs2]
+        dev  = sim.io.get(addr)
+        if dev is not None:
+            sim.mmio_writes += 1
+            dev.write(addr - dev.base, size, data & mask, sim.retired)
+        else:
+            sim.mem.write_bytes(addr, (data & mask).to_bytes(size, "little"))
+        return pc + 4
+    return _op_store
+
+
+def _op_lw(sim, pc, rd, rs1, rs2, imm):
+    # whole words skip the bytes round-trip (aligned: zero-copy word view)
+    addr = sim.rf[rs1] + imm
+    dev  = sim.io.get(addr)
+    if dev is not None:
+        sim.mmio_reads += 1
+        val = dev.read(addr - dev.base, 4, sim.retired) & 0xFFFF_FFFF
+    else:
+        if addr + 4 > sim.mem_size:
+            raise ValueError(f"Memory access out of range: {hex(addr)} (+4)")
+        val = sim.mem.read_word(addr)
+    if rd:
+        sim.rf[rd] = val
+    return pc + 4
+
+
+def _op_sw(sim, pc, rd, rs1, rs2, imm):
+    addr = sim.rf[rs1] + imm
+    dev  = sim.io.get(addr)
+    if dev is not None:
+        sim.mmio_writes += 1
+        dev.write(addr - dev.base, 4, sim.rf[rs2], sim.retired)
+    else:
+        sim.mem.write_word(addr, sim.rf[rs2])
+    return pc + 4
+
+
+# ---- dispatch tables ------------------------------------------------------ #
+#  R-type is keyed on (funct3, funct7); ``None`` is the "any funct7" fallback.
+_R_OPS = {
+    (0x1, 0x20): _op_not,
+    (0x0, 0x00): _op_add,  (0x0, 0x20): _op_sub,
+    (0x7, None): _op_and,  (0x6, None): _op_or,   (0x4, None): _op_xor,
+    (0x1, None): _op_sll,
+    (0x5, 0x00): _op_srl,  (0x5, 0x20): _op_sra,
+    (0x2, None): _op_slt,  (0x3, None): _op_sltu,
+}
+_I_OPS = {
+    0x0: _op_addi, 0x7: _op_andi, 0x6: _op_ori, 0x4: _op_xori,
+    0x2: _op_slti, 0x3: _op_sltiu, 0x1: _op_slli,
+}
+#  funct3 → (size, sign-extend); LBU/LHU zero-extend.  f3=6 keeps the old
+#  model's behaviour (size from f3 & 3, unsigned).
+_LOAD_OPS = {
+    0x0: _make_load(1, True),  0x1: _make_load(2, True),  0x2: _op_lw,
+    0x4: _make_load(1, False), 0x5: _make_load(2, False), 0x6: _op_lw,
+}
+_STORE_OPS = {
+    0x0: _make_store(1), 0x1: _make_store(2), 0x2: _op_sw,
+    0x4: _make_store(1), 0x5: _make_store(2), 0x6: _op_sw,
+}
+_BRANCH_OPS = {
+    0x0: _op_beq, 0x1: _op_bne, 0x4: _op_blt,
+    0x5: _op_bge, 0x6: _op_bltu, 0x7: _op_bgeu,
+}
+
+
+def resolve_handler(ins: RISCVInstruction):
+    """Pick the handler for a decoded instruction (integer keys only)."""
+    op, f3, f7 = ins.opcode, ins.funct3, ins.funct7
+    if op == 0x33:
+        fn = _R_OPS.get((f3, f7)) or _R_OPS.get((f3, None))
+        if fn is None:
+            return _illegal("Unsupported R-type variant")
+    elif op == 0x13:
+        if f3 == 0x5:
+            fn = _op_srli if f7 == 0x00 else _op_srai
+        else:
+            fn = _I_OPS[f3]
+    elif op == 0x03:
+        return _LOAD_OPS.get(f3) or _illegal(f"Unsupported LOAD funct3 {f3}")
+    elif op == 0x23:
+        return _STORE_OPS.get(f3) or _illegal(f"Unsupported STORE funct3 {f3}")
+    elif op == 0x63:
+        return _BRANCH_OPS.get(f3) or _illegal(f"Unsupported BRANCH funct3 {f3}")
+    elif op == 0x6F:
+        return _op_jal
+    elif op == 0x67:
+        return _op_jalr
+    elif op == 0x37:
+        fn = _op_lui
+    elif op == 0x17:
+        fn = _op_auipc
+    else:
+        return _illegal(f"Unsupported instruction type {ins.inst_type}")
+    # register-writing ALU op with rd = x0 → architecturally a NOP
+    return fn if ins.rd else _op_next
+
+
+_WRITES_RD = {0x33, 0x13, 0x03, 0x6F, 0x67, 0x37, 0x17}
+
+
+def written_reg(ins: RISCVInstruction) -> int:
+    """Register the instruction writes, or 0 (x0 / no write-back)."""
+    return ins.rd if ins.opcode in _WRITES_RD else 0
+
+
+def resolve_op(ins: RISCVInstruction) -> tuple:
+    """``(handler, rd, rs1, rs2, imm)`` as stored in ``RV32ISim._ops``."""
+    return (resolve_handler(ins), ins.rd, ins.rs1, ins.rs2, ins.imm)
+
+
+# --------------------------------------------------------------------------- #
+#  CLI                                                                        #
+# --------------------------------------------------------------------------- #
+def _dump_registers(rf: list[int]) -> str:
+    words = [f"x{idx:02d}:{val:08x}" for idx, val in enumerate(rf)]
+    return "\n".join("  ".join(words[i:i+8]) for i in range(0, 32, 8))
+
+
+def _dump_memory(mem) -> str:
+    """Non-zero words only – RAM is mostly empty."""
+    rows = []
+    for base, region in mem.regions():
+        for off in range(0, len(region) - 3, 4):
+            val = int.from_bytes(region[off:off + 4], "little")
+            if val:
+                rows.append(f"0x{base + off:08x}: {val:08x}")
+    return "\n".join(rows) or "(all zero)"
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Run an RV32I hex image without a simulator.")
+    ap.add_argument("hex", nargs="?", default="Instructions.hex",
+                    help="instruction image, one little-endian word per line")
+    ap.add_argument("--max-steps", type=int, default=None,
+                    help="stop after this many retired instructions")
+    ap.add_argument("--mem-size", type=int, default=RV32ISim.MEM_SIZE,
+                    help="data memory size in bytes (default: %(default)s)")
+    ap.add_argument("--sparse", action="store_true",
+                    help="page-backed memory over the full 32-bit address space")
+    ap.add_argument("--data", metavar="FILE@ADDR", action="append", default=[],
+                    help="preload a binary file into data memory (repeatable)")
+    ap.add_argument("--uart-rx", metavar="SRC", default=None,
+                    help="UART RX input: file, FIFO/pipe, or '-' for stdin")
+    ap.add_argument("--uart-rx-interval", type=int, default=0, metavar="N",
+                    help="one RX byte per N retired instructions (0: as fast as read)")
+    ap.add_argument("--uart-tx-busy", type=int, default=None, metavar="N",
+                    help="UART TX ignores stores for N instructions after a byte "
+                         "(default: the RTL at 100 MHz / 9600 baud; 0: never busy)")
+    ap.add_argument("--jit", action="store_true",
+                    help="execute translated basic blocks (see Helper_JIT)")
+    ap.add_argument("--profile", action="store_true",
+                    help="count per PC and print the hot basic blocks")
+    ap.add_argument("--source", default=None,
+                    help="assembly listing for the profile (default: instructions.s next to HEX)")
+    ap.add_argument("--top", type=int, default=5, help="blocks in the profile report")
+    args = ap.parse_args(argv)
+    if args.jit and args.profile:
+        ap.error("--jit and --profile are exclusive (the profile counts every instruction)")
+
+    if args.sparse:
+        mem_size = 1 << 32
+        mem      = SparseMemory(mem_size)
+    else:
+        mem_size = args.mem_size
+        mem      = ByteAddressableMemory(mem_size)
+    for spec in args.data:
+        path, _, addr = spec.rpartition("@")
+        mem.load_file(path, int(addr, 0))
+
+    bus = DeviceBus()
+    bus.register(UARTDevice(args.uart_rx, args.uart_rx_interval, tx_busy=args.uart_tx_busy),
+                 RV32ISim.UART_BASE)
+
+    sim = RV32ISim(read_file_to_list(args.hex), mem_size, mem=mem, bus=bus)
+    if args.jit:
+        from Helper_JIT import BlockJIT     # imports this module, keep it lazy
+        engine = BlockJIT(sim)
+    elif args.profile:
+        engine = Profile(sim)
+    else:
+        engine = sim
+    prof = engine if args.profile else None
+    t0 = time.perf_counter()
+    try:
+        engine.run(args.max_steps)
+    finally:
+        bus.close()                         # restores stdin's blocking mode
+    dt = time.perf_counter() - t0
+
+    print("***** REGISTERS *****")
+    print(_dump_registers(sim.rf))
+    print("***** MEMORY *****")
+    print(_dump_memory(sim.mem))
+    if sim.uart_tx:
+        print("***** UART TX *****")
+        print(sim.uart_tx.decode("latin-1"))
+    if sim.uart.tx_dropped:
+        print(f"({sim.uart.tx_dropped} UART stores dropped while TX was busy, "
+              f"see --uart-tx-busy)")
+    print(f"PC=0x{sim.pc:08X}  retired={sim.retired}  "
+          f"({sim.retired / dt if dt else 0:,.0f} instr/s)")
+    if prof is not None:
+        source = args.source or os.path.join(os.path.dirname(args.hex), "instructions.s")
+        print("***** PROFILE *****")
+        print(prof.report(source, args.top))
+    return 0
+
+
+if __name__ == "__main__":
+    # go through the importable module: Helper_JIT matches handlers by
+    # identity, and a second copy of them would live in ``__main__``
+    from Helper_ISS import main as _main
+    sys.exit(_main())
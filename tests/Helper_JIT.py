@@ -0,0 +1,363 @@
+"""
+Basic-block translation for the reference model
+===============================================
+
+``BlockJIT.run`` is a drop-in for ``RV32ISim.run`` that executes translated
+code instead of single instructions.  A basic block starts at any PC the
+run reaches and ends at the first BRANCH/JAL/JALR (inclusive), before the
+halting zero word, or before an instruction it cannot translate.  The
+translation unit is a *region*: the block at the entry PC plus the blocks
+statically reachable from it (branch targets, fall-throughs, JAL targets),
+up to ``MAX_REGION`` blocks, all in one generated Python function:
+
+* registers live in locals, loaded once on entry and written back on exit;
+* the blocks are chained directly: each one ends by setting the next PC to
+  a constant (or, for JALR, the computed target) and jumping to the block
+  that starts there, without leaving the function – loops spanning
+  several blocks run entirely in locals, and control only returns to
+  ``run`` for a PC outside the region;
+* ALU ops, LUI/AUIPC and branch conditions are emitted inline (AUIPC and JAL
+  link values are constant-folded);
+* loads and stores of any size that hit RAM go straight to ``sim.mem``'s
+  buffer (byte/halfword accesses need a ``ByteAddressableMemory``); device
+  addresses and range errors call the interpreter's own handler, so MMIO
+  and the ``retired`` clock seen by devices behave exactly as in ``sim.run``;
+* the step budget is checked before each block, so a run stops on the same
+  instruction as ``sim.run(max_steps)``.
+
+Functions are cached per entry PC in ``sim.jit_cache``, which the model
+empties whenever the image changes (``load_program`` / ``write_instr``).
+The core is Harvard – stores never reach instruction memory – so those two
+calls are the only way a translation can go stale.  Translations hold on to
+``sim.mem`` and ``sim.io``; replace either and ``sim.jit_cache`` must be
+cleared too.
+
+Public API
+----------
+BlockJIT(sim)                          -> translator bound to one RV32ISim
+BlockJIT.run(max_steps)                -> like ``sim.run``, region at a time
+translate(sim, pc)                     -> (function, entry block length, source) or None
+"""
+
+from __future__ import annotations
+
+from Helper_lib import ByteAddressableMemory
+from Helper_ISS import (
+    _op_add, _op_sub, _op_and, _op_or, _op_xor, _op_sll, _op_srl, _op_sra,
+    _op_slt, _op_sltu, _op_not, _op_addi, _op_andi, _op_ori, _op_xori,
+    _op_slti, _op_sltiu, _op_slli, _op_srli, _op_srai, _op_lui, _op_auipc,
+    _op_next, _op_jal, _op_jalr, _op_beq, _op_bne, _op_blt, _op_bge,
+    _op_bltu, _op_bgeu, _op_lw, _op_sw, _LOAD_OPS, _STORE_OPS,
+)
+
+MAX_BLOCK  = 256                           # instructions per basic block
+MAX_REGION = 32                            # basic blocks per translation
+UNLIMITED  = 1 << 62                       # step budget of an unbounded run
+
+# {d} destination local, {a}/{b} source operands, {i} immediate.  Values in
+# ``rf`` are always 0 … 2**32-1; ``^ S`` flips the sign bit so that plain
+# comparisons become signed ones.
+_ALU = {
+    _op_add:   "{d} = ({a} + {b}) & 0xFFFFFFFF",
+    _op_sub:   "{d} = ({a} - {b}) & 0xFFFFFFFF",
+    _op_and:   "{d} = {a} & {b}",
+    _op_or:    "{d} = {a} | {b}",
+    _op_xor:   "{d} = {a} ^ {b}",
+    _op_sll:   "{d} = ({a} << ({b} & 31)) & 0xFFFFFFFF",
+    _op_srl:   "{d} = {a} >> ({b} & 31)",
+    _op_sra:   "{d} = ((({a} ^ S) - S) >> ({b} & 31)) & 0xFFFFFFFF",
+    _op_slt:   "{d} = int(({a} ^ S) < ({b} ^ S))",
+    _op_sltu:  "{d} = int({a} < {b})",
+    _op_not:   "{d} = ~{a} & 0xFFFFFFFF",
+    _op_addi:  "{d} = ({a} + {i}) & 0xFFFFFFFF",
+    _op_andi:  "{d} = {a} & {i} & 0xFFFFFFFF",
+    _op_ori:   "{d} = ({a} | {i}) & 0xFFFFFFFF",
+    _op_xori:  "{d} = ({a} ^ {i}) & 0xFFFFFFFF",
+    _op_slti:  "{d} = int(({a} ^ S) - S < {i})",
+    _op_sltiu: "{d} = int({a} < {i})",
+    _op_slli:  "{d} = ({a} << ({i} & 31)) & 0xFFFFFFFF",
+    _op_srli:  "{d} = {a} >> ({i} & 31)",
+    _op_srai:  "{d} = ((({a} ^ S) - S) >> ({i} & 31)) & 0xFFFFFFFF",
+    _op_lui:   "{d} = {i}",
+}
+_BRANCH = {
+    _op_beq:  "{a} == {b}",
+    _op_bne:  "{a} != {b}",
+    _op_blt:  "({a} ^ S) < ({b} ^ S)",
+    _op_bge:  "({a} ^ S) >= ({b} ^ S)",
+    _op_bltu: "{a} < {b}",
+    _op_bgeu: "{a} >= {b}",
+}
+_MEMORY = set(_LOAD_OPS.values()) | set(_STORE_OPS.values())
+_LOADS  = set(_LOAD_OPS.values())
+
+# sub-word RAM accesses on the byte buffer ``B`` at address ``a``
+_SUBWORD = {
+    _LOAD_OPS[0]:  "{d} = ((B[a] ^ 0x80) - 0x80) & 0xFFFFFFFF",                     # LB
+    _LOAD_OPS[1]:  "{d} = (((B[a] | B[a + 1] << 8) ^ 0x8000) - 0x8000) & 0xFFFFFFFF",  # LH
+    _LOAD_OPS[4]:  "{d} = B[a]",                                                    # LBU
+    _LOAD_OPS[5]:  "{d} = B[a] | B[a + 1] << 8",                                    # LHU
+    _STORE_OPS[0]: "B[a] = {v} & 0xFF",                                             # SB
+    _STORE_OPS[1]: "B[a] = {v} & 0xFF; B[a + 1] = {v} >> 8 & 0xFF",                 # SH
+}
+_SUBWORD[_STORE_OPS[4]] = _SUBWORD[_STORE_OPS[0]]
+_SUBWORD[_STORE_OPS[5]] = _SUBWORD[_STORE_OPS[1]]
+
+_I1, _I2, _I3 = " " * 12, " " * 16, " " * 20
+
+
+def _reg(r: int) -> str:
+    return f"x{r}" if r else "0"
+
+
+class _Emitter:
+    """Collects the region's code; tracks the registers it touches."""
+
+    def __init__(self):
+        self.lines: list[str] = []
+        self.used:  set[int] = set()
+        self.wrote: set[int] = set()
+        self.env:   dict[str, object] = {}
+        self.n      = 0                        # handler names h0, h1, …
+
+    def emit(self, line: str, indent: str = _I2) -> None:
+        self.lines.append(indent + line)
+
+    def read(self, *regs: int) -> None:
+        self.used.update(r for r in regs if r)
+
+    def write(self, rd: int) -> None:
+        self.used.add(rd)
+        self.wrote.add(rd)
+
+    def handler(self, fn) -> str:
+        name = f"h{self.n}"
+        self.n += 1
+        self.env[name] = fn
+        return name
+
+
+def _scan(sim, pc: int):
+    """``(body, term)`` of the basic block at *pc*, or None if it is empty."""
+    ops, n_ops = sim._ops, len(sim._ops)
+    body: list[tuple] = []
+    term = None
+    at = pc
+    while len(body) < MAX_BLOCK and 0 <= at >> 2 < n_ops and ops[at >> 2] is not None:
+        op = ops[at >> 2]
+        fn = op[0]
+        if fn in _BRANCH or fn is _op_jal or fn is _op_jalr:
+            term = (at, op)
+            break
+        if fn not in _ALU and fn not in _MEMORY and fn is not _op_auipc \
+                and fn is not _op_next:
+            break                                   # illegal → interpreter
+        body.append((at, op))
+        at += 4
+    if not body and term is None:
+        return None
+    return body, term
+
+
+def _successors(pc: int, body, term) -> list[int]:
+    fall = pc + 4 * (len(body) + (term is not None))
+    if term is None:
+        return [fall]
+    tpc, (fn, rd, rs1, rs2, imm) = term
+    if fn in _BRANCH:
+        return [tpc + imm, fall]
+    if fn is _op_jal:
+        return [tpc + imm]
+    return []                                       # JALR: known at run time
+
+
+def _emit_access(em, k, ipc, fn, rd, rs1, rs2, imm, words, inline: bool):
+    """One load/store: RAM inline when *inline*, else / otherwise the handler."""
+    load = fn in _LOADS
+    srcs = [rs1] if load else [rs1, rs2]
+    em.read(*srcs)
+    h = em.handler(fn)
+    slow = [f"rf[{r}] = x{r}" for r in sorted(set(srcs)) if r]
+    slow += [f"pc = {ipc}",
+             f"sim.retired = R + c + {k}",
+             f"{h}(sim, {ipc}, {rd}, {rs1}, {rs2}, {imm})"]
+    if load and rd:
+        em.write(rd)
+        slow.append(f"x{rd} = rf[{rd}]")
+    if not inline:
+        for line in slow:
+            em.emit(line)
+        return
+    if fn is _op_lw or fn is _op_sw:
+        fast = (f"x{rd} = W[a >> 2]" if words is not None else f"x{rd} = read_word(a)") \
+            if load else \
+            (f"W[a >> 2] = {_reg(rs2)}" if words is not None else f"write_word(a, {_reg(rs2)})")
+    else:
+        fast = _SUBWORD[fn].format(d=f"x{rd}", v=_reg(rs2))
+    em.emit(f"a = {_reg(rs1)} + {imm}")
+    em.emit("if a in io or not 0 <= a <= LIM or a & ALIGN:" if fn is _op_lw or fn is _op_sw
+            else "if a in io or not 0 <= a <= LIM:")
+    for line in slow:
+        em.emit(line, _I3)
+    if load and not rd:
+        return                                      # RAM read with no effect
+    em.emit("else:")
+    em.emit(fast, _I3)
+
+
+def _emit_block(em, pc, body, term, words, subword: bool):
+    """Code of one block after its ``if pc == …`` guard; ends with ``continue``."""
+    length = len(body) + (term is not None)
+    em.emit(f"if pc == {pc}:", _I1)
+    em.emit(f"if c + {length} > budget:")
+    em.emit("break", _I3)
+    for k, (ipc, (fn, rd, rs1, rs2, imm)) in enumerate(body):
+        if fn is _op_next:
+            continue
+        if fn in _ALU:
+            tmpl = _ALU[fn]
+            em.read(rs1 if "{a}" in tmpl else 0, rs2 if "{b}" in tmpl else 0)
+            em.write(rd)
+            em.emit(tmpl.format(d=f"x{rd}", a=_reg(rs1), b=_reg(rs2), i=imm))
+        elif fn is _op_auipc:
+            em.write(rd)
+            em.emit(f"x{rd} = {(ipc + imm) & 0xFFFF_FFFF}")
+        else:
+            word = fn is _op_lw or fn is _op_sw
+            _emit_access(em, k, ipc, fn, rd, rs1, rs2, imm, words, word or subword)
+
+    # terminator: next PC (and the link register for jumps)
+    fall = pc + 4 * length
+    if term is None:
+        nxt = str(fall)
+    else:
+        tpc, (fn, rd, rs1, rs2, imm) = term
+        if fn in _BRANCH:
+            em.read(rs1, rs2)
+            cond = _BRANCH[fn].format(a=_reg(rs1), b=_reg(rs2))
+            nxt  = f"{(tpc + imm) & 0xFFFF_FFFF} if {cond} else {fall}"
+        elif fn is _op_jal:
+            if rd:
+                em.write(rd)
+                em.emit(f"x{rd} = {(tpc + 4) & 0xFFFF_FFFF}")
+            nxt = str((tpc + imm) & 0xFFFF_FFFF)
+        else:                                       # JALR: rs1 read before rd
+            em.read(rs1)
+            em.emit(f"t = ({_reg(rs1)} + {imm}) & 0xFFFFFFFE")
+            if rd:
+                em.write(rd)
+                em.emit(f"x{rd} = {(tpc + 4) & 0xFFFF_FFFF}")
+            nxt = "t"
+    em.emit(f"c += {length}")
+    em.emit(f"pc = {nxt}")
+    em.emit("continue")
+    return length
+
+
+def translate(sim, pc: int):
+    """
+    Build the region entered at *pc*.  Returns ``(fn, length, source)`` or
+    None when the first instruction cannot be translated (the caller then
+    interprets it); *length* is that of the entry block.  ``fn(sim, rf,
+    budget) -> next_pc`` runs blocks of the region until control leaves it
+    or the next block would take more than *budget* steps in total.
+    """
+    first = _scan(sim, pc)
+    if first is None:
+        return None
+    # breadth-first over the static successors, entry block first
+    blocks = {pc: first}
+    queue  = [pc]
+    for at in queue:
+        for succ in _successors(at, *blocks[at]):
+            if succ in blocks or succ & 3 or len(blocks) >= MAX_REGION:
+                continue
+            blk = _scan(sim, succ)
+            if blk is not None:
+                blocks[succ] = blk
+                queue.append(succ)
+
+    # aligned RAM words (and bytes) can be indexed directly when the memory
+    # has a zero-copy view
+    words = sim.mem.words() if isinstance(sim.mem, ByteAddressableMemory) else None
+    if not isinstance(words, memoryview):
+        words = None
+    subword = words is not None
+
+    em = _Emitter()
+    entry_len = 0
+    for at in queue:
+        length = _emit_block(em, at, *blocks[at], words, subword)
+        entry_len = entry_len or length
+    em.emit("break", _I1)
+
+    src = [f"def _region_{pc:x}(sim, rf, budget):"]
+    src += [f"    x{r} = rf[{r}]" for r in sorted(em.used)]
+    src += ["    R = sim.retired", "    c = 0", f"    pc = {pc}", "    try:",
+            "        while True:"]
+    src += em.lines
+    src += ["    except BaseException:",
+            "        sim.pc = pc                 # the faulting load/store",
+            "        raise",
+            "    finally:"]
+    src += [f"        rf[{r}] = x{r}" for r in sorted(em.wrote)] or ["        pass"]
+    src += ["    sim.retired = R + c", "    return pc"]
+    source = "\n".join(src)
+
+    env = dict(em.env, S=0x8000_0000, io=sim.io, LIM=sim.mem_size - 4,
+               read_word=sim.mem.read_word, write_word=sim.mem.write_word,
+               W=words, B=sim.mem.mem if subword else None,
+               ALIGN=0 if words is None else 3)
+    exec(compile(source, f"<region 0x{pc:x}>", "exec"), env)
+    return env[f"_region_{pc:x}"], entry_len, source
+
+
+class BlockJIT:
+    """Region-at-a-time executor for *sim*; falls back to ``sim.step``."""
+
+    __slots__ = ("sim",)
+
+    def __init__(self, sim):
+        self.sim = sim
+
+    def _lookup(self, pc: int):
+        cache = self.sim.jit_cache
+        try:
+            return cache[pc]
+        except KeyError:
+            blk = cache[pc] = translate(self.sim, pc)
+            return blk
+
+    def run(self, max_steps: int | None = None) -> int:
+        """Same contract as :meth:`RV32ISim.run`; return steps taken."""
+        sim   = self.sim
+        ops   = sim._ops
+        n_ops = len(ops)
+        rf    = sim.rf
+        start = sim.retired
+        stop  = None if max_steps is None else start + max_steps
+        pc    = sim.pc
+        try:
+            while True:
+                idx = pc >> 2
+                if idx >= n_ops or ops[idx] is None:
+                    break
+                left = UNLIMITED if stop is None else stop - sim.retired
+                if not left:
+                    break
+                blk = self._lookup(pc)
+                if blk is None or left < blk[1]:
+                    # untranslatable or budget ends mid-block → one step
+                    sim.pc = pc
+                    sim.step()
+                    pc = sim.pc
+                    continue
+                try:
+                    pc = blk[0](sim, rf, left) & 0xFFFF_FFFF
+                except BaseException:
+                    pc = sim.pc                 # set by the region
+                    raise
+        finally:
+            sim.pc = pc
+            sim.bus.flush()
+        return sim.retired - start
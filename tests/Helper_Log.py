@@ -0,0 +1,228 @@
+"""
+Off-thread, compressed log sink
+===============================
+
+``AsyncLogSink`` is a ``logging.Handler`` whose ``emit`` only appends the
+``LogRecord`` – message template and raw arguments, unformatted – to a
+queue.  A background thread drains the queue in batches, formats the
+records and writes them through gzip (``.gz``), zstd (``.zst``, needs the
+``zstandard`` package) or plain text.  ``%``-formatting, string joins,
+compression and file I/O all happen on the writer thread.
+
+Creating a ``LogRecord`` through ``Logger`` (caller lookup, thread and
+process names) is itself most of the remaining cost, so ``QueuedLogger``
+wraps the logger for the hot path: records below ``WARNING`` are queued as
+a bare ``(name, level, time, msg, args)`` tuple and become a ``LogRecord``
+on the writer thread.  Warnings and errors take the normal ``Logger`` path,
+so console handlers still see them.
+
+The writer still needs the GIL to format, so it is not free CPU, but it
+runs while the simulator thread waits on the simulator and zlib/zstd drop
+the GIL while compressing.
+
+Arguments are formatted late: pass values that will not change afterwards
+(ints, strings, signal values already read) – or objects whose ``__str__``
+does the formatting, see ``Helper_Student``.
+
+Public API
+----------
+AsyncLogSink(path, level, compression, compresslevel) -> logging.Handler
+AsyncLogSink.flush()                   -> block until queued records are written
+AsyncLogSink.close()                   -> flush, stop the thread, close the file
+QueuedLogger(logger, sink)             -> Logger stand-in with a direct queue path
+open_log(path)                         -> text stream for reading a sink's file
+"""
+
+from __future__ import annotations
+
+import atexit
+import gzip
+import io
+import logging
+import os
+import queue
+import threading
+import time
+
+try:
+    import zstandard
+except ImportError:                        # pragma: no cover - optional dependency
+    zstandard = None
+
+_STOP  = object()
+_BATCH = 4096                              # records per write at most
+
+
+def _compression_for(path: str | os.PathLike) -> str:
+    name = os.fspath(path)
+    if name.endswith(".gz"):
+        return "gzip"
+    if name.endswith(".zst"):
+        return "zstd"
+    return "none"
+
+
+def _open_binary(path, compression: str, level: int | None):
+    fh = open(path, "wb")
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=fh, mode="wb",
+                             compresslevel=6 if level is None else level), fh
+    if compression == "zstd":
+        if zstandard is None:
+            fh.close()
+            raise ImportError("zstd log files need the zstandard package "
+                              "(pip install zstandard)")
+        cctx = zstandard.ZstdCompressor(level=3 if level is None else level)
+        return cctx.stream_writer(fh, closefd=False), fh
+    if compression == "none":
+        return fh, fh
+    fh.close()
+    raise ValueError(f"unknown compression {compression!r}")
+
+
+def open_log(path: str | os.PathLike):
+    """Text stream over a log written by :class:`AsyncLogSink`."""
+    compression = _compression_for(path)
+    if compression == "gzip":
+        return gzip.open(path, "rt", encoding="utf-8")
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImportError("reading .zst logs needs the zstandard package")
+        raw = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True)
+        return io.TextIOWrapper(raw, encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def _record(name, level, created, msg, args) -> logging.LogRecord:
+    rec = logging.LogRecord(name, level, "", 0, msg, args, None)
+    rec.created = created
+    rec.msecs   = (created - int(created)) * 1000
+    rec.relativeCreated = (created - logging._startTime) * 1000
+    return rec
+
+
+class AsyncLogSink(logging.Handler):
+    """Queue in ``emit``, format + compress + write on a daemon thread."""
+
+    def __init__(self, path: str | os.PathLike, level: int = logging.NOTSET,
+                 compression: str | None = None, compresslevel: int | None = None):
+        super().__init__(level)
+        self.path = os.fspath(path)
+        compression = compression or _compression_for(path)
+        self._stream, self._raw = _open_binary(self.path, compression, compresslevel)
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._writer, name="AsyncLogSink",
+                                        daemon=True)
+        self._closed = False
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ------------- simulator thread ------------------------------------- #
+    def handle(self, record: logging.LogRecord) -> bool:
+        # no handler lock: SimpleQueue.put is thread-safe on its own
+        rv = self.filter(record)
+        if rv and not self._closed:
+            self._queue.put(record)
+        return bool(rv)
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self._queue.put(record)
+
+    def flush(self) -> None:
+        if self._closed or not self._thread.is_alive():
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        while not done.wait(0.1):
+            if not self._thread.is_alive():     # writer died (disk full, …)
+                return
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join()
+        atexit.unregister(self.close)
+        super().close()
+
+    # ------------- writer thread ---------------------------------------- #
+    def _writer(self) -> None:
+        get, get_nowait = self._queue.get, self._queue.get_nowait
+        lines: list[str] = []
+        try:
+            while True:
+                item = get()
+                # take whatever else is queued, up to one batch
+                while True:
+                    if item is _STOP:
+                        self._write(lines)
+                        return
+                    if type(item) is tuple:             # from QueuedLogger
+                        item = _record(*item)
+                    if isinstance(item, threading.Event):
+                        self._write(lines)
+                        self._stream.flush()
+                        item.set()
+                    else:
+                        try:
+                            lines.append(self.format(item))
+                        except Exception:
+                            self.handleError(item)
+                    if len(lines) >= _BATCH:
+                        self._write(lines)
+                    try:
+                        item = get_nowait()
+                    except queue.Empty:
+                        break
+                self._write(lines)
+        finally:
+            self._stream.close()
+            if self._raw is not self._stream:
+                self._raw.close()
+
+    def _write(self, lines: list[str]) -> None:
+        if lines:
+            lines.append("")
+            self._stream.write("\n".join(lines).encode("utf-8", "backslashreplace"))
+            lines.clear()
+
+
+class QueuedLogger:
+    """
+    The ``Logger`` methods the test-bench uses, with records below
+    ``WARNING`` put straight on *sink*'s queue.  Anything else (other
+    methods, ``exc_info``/``extra`` keywords) goes to the wrapped logger.
+    """
+
+    __slots__ = ("logger", "_name", "_put", "_enabled")
+
+    def __init__(self, logger: logging.Logger, sink: AsyncLogSink):
+        self.logger   = logger
+        self._name    = logger.name
+        self._put     = sink._queue.put
+        self._enabled = logger.isEnabledFor       # cached by level in Logger
+
+    def log(self, level: int, msg, *args, **kwargs) -> None:
+        if not self._enabled(level):
+            return
+        if level < logging.WARNING and not kwargs:
+            self._put((self._name, level, time.time(), msg, args))
+        else:
+            self.logger.log(level, msg, *args, **kwargs)
+
+    def debug(self, msg, *args, **kwargs) -> None:
+        self.log(logging.DEBUG, msg, *args, **kwargs)
+
+    def info(self, msg, *args, **kwargs) -> None:
+        self.log(logging.INFO, msg, *args, **kwargs)
+
+    def warning(self, msg, *args, **kwargs) -> None:
+        self.logger.warning(msg, *args, **kwargs)
+
+    def error(self, msg, *args, **kwargs) -> None:
+        self.logger.error(msg, *args, **kwargs)
+
+    def __getattr__(self, name):
+        # isEnabledFor, setLevel, handlers, … – the logger's own
+        return getattr(self.logger, name)
@@ -0,0 +1,284 @@
+"""
+Memory-mapped I/O for the reference model
+=========================================
+
+``RV32ISim`` sends every load/store whose address hits a registered device to
+that device instead of data memory.  Devices see offsets relative to their
+base and the current retired-instruction count, which is the model's notion
+of time.
+
+Public API
+----------
+Device                                 -> base class (size, read, write, flush, close,
+                                          snapshot/restore for Helper_Checkpoint)
+DeviceBus()                            -> address decoder, ``register(dev, base)``, ``close()``
+UARTDevice(rx_source, rx_interval, …)  -> mirror of ``UART_Peripheral.v``
+tx_busy_cycles(clk_freq, baud_rate)    -> cycles the RTL transmitter is busy per byte
+"""
+
+from __future__ import annotations
+
+import atexit
+import io
+import os
+import sys
+from collections import deque
+
+
+def tx_busy_cycles(clk_freq: int, baud_rate: int) -> int:
+    """
+    uart_clk edges after accepting a byte during which ``UART_Peripheral``'s
+    ``tx_active`` is still set: 11 ticks of the rounded baud divisor.
+    """
+    return 11 * ((clk_freq + baud_rate // 2) // baud_rate)
+
+
+class Device:
+    """A register window of ``size`` bytes; unsupported accesses raise."""
+
+    size = 4
+    base = 0
+
+    def read(self, offset: int, size: int, now: int) -> int:
+        raise ValueError(f"{type(self).__name__}: offset 0x{offset:X} is not readable")
+
+    def write(self, offset: int, size: int, value: int, now: int) -> None:
+        raise ValueError(f"{type(self).__name__}: offset 0x{offset:X} is not writable")
+
+    def flush(self) -> None:
+        """Push out any buffered output (end of run)."""
+
+    def close(self) -> None:
+        """Release host resources (files, descriptor modes) taken by the device."""
+
+    def snapshot(self):
+        """Device state a checkpoint needs to rewind it (None: stateless)."""
+        return None
+
+    def restore(self, state) -> None:
+        """Put the device back into a state returned by :meth:`snapshot`."""
+
+
+class DeviceBus:
+    """Byte-address → device map; one dict lookup per load/store."""
+
+    def __init__(self):
+        self.map: dict[int, Device] = {}
+        self.devices: list[Device] = []
+
+    def register(self, device: Device, base: int) -> Device:
+        span = range(base, base + device.size)
+        clash = next((a for a in span if a in self.map), None)
+        if clash is not None:
+            raise ValueError(f"0x{clash:X} already mapped to {type(self.map[clash]).__name__}")
+        device.base = base
+        for addr in span:
+            self.map[addr] = device
+        self.devices.append(device)
+        return device
+
+    def find(self, kind: type) -> Device | None:
+        return next((d for d in self.devices if isinstance(d, kind)), None)
+
+    def flush(self) -> None:
+        for dev in self.devices:
+            dev.flush()
+
+    def close(self) -> None:
+        for dev in self.devices:
+            dev.close()
+
+
+# --------------------------------------------------------------------------- #
+#  UART                                                                       #
+# --------------------------------------------------------------------------- #
+class UARTDevice(Device):
+    """
+    Model of ``UART_Peripheral.v`` as seen from the CPU.
+
+    * offset 0 (store): transmit the low byte.  Bytes collect in a buffer and
+      go to ``on_flush`` (or ``tx_stream``) per line / ``flush_at`` bytes.
+      Like the RTL, a store within ``tx_busy`` cycles of the last accepted
+      byte is dropped (counted in ``tx_dropped``); ``tx_busy = 0`` accepts
+      every byte.  Cycles are retired instructions, i.e. uart_clk is taken
+      to run at the CPU clock.
+    * offset 4 (load):  pop the 16-entry RX FIFO.  Like the RTL, the load
+      returns the *registered* ``read_data`` – i.e. the result of the previous
+      pop – and ``0xFFFFFFFF`` stands for "FIFO was empty".
+
+    RX bytes come from ``rx_source`` (path, ``"-"`` for stdin, or a binary
+    file/pipe object).  With ``rx_interval = N`` one byte arrives every N
+    retired instructions and bytes arriving while the FIFO is full are
+    dropped, as in the RTL; ``rx_interval = 0`` keeps the FIFO topped up.
+    The source's descriptor is switched to non-blocking while the device
+    uses it; :meth:`close` (or interpreter exit) switches it back, so a
+    terminal on stdin is left as it was.
+
+    :meth:`snapshot` / :meth:`restore` cover the FIFO, ``read_data``, the TX
+    log and busy time and the position in the RX source.  Rewinding past
+    RX input that was already read needs a seekable source (a file); with
+    a pipe or terminal :meth:`restore` raises ``ValueError``.
+    """
+
+    size        = 8
+    FIFO_DEPTH  = 16
+    EMPTY       = 0xFFFF_FFFF
+    # TX busy time at the RTL's default CLK_FREQ / BAUD_RATE
+    RTL_TX_BUSY = tx_busy_cycles(100_000_000, 9_600)
+
+    def __init__(self, rx_source=None, rx_interval: int = 0, *,
+                 tx_stream=None, on_flush=None, flush_at: int = 4096,
+                 registered_read: bool = True, tx_busy: int | None = None):
+        self.fifo: deque[int] = deque()
+        self.read_data   = self.EMPTY          # RTL reset value
+        self.registered  = registered_read
+        self.rx_interval = rx_interval
+        self.rx_dropped  = 0
+        self._rx_owned   = None                # file opened here, closed here
+        self._rx_fd      = None                # descriptor made non-blocking here
+        self._rx         = self._open(rx_source)
+        self._rx_eof     = self._rx is None
+        self._rx_clock   = 0                   # retired count of last arrival
+        self._rx_read    = 0                   # bytes taken from the source
+        self._rx_start   = self._tell(self._rx)
+
+        self.transmitted = bytearray()         # everything ever sent
+        self._tx_pending = bytearray()
+        self.tx_busy     = self.RTL_TX_BUSY if tx_busy is None else tx_busy
+        self.tx_dropped  = 0
+        self._tx_until   = -1                  # last cycle the transmitter is busy
+        self.tx_stream   = tx_stream
+        self.on_flush    = on_flush
+        self.flush_at    = flush_at
+
+    # ---------- RX source ---------------------------------------------- #
+    def _open(self, src):
+        if src is None:
+            return None
+        if src == "-":
+            src = sys.stdin.buffer
+        elif isinstance(src, (str, os.PathLike)):
+            src = self._rx_owned = open(src, "rb")
+        try:
+            fd = src.fileno()
+            if os.get_blocking(fd):
+                os.set_blocking(fd, False)     # pipes: never stall the model
+                self._rx_fd = fd
+                atexit.register(self.close)
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            pass
+        return src
+
+    def close(self) -> None:
+        self._rx_eof = True                    # no RX input after close
+        if self._rx_fd is not None:
+            try:
+                os.set_blocking(self._rx_fd, True)
+            except OSError:                    # already closed by its owner
+                pass
+            self._rx_fd = None
+            atexit.unregister(self.close)
+        if self._rx_owned is not None:
+            self._rx_owned.close()
+            self._rx_owned = None
+
+    def _pull(self, n: int) -> bytes:
+        if self._rx_eof or n <= 0:
+            return b""
+        try:
+            data = self._rx.read(n)
+        except BlockingIOError:
+            return b""
+        if data is None:                       # non-blocking pipe, nothing yet
+            return b""
+        if not data:
+            self._rx_eof = True
+        self._rx_read += len(data)
+        return data
+
+    @staticmethod
+    def _tell(src) -> int | None:
+        """Offset of a seekable source, None for pipes and terminals."""
+        try:
+            return src.tell() if src is not None and src.seekable() else None
+        except (AttributeError, OSError, ValueError):
+            return None
+
+    def _sync_rx(self, now: int) -> None:
+        room = self.FIFO_DEPTH - len(self.fifo)
+        if not self.rx_interval:
+            self.fifo.extend(self._pull(room))
+            return
+        due = (now - self._rx_clock) // self.rx_interval
+        if due <= 0:
+            return
+        self._rx_clock += due * self.rx_interval
+        data = self._pull(due)
+        self.fifo.extend(data[:room])
+        self.rx_dropped += max(0, len(data) - room)
+
+    # ---------- CPU side ----------------------------------------------- #
+    @property
+    def fifo_empty(self) -> bool:
+        return not self.fifo
+
+    @property
+    def fifo_full(self) -> bool:
+        return len(self.fifo) == self.FIFO_DEPTH
+
+    def read(self, offset: int, size: int, now: int) -> int:
+        if offset != 4:
+            return super().read(offset, size, now)
+        self._sync_rx(now)
+        popped = self.fifo.popleft() if self.fifo else self.EMPTY
+        if not self.registered:
+            return popped
+        value, self.read_data = self.read_data, popped
+        return value
+
+    def write(self, offset: int, size: int, value: int, now: int) -> None:
+        if offset != 0:
+            return super().write(offset, size, value, now)
+        if now <= self._tx_until:
+            self.tx_dropped += 1
+            return
+        if self.tx_busy:
+            self._tx_until = now + self.tx_busy
+        byte = value & 0xFF
+        self.transmitted.append(byte)
+        self._tx_pending.append(byte)
+        if byte == 0x0A or len(self._tx_pending) >= self.flush_at:
+            self.flush()
+
+    # ---------- checkpoints -------------------------------------------- #
+    def snapshot(self):
+        return (tuple(self.fifo), self.read_data, len(self.transmitted),
+                bytes(self._tx_pending), self._tx_until, self.tx_dropped,
+                self.rx_dropped, self._rx_clock, self._rx_eof, self._rx_read)
+
+    def restore(self, state) -> None:
+        fifo, read_data, tx_len, pending, tx_until, tx_dropped, \
+            rx_dropped, rx_clock, rx_eof, rx_read = state
+        if rx_read != self._rx_read:
+            if self._rx_start is None:
+                raise ValueError("UART RX source cannot be rewound (not a file): "
+                                 "replay a program that reads it from cycle 0")
+            self._rx.seek(self._rx_start + rx_read)
+            self._rx_read = rx_read
+        self.fifo.clear()
+        self.fifo.extend(fifo)
+        self.read_data = read_data
+        del self.transmitted[tx_len:]
+        self._tx_pending[:] = pending
+        self._tx_until, self.tx_dropped = tx_until, tx_dropped
+        self.rx_dropped, self._rx_clock, self._rx_eof = rx_dropped, rx_clock, rx_eof
+
+    def flush(self) -> None:
+        if not self._tx_pending:
+            return
+        data = bytes(self._tx_pending)
+        self._tx_pending.clear()
+        if self.tx_stream is not None:
+            self.tx_stream.write(data)
+        if self.on_flush is not None:
+            self.on_flush(data)
@@ -0,0 +1,200 @@
+"""
+Performance counters and hot-loop profiler for the reference model
+==================================================================
+
+Only two numbers are collected while the program runs: how often each PC
+retired (``hist``) and how often it redirected the PC (``redirects``, i.e.
+next PC != PC + 4).  Everything else – counts per mnemonic,
+taken vs. not-taken branches, load/store bytes, basic blocks – is derived
+from those and the predecoded image at report time, so the profiled loop
+costs two list increments per instruction and ``RV32ISim.run`` itself is
+untouched.  MMIO accesses are counted by the model (``sim.mmio_reads`` /
+``sim.mmio_writes``) on the device path only.
+
+On a single-cycle core one retired instruction is one clock, so the
+histogram is also the cycle profile.
+
+Public API
+----------
+Profile(sim)                           -> counters for one RV32ISim
+Profile.run(max_steps)                 -> profiled equivalent of ``sim.run``
+Profile.record(pc, next_pc)            -> count one step (lock-step callers)
+Profile.counters()                     -> JSON-friendly summary dict
+Profile.blocks()                       -> executed basic blocks, hottest first
+Profile.report(source, top)            -> text report, annotated from a .s file
+                                          (disassembly where it has no line)
+load_source(path)                      -> {pc: line} from ``_XX: ...`` labels
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from collections import Counter
+from typing import NamedTuple
+
+from Helper_Decode import DECODED_FIELDS, format_instr
+
+_CONTROL   = ("BRANCH", "JAL", "JALR")
+_MEM_SIZES = {0: 1, 1: 2, 2: 4}            # funct3 & 3 → access size (f3=6 → word)
+_LABEL     = re.compile(r"^\s*_([0-9A-Fa-f]+):\s*(.*?)\s*$")
+
+
+def load_source(path: str | os.PathLike) -> dict[int, str]:
+    """Map PC → source text for every ``_XX: mnemonic ...`` line of *path*."""
+    lines: dict[int, str] = {}
+    with open(path) as fh:
+        for line in fh:
+            m = _LABEL.match(line)
+            if m:
+                lines[int(m.group(1), 16)] = m.group(2)
+    return lines
+
+
+def disassemble_one(ins) -> str:
+    """Assembly text for a ``RISCVInstruction`` (no NumPy needed)."""
+    return format_instr(*(getattr(ins, name) for name, _ in DECODED_FIELDS))
+
+
+def _mnemonic(ins) -> str:
+    """``"lbu"``, ``"lui"`` …: funct3/funct7 only where they select the operation."""
+    return disassemble_one(ins).split()[0]
+
+
+class Block(NamedTuple):
+    start:   int           # PC of the first instruction
+    length:  int           # instructions
+    entries: int           # times the block was executed
+
+    @property
+    def retired(self) -> int:
+        return self.entries * self.length
+
+
+class Profile:
+    """PC histogram + redirect counts for *sim*'s current program image."""
+
+    __slots__ = ("sim", "hist", "redirects")
+
+    def __init__(self, sim):
+        self.sim = sim
+        self.reset()
+
+    def reset(self) -> None:
+        """Zero the counters (also needed after ``sim.load_program``)."""
+        n = len(self.sim._ops)
+        self.hist      = [0] * n
+        self.redirects = [0] * n
+
+    # ------------- collection ------------------------------------------- #
+    def record(self, pc: int, next_pc: int) -> None:
+        idx = pc >> 2
+        self.hist[idx] += 1
+        if next_pc != pc + 4:
+            self.redirects[idx] += 1
+
+    def run(self, max_steps: int | None = None) -> int:
+        """:meth:`RV32ISim.run` plus the two counters; return steps taken."""
+        sim   = self.sim
+        ops   = sim._ops
+        n_ops = len(ops)
+        hist, redirects = self.hist, self.redirects
+        start = sim.retired
+        stop  = -1 if max_steps is None else start + max_steps
+        pc    = sim.pc
+        try:
+            while sim.retired != stop:
+                idx = pc >> 2
+                if idx >= n_ops:
+                    break
+                op = ops[idx]
+                if op is None:
+                    break
+                fn, rd, rs1, rs2, imm = op
+                hist[idx] += 1
+                nxt = fn(sim, pc, rd, rs1, rs2, imm) & 0xFFFF_FFFF
+                if nxt != pc + 4:
+                    redirects[idx] += 1
+                pc = nxt
+                sim.retired += 1
+        finally:
+            sim.pc = pc
+            sim.bus.flush()
+        return sim.retired - start
+
+    # ------------- derived counters ------------------------------------- #
+    def counters(self) -> dict:
+        by_class: Counter[str] = Counter()
+        taken = not_taken = load_bytes = store_bytes = 0
+        for idx, n in enumerate(self.hist):
+            if not n:
+                continue
+            ins = self.sim.decoded[idx]
+            by_class[_mnemonic(ins)] += n
+            if ins.inst_type == "BRANCH":
+                taken     += self.redirects[idx]
+                not_taken += n - self.redirects[idx]
+            elif ins.inst_type == "LOAD":
+                load_bytes  += n * _MEM_SIZES.get(ins.funct3 & 3, 4)
+            elif ins.inst_type == "STORE":
+                store_bytes += n * _MEM_SIZES.get(ins.funct3 & 3, 4)
+        return {
+            "retired":       sum(self.hist),
+            "by_class":      dict(sorted(by_class.items())),
+            "branches":      {"taken": taken, "not_taken": not_taken},
+            "load_bytes":    load_bytes,
+            "store_bytes":   store_bytes,
+            "mmio":          {"reads": self.sim.mmio_reads,
+                              "writes": self.sim.mmio_writes},
+        }
+
+    def _leaders(self) -> set[int]:
+        """Block starts: PC 0, control-flow targets and fall-throughs, plus any
+        change in execution count (catches JALR targets and mid-block exits)."""
+        hist = self.hist
+        lead = {0}
+        for idx, ins in enumerate(self.sim.decoded):
+            if ins.inst_type in _CONTROL:
+                lead.add(idx + 1)
+                if ins.inst_type != "JALR":
+                    lead.add(idx + (ins.imm >> 2))
+            if idx and hist[idx] != hist[idx - 1]:
+                lead.add(idx)
+        return lead
+
+    def blocks(self) -> list[Block]:
+        """Executed basic blocks, most retired instructions first."""
+        hist, ops = self.hist, self.sim._ops
+        lead = self._leaders()
+        out: list[Block] = []
+        idx = 0
+        while idx < len(hist):
+            if not hist[idx]:
+                idx += 1
+                continue
+            end = idx + 1
+            while end < len(hist) and end not in lead and ops[end] is not None:
+                end += 1
+            out.append(Block(idx << 2, end - idx, hist[idx]))
+            idx = end
+        out.sort(key=lambda b: (-b.retired, b.start))
+        return out
+
+    # ------------- report ----------------------------------------------- #
+    def report(self, source: str | os.PathLike | None = None, top: int = 5) -> str:
+        src   = load_source(source) if source and os.path.exists(source) else {}
+        c     = self.counters()
+        total = c["retired"] or 1
+        rows  = [f"retired {c['retired']}  "
+                 f"branches taken/not {c['branches']['taken']}/{c['branches']['not_taken']}  "
+                 f"load/store bytes {c['load_bytes']}/{c['store_bytes']}  "
+                 f"mmio r/w {c['mmio']['reads']}/{c['mmio']['writes']}",
+                 "by class: " + "  ".join(f"{k}:{v}" for k, v in c["by_class"].items())]
+        for rank, blk in enumerate(self.blocks()[:top], 1):
+            rows.append(f"#{rank} block 0x{blk.start:02X}  {blk.length} instr × "
+                        f"{blk.entries}  = {blk.retired} ({100 * blk.retired / total:.1f}%)")
+            for pc in range(blk.start, blk.start + 4 * blk.length, 4):
+                idx  = pc >> 2
+                text = src.get(pc) or disassemble_one(self.sim.decoded[idx])
+                rows.append(f"    _{pc:02X}: {self.hist[idx]:10d}  {text}")
+        return "\n".join(rows)
@@ -0,0 +1,292 @@
+"""
+Constrained-random RV32I program generator
+==========================================
+
+Builds programs that run to completion on both the RTL and the reference
+model, so large batches can be pushed through ``regress.py``:
+
+* at most ``words`` instruction words (64 = ``Instruction_memory.v`` depth),
+  the last one the halting all-zero word;
+* only forward branches/jumps, except the back-edge of counted loops
+  (``x31`` is the loop counter and never a random destination);
+* naturally aligned loads and stores below ``mem_size`` and outside the UART
+  window, and loads only from bytes the program has already stored, so the
+  result never depends on uninitialised RAM;
+* the custom NOT encoding, shift amounts 0/31 and 12-bit immediate edges are
+  drawn on purpose;
+* SLTIU immediates are never negative: the model compares SLTIU against the
+  signed immediate (``Helper_ISS._op_sltiu``) where the RTL compares against
+  its unsigned sign-extension, so a negative one would be a false mismatch.
+  The ``imm:sltiu:neg`` coverage bin is therefore never hit by these
+  programs.
+
+Every program is run on ``RV32ISim`` before it is returned, which guarantees
+it halts within the step budget.
+
+Program *i* of a batch depends only on ``(seed, i)``, so a failing program
+can be regenerated alone with ``--seed S --first i --count 1``.
+
+Public API
+----------
+ProgramGenerator(rng, words, mem_size) -> generator bound to one random.Random
+ProgramGenerator.generate()            -> list of instruction words
+to_hex_lines(words)                    -> lines in ``Instructions.hex`` format
+generate_batch(seed, count, out_dir)   -> write ``rand_<seed>_<i>.hex`` files
+main(argv)                             -> CLI, see ``python Helper_RandProg.py -h``
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+from Helper_Decode import DECODED_FIELDS, format_instr
+from Helper_lib import RISCVInstruction
+from Helper_ISS import RV32ISim
+
+enc = RISCVInstruction.encode
+
+OP_R, OP_I, OP_LOAD, OP_STORE = 0x33, 0x13, 0x03, 0x23
+OP_BRANCH, OP_JAL, OP_JALR, OP_LUI, OP_AUIPC = 0x63, 0x6F, 0x67, 0x37, 0x17
+
+LOOP_REG = 31
+
+# (funct3, funct7) of every R-type variant the core implements; (1, 0x20) is NOT
+_R_VARIANTS = ((0, 0x00), (0, 0x20), (1, 0x00), (2, 0x00), (3, 0x00), (4, 0x00),
+               (5, 0x00), (5, 0x20), (6, 0x00), (7, 0x00), (1, 0x20))
+_IMM_EDGES  = (-2048, -1, 0, 1, 2047)
+# (funct3, size) – LB LH LW LBU LHU / SB SH SW
+_LOADS  = ((0, 1), (1, 2), (2, 4), (4, 1), (5, 2))
+_STORES = ((0, 1), (1, 2), (2, 4))
+_MAX_STEPS = 100_000
+
+
+def to_hex_lines(words: list[int]) -> list[str]:
+    """``93 0F 20 43`` – one little-endian word per line."""
+    return [" ".join(f"{b:02X}" for b in w.to_bytes(4, "little")) for w in words]
+
+
+def to_asm_lines(words: list[int]) -> list[str]:
+    """``_XX: mnemonic ...`` listing in the style of ``instructions.s``."""
+    rows = []
+    for i, w in enumerate(words):
+        ins = RISCVInstruction.from_word(w)
+        rows.append(f"_{4 * i:02X}: "
+                    + format_instr(*(getattr(ins, name) for name, _ in DECODED_FIELDS)))
+    return rows
+
+
+class ProgramGenerator:
+    """One program per :meth:`generate` call, all randomness from *rng*."""
+
+    __slots__ = ("rng", "words", "mem_size", "_prog", "_stored")
+
+    SEGMENTS = (("alu", 6), ("mem", 3), ("skip_branch", 2), ("skip_jump", 1),
+                ("loop", 2))
+
+    def __init__(self, rng: random.Random, words: int = 64,
+                 mem_size: int = RV32ISim.MEM_SIZE):
+        self.rng      = rng
+        self.words    = words
+        self.mem_size = mem_size
+
+    # ------------- building blocks -------------------------------------- #
+    def _rd(self) -> int:
+        # x0 now and then: writes to it must be dropped by the RTL too
+        return 0 if self.rng.random() < 0.05 else self.rng.randrange(1, LOOP_REG)
+
+    def _rs(self) -> int:
+        return self.rng.randrange(32)
+
+    def _imm12(self) -> int:
+        r = self.rng
+        return r.choice(_IMM_EDGES) if r.random() < 0.2 else r.randint(-2048, 2047)
+
+    def _shamt(self) -> int:
+        r = self.rng
+        return r.choice((0, 31)) if r.random() < 0.3 else r.randrange(32)
+
+    def _alu(self, rd: int | None = None) -> int:
+        """One register-writing instruction that cannot redirect or fault."""
+        r  = self.rng
+        rd = self._rd() if rd is None else rd
+        k  = r.random()
+        if k < 0.40:
+            f3, f7 = r.choice(_R_VARIANTS)
+            rs2 = 0 if (f3, f7) == (1, 0x20) else self._rs()
+            return enc(OP_R, rd, f3, self._rs(), rs2, f7)
+        if k < 0.60:
+            f3 = r.choice((1, 5))
+            f7 = 0x20 if f3 == 5 and r.random() < 0.5 else 0
+            return enc(OP_I, rd, f3, self._rs(), imm=f7 << 5 | self._shamt())
+        if k < 0.90:
+            f3  = r.choice((0, 2, 3, 4, 6, 7))
+            imm = self._imm12()
+            if f3 == 3:
+                # the model compares SLTIU against the signed immediate
+                imm = abs(imm) & 0x7FF
+            return enc(OP_I, rd, f3, self._rs(), imm=imm)
+        return enc(r.choice((OP_LUI, OP_AUIPC)), rd, imm=r.getrandbits(32))
+
+    def _emit(self, *words: int) -> None:
+        self._prog.extend(words)
+
+    def _room(self) -> int:
+        return self.words - 1 - len(self._prog)     # last word halts
+
+    def _address(self, size: int) -> int:
+        uart = range(RV32ISim.UART_BASE, RV32ISim.UART_BASE + 8)
+        while True:
+            addr = self.rng.randrange(0, self.mem_size - 3, size)
+            if addr not in uart and addr + size - 1 not in uart:
+                return addr
+
+    def _const(self, rd: int, value: int) -> list[int]:
+        """ADDI, or LUI + ADDI, that leaves *value* in *rd*."""
+        lo = (value & 0xFFF) - (0x1000 if value & 0x800 else 0)
+        if value == lo:
+            return [enc(OP_I, rd, 0, 0, imm=lo)]
+        return [enc(OP_LUI, rd, imm=(value - lo) & 0xFFFF_F000), enc(OP_I, rd, 0, rd, imm=lo)]
+
+    def _mem_op(self, opcode: int, f3: int, reg: int, addr: int) -> None:
+        """Access *addr* via x0 + imm, or via a fresh base register + negative imm."""
+        r = self.rng
+        if addr < 2048 and r.random() < 0.5:
+            base, imm = 0, addr
+        else:
+            base = r.randrange(1, LOOP_REG)
+            imm  = 0 if r.random() < 0.25 else -r.randint(1, 64)
+            self._emit(*self._const(base, addr - imm))
+        if opcode == OP_STORE:
+            self._emit(enc(OP_STORE, 0, f3, base, reg, imm=imm))
+        else:
+            self._emit(enc(OP_LOAD, reg, f3, base, imm=imm))
+
+    # ------------- segments --------------------------------------------- #
+    def _seg_alu(self) -> None:
+        self._emit(self._alu())
+
+    def _seg_mem(self) -> None:
+        r = self.rng
+        if self._stored and r.random() < 0.6 and self._room() >= 3:
+            # load something that was stored: pick a stored byte, widen if possible
+            # (the model range-checks every load as a full word)
+            addr = r.choice(sorted(a for a in self._stored if a <= self.mem_size - 4))
+            fits = [(f3, size) for f3, size in _LOADS
+                    if not addr % size and all(a in self._stored
+                                               for a in range(addr, addr + size))]
+            if fits:
+                f3, _ = r.choice(fits)
+                self._mem_op(OP_LOAD, f3, self._rd(), addr)
+                return
+        if self._room() < 3:
+            return self._seg_alu()
+        f3, size = r.choice(_STORES)
+        addr = self._address(size)
+        self._mem_op(OP_STORE, f3, self._rs(), addr)
+        self._stored.update(range(addr, addr + size))
+
+    def _seg_skip_branch(self) -> None:
+        k = self.rng.randint(1, 3)
+        if self._room() < k + 1:
+            return self._seg_alu()
+        f3 = self.rng.choice((0, 1, 4, 5, 6, 7))
+        self._emit(enc(OP_BRANCH, 0, f3, self._rs(), self._rs(), imm=4 * (k + 1)))
+        self._emit(*(self._alu() for _ in range(k)))
+
+    def _seg_skip_jump(self) -> None:
+        k = self.rng.randint(1, 3)
+        if self._room() < k + 1:
+            return self._seg_alu()
+        if self.rng.random() < 0.5:
+            self._emit(enc(OP_JAL, self._rd(), imm=4 * (k + 1)))
+        else:
+            # absolute target, via x0 or via a base register and a non-positive imm
+            base, imm = 0, 0
+            if self._room() >= k + 2 and self.rng.random() < 0.5:
+                base, imm = self.rng.randrange(1, LOOP_REG), -self.rng.randint(0, 16)
+            target = 4 * (len(self._prog) + (1 if base else 0) + k + 1)   # ADDI base
+            if base:
+                self._emit(*self._const(base, target - imm))
+                target = imm
+            self._emit(enc(OP_JALR, self._rd(), 0, base, imm=target))
+        self._emit(*(self._alu() for _ in range(k)))
+
+    def _seg_loop(self) -> None:
+        r = self.rng
+        k = r.randint(1, 4)
+        if self._room() < k + 3:
+            return self._seg_alu()
+        self._emit(enc(OP_I, LOOP_REG, 0, 0, imm=r.randint(1, 8)))
+        self._emit(*(self._alu() for _ in range(k)))
+        self._emit(enc(OP_I, LOOP_REG, 0, LOOP_REG, imm=-1))
+        back = -4 * (k + 1)
+        rs1, rs2, f3 = r.choice(((LOOP_REG, 0, 1),     # bne  x31, x0
+                                 (0, LOOP_REG, 4),     # blt  x0, x31
+                                 (LOOP_REG, 0, 5),     # bge  x31, x0 (one extra pass)
+                                 (0, LOOP_REG, 6)))    # bltu x0, x31
+        self._emit(enc(OP_BRANCH, 0, f3, rs1, rs2, imm=back))
+
+    # ------------- whole program ---------------------------------------- #
+    def generate(self) -> list[int]:
+        r = self.rng
+        self._prog   = []
+        self._stored = set()
+        # seed a few registers with full 32-bit values
+        for rd in r.sample(range(1, LOOP_REG), 3):
+            self._emit(*self._const(rd, r.getrandbits(32)))
+        names, weights = zip(*self.SEGMENTS)
+        while self._room() > 0:
+            getattr(self, f"_seg_{r.choices(names, weights)[0]}")()
+        words = self._prog + [0]
+
+        sim = RV32ISim(to_hex_lines(words), self.mem_size)
+        sim.run(_MAX_STEPS)
+        if not sim.halted():
+            raise RuntimeError("generated program did not halt")    # generator bug
+        return words
+
+
+def generate_batch(seed: int, count: int, out_dir: str | os.PathLike,
+                   first: int = 0, asm: bool = False, **kwargs) -> list[Path]:
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(first, first + count):
+        words = ProgramGenerator(random.Random(f"{seed}:{i}"), **kwargs).generate()
+        path  = out / f"rand_{seed}_{i:05d}.hex"
+        path.write_text("\n".join(to_hex_lines(words)) + "\n")
+        if asm:
+            path.with_suffix(".s").write_text("\n".join(to_asm_lines(words)) + "\n")
+        paths.append(path)
+    return paths
+
+
+# --------------------------------------------------------------------------- #
+#  CLI                                                                        #
+# --------------------------------------------------------------------------- #
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Generate constrained-random RV32I programs.")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--count", type=int, default=1)
+    ap.add_argument("--first", type=int, default=0, help="index of the first program")
+    ap.add_argument("--out", default="random_programs", help="output directory")
+    ap.add_argument("--words", type=int, default=64,
+                    help="instruction memory depth in words (default: %(default)s)")
+    ap.add_argument("--mem-size", type=int, default=RV32ISim.MEM_SIZE)
+    ap.add_argument("--asm", action="store_true", help="also write a .s listing")
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    paths = generate_batch(args.seed, args.count, args.out, args.first, args.asm,
+                           words=args.words, mem_size=args.mem_size)
+    print(f"{len(paths)} programs in {args.out}/ ({time.perf_counter() - t0:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,6 @@
+import logging
+from collections import deque
+
 INDENT = "                               "          # ← eight spaces   (change to "\t\t" if you prefer real tabs)
 def ToHex(value):
     try:
@@ -6,48 +9,103 @@ def ToHex(value):
         ret = "0b" + str(value)
     return ret
 
-def Log_Datapath(dut, logger):
-    sigs = {
-        "Instruction" : ToHex(dut.datapath_i.Instruction.value),
-        "A3"          : ToHex(dut.datapath_i.RF.A3.value),
-        "WD3"         : ToHex(dut.datapath_i.RF.WD3.value),
-        "RegWrite"    : ToHex(dut.datapath_i.RegWrite.value),
-        "MemWrite"    : ToHex(dut.datapath_i.MemWrite.value),
-        "ALUSrc"      : ToHex(dut.datapath_i.ALUSrc.value),
-        "PCSrc"       : ToHex(dut.datapath_i.PCSrc.value),
-        "ResultSrc"   : ToHex(dut.datapath_i.ResultSrc.value),
-        "Size_Write"  : ToHex(dut.datapath_i.Size_Write.value),
-        "ReadDataMode": ToHex(dut.datapath_i.ReadDataMode.value),
-        "ImmSrc"      : ToHex(dut.datapath_i.ImmSrc.value),
-        "ALUControl"  : ToHex(dut.datapath_i.ALUControl.value),
-        "ALUResult"   : ToHex(dut.datapath_i.ALUResult.value),
-        "PCNext"      : ToHex(dut.datapath_i.PCNext.value),
-    }
-    block = ("\n" + INDENT).join(f"{k:12}: {v}" for k, v in sigs.items())
-    logger.info("***** DATAPATH SIGNALS *****\n%s%s", INDENT, block)
-
-
-def Log_Controller(dut, logger):
-    sigs = {
-        "RegWrite" : ToHex(dut.datapath_i.RegWrite.value),
-        "MemWrite" : ToHex(dut.datapath_i.MemWrite.value),
-        "ALUSrc"   : ToHex(dut.datapath_i.ALUSrc.value),
-        "PCSrc"    : ToHex(dut.datapath_i.PCSrc.value),
-        "ResultSrc": ToHex(dut.datapath_i.ResultSrc.value),
-        "ImmSrc"   : ToHex(dut.datapath_i.ImmSrc.value),
-        "ALUCtrl"  : ToHex(dut.datapath_i.ALUControl.value),
-        # add more control-path wires if you like …
-    }
-    block = ("\n" + INDENT).join(f"{k:12}: {v}" for k, v in sigs.items())
-    logger.info("***** CONTROLLER SIGNALS *****\n%s%s", INDENT, block)
+# (label, path below dut.datapath_i) – handles are only touched when a dump
+# is actually going to be emitted
+DATAPATH_SIGNALS = (
+    ("Instruction" , "Instruction"),
+    ("A3"          , "RF.A3"),
+    ("WD3"         , "RF.WD3"),
+    ("RegWrite"    , "RegWrite"),
+    ("MemWrite"    , "MemWrite"),
+    ("ALUSrc"      , "ALUSrc"),
+    ("PCSrc"       , "PCSrc"),
+    ("ResultSrc"   , "ResultSrc"),
+    ("Size_Write"  , "Size_Write"),
+    ("ReadDataMode", "ReadDataMode"),
+    ("ImmSrc"      , "ImmSrc"),
+    ("ALUControl"  , "ALUControl"),
+    ("ALUResult"   , "ALUResult"),
+    ("PCNext"      , "PCNext"),
+)
+
+CONTROLLER_SIGNALS = (
+    ("RegWrite" , "RegWrite"),
+    ("MemWrite" , "MemWrite"),
+    ("ALUSrc"   , "ALUSrc"),
+    ("PCSrc"    , "PCSrc"),
+    ("ResultSrc", "ResultSrc"),
+    ("ImmSrc"   , "ImmSrc"),
+    ("ALUCtrl"  , "ALUControl"),
+    # add more control-path wires if you like …
+)
+
+
+def _handle(dut, path):
+    h = dut.datapath_i
+    for part in path.split("."):
+        h = getattr(h, part)
+    return h
+
+
+class _Block:
+    """
+    ``label: value`` rows, formatted only when the log record is – which an
+    off-thread sink (``Helper_Log``) does after the cycle, not during it.
+    """
+    __slots__ = ("labels", "values")
+
+    def __init__(self, labels, values):
+        self.labels = labels
+        self.values = values
+
+    def __str__(self):
+        return ("\n" + INDENT).join(
+            f"{k:12}: {ToHex(v)}" for k, v in zip(self.labels, self.values))
+
+
+def _log_block(dut, logger, level, title, signals):
+    values = [_handle(dut, path).value for _, path in signals]
+    logger.log(level, "***** %s *****\n%s%s", title, INDENT,
+               _Block([label for label, _ in signals], values))
+
+
+def Log_Datapath(dut, logger, level=logging.DEBUG):
+    if logger.isEnabledFor(level):
+        _log_block(dut, logger, level, "DATAPATH SIGNALS", DATAPATH_SIGNALS)
+
+
+def Log_Controller(dut, logger, level=logging.DEBUG):
+    if logger.isEnabledFor(level):
+        _log_block(dut, logger, level, "CONTROLLER SIGNALS", CONTROLLER_SIGNALS)
 
 # ──────────────────────────────────────────────────────────────────────
 #  Pretty register dump (x0–x31)                                        #
 # ──────────────────────────────────────────────────────────────────────
-def Log_Registers(dut, logger):
+class _Registers:
+    """x0…x31 in rows of eight, formatted on demand like :class:`_Block`."""
+    __slots__ = ("values",)
+
+    def __init__(self, values):
+        self.values = values
+
+    def __str__(self):
+        words = []
+        for idx, bv in enumerate(self.values):
+            # get the raw bit-string, replace any x/X with '0'
+            bitstr = bv.binstr.replace('x','0').replace('X','0')
+            words.append(f"x{idx:02d}:{int(bitstr, 2):08x}")
+        # 8 regs per line
+        lines = ["  ".join(words[i:i+8]) for i in range(0, 32, 8)]
+        return ("\n" + "        ").join(lines)
+
+
+def Log_Registers(dut, logger, level=logging.DEBUG):
     """
     Pretty-print x0…x31 from RF.Reg_Out[*], resolving 'x' bits as 0.
+    Nothing is read from the simulator unless *level* is enabled.
     """
+    if not logger.isEnabledFor(level):
+        return
     rf = dut.datapath_i.RF
     try:
         arr = rf.Reg_Out
@@ -55,19 +113,66 @@ def Log_Registers(dut, logger):
         logger.warning("RF.Reg_Out not visible — skipping register dump")
         return
 
-    words = []
-    for idx in range(32):
-        handle = arr[idx]
-        bv = handle.value  # this is a BinaryValue
-        # get the raw bit-string, replace any x/X with '0'
-        bitstr = bv.binstr.replace('x','0').replace('X','0')
-        # parse it
-        val = int(bitstr, 2)
-        words.append(f"x{idx:02d}:{val:08x}")
-
-    # 8 regs per line
-    lines = ["  ".join(words[i:i+8]) for i in range(0, 32, 8)]
+    # read the values now (BinaryValue snapshots), format them later
+    values = [arr[idx].value for idx in range(32)]
     INDENT = "        "
-    logger.info("***** REGISTERS *****\n%s%s", INDENT, ("\n"+INDENT).join(lines))
+    logger.log(level, "***** REGISTERS *****\n%s%s", INDENT, _Registers(values))
+
+
+# ──────────────────────────────────────────────────────────────────────
+#  Flight recorder: last N cycles of datapath signals, dumped on failure
+# ──────────────────────────────────────────────────────────────────────
+class FlightRecorder:
+    """
+    Ring buffer of raw signal values.  ``snapshot`` only copies the values
+    (no formatting); ``dump`` formats the retained cycles, typically from an
+    ``except AssertionError`` just before the failure propagates.
+    """
+
+    def __init__(self, dut, depth=16, signals=DATAPATH_SIGNALS):
+        self.labels  = [label for label, _ in signals]
+        self.handles = [_handle(dut, path) for _, path in signals]
+        self.ring    = deque(maxlen=depth)
+
+    def snapshot(self, cycle):
+        self.ring.append((cycle, [h.value for h in self.handles]))
+
+    def dump(self, logger, level=logging.ERROR):
+        logger.log(level, "***** FLIGHT RECORDER (last %d cycles) *****", len(self.ring))
+        for cycle, values in self.ring:
+            logger.log(level, "[%2d]\n%s%s", cycle, INDENT, _Block(self.labels, values))
+
+
+# ──────────────────────────────────────────────────────────────────────
+#  Wave recorder: every cycle of selected signals into binary columns
+# ──────────────────────────────────────────────────────────────────────
+WAVE_SIGNALS = (("PC", "PC"),) + DATAPATH_SIGNALS
+
+
+def _unsigned(bv):
+    # 'x'/'z' bits read as 0, like Log_Registers
+    try:
+        return bv.integer
+    except ValueError:
+        return int(bv.binstr.replace('x','0').replace('X','0')
+                            .replace('z','0').replace('Z','0'), 2)
+
+
+class WaveRecorder:
+    """
+    ``snapshot`` appends the current values of *signals* as one row of a
+    ``Helper_Wave`` directory; query it afterwards with ``WaveReader`` or
+    ``python Helper_Wave.py <dir> --where ...``.
+    """
+
+    def __init__(self, dut, path, signals=WAVE_SIGNALS, chunk=4096):
+        from Helper_Wave import WaveWriter       # NumPy only when recording
+        self.handles = [_handle(dut, p) for _, p in signals]
+        self.writer  = WaveWriter(path, [(label, len(h)) for (label, _), h
+                                         in zip(signals, self.handles)], chunk)
 
+    def snapshot(self, cycle):
+        self.writer.append(cycle, [_unsigned(h.value) for h in self.handles])
 
+    def close(self):
+        self.writer.close()
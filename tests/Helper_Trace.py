@@ -0,0 +1,191 @@
+"""
+Golden-trace record / replay for the reference model
+====================================================
+
+The reference model's effect on every cycle is one (PC, written register,
+value) triple.  Recording those once per program lets a cocotb run compare
+the DUT against a file instead of executing the Python model in lock-step.
+
+File layout (little-endian)::
+
+    header : b"RVGT" | u16 version | u16 record size | 32-byte image SHA-256
+    record : u32 next_pc | u8 rd | u32 value          (rd = 0 → no write)
+
+Traces are cached as ``<cache_dir>/<key>.rvgt``.  The key covers the
+instruction words (trailing zero padding ignored), the memory size and the
+model itself – ``VERSION`` and the sources in ``MODEL_SOURCES`` – so the
+same program is recorded once per model revision, and a change to the
+model's behaviour never replays a stale trace.
+
+Public API
+----------
+image_hash(hex_lines)                  -> hex digest of the program words
+model_hash()                           -> hex digest of VERSION + model sources
+trace_key(hex_lines, mem_size)         -> cache key: image + memory size + model
+TraceWriter(path, digest)              -> append records, context manager
+TraceReader(path)                      -> iterate (pc, rd, value) records
+record_trace(sim, path, digest)        -> run an RV32ISim, write its trace
+ensure_trace(hex_lines, cache_dir)     -> path of the (possibly new) trace
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import hashlib
+import os
+import struct
+import sys
+from pathlib import Path
+
+from Helper_lib import image_words, read_file_to_list
+from Helper_ISS import RV32ISim
+
+MAGIC    = b"RVGT"
+VERSION  = 1
+_HEADER  = struct.Struct("<4sHH32s")
+_RECORD  = struct.Struct("<IBI")
+_CHUNK   = 4096                        # records per write / read
+
+# modules that decide what the model does on a cycle; editing one of them
+# changes every cache key
+MODEL_SOURCES = ("Helper_ISS.py", "Helper_MMIO.py", "Helper_lib.py", "Helper_Trace.py")
+
+
+def image_hash(hex_lines: list[str]) -> str:
+    """SHA-256 over the program words; zero padding does not change it."""
+    words = image_words([h.replace(" ", "") for h in hex_lines])
+    while words and words[-1] == 0:
+        words.pop()
+    return hashlib.sha256(struct.pack(f"<{len(words)}I", *words)).hexdigest()
+
+
+@functools.cache
+def model_hash() -> str:
+    """SHA-256 over the trace format version and the model's source files."""
+    here = Path(__file__).resolve().parent
+    h = hashlib.sha256(b"RVGT v%d\n" % VERSION)
+    for name in MODEL_SOURCES:
+        h.update(name.encode() + b"\0")
+        h.update((here / name).read_bytes().replace(b"\r\n", b"\n"))
+    return h.hexdigest()
+
+
+def trace_key(hex_lines: list[str], mem_size: int = RV32ISim.MEM_SIZE) -> str:
+    """Cache key of the golden trace of *hex_lines* on the current model."""
+    key = f"{image_hash(hex_lines)}:{mem_size}:{model_hash()}"
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+# --------------------------------------------------------------------------- #
+#  Writer / reader                                                            #
+# --------------------------------------------------------------------------- #
+class TraceWriter:
+    """Buffered writer; records are packed into one chunk before hitting disk."""
+
+    __slots__ = ("_fh", "_buf", "_n", "count")
+
+    def __init__(self, path: str | os.PathLike, digest: str):
+        self._fh = open(path, "wb")
+        self._fh.write(_HEADER.pack(MAGIC, VERSION, _RECORD.size,
+                                    bytes.fromhex(digest)))
+        self._buf  = bytearray(_RECORD.size * _CHUNK)
+        self._n    = 0
+        self.count = 0
+
+    def append(self, pc: int, rd: int, value: int) -> None:
+        _RECORD.pack_into(self._buf, self._n * _RECORD.size, pc, rd, value)
+        self._n += 1
+        if self._n == _CHUNK:
+            self.flush()
+
+    def flush(self) -> None:
+        self._fh.write(memoryview(self._buf)[: self._n * _RECORD.size])
+        self.count += self._n
+        self._n = 0
+
+    def close(self) -> None:
+        self.flush()
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TraceReader:
+    """Streams ``(next_pc, rd, value)`` tuples chunk by chunk."""
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = Path(path)
+        with open(self.path, "rb") as fh:
+            magic, version, rec_size, digest = _HEADER.unpack(fh.read(_HEADER.size))
+        if magic != MAGIC or version != VERSION or rec_size != _RECORD.size:
+            raise ValueError(f"{self.path}: not a v{VERSION} golden trace")
+        self.digest = digest.hex()
+
+    def __len__(self) -> int:
+        return (self.path.stat().st_size - _HEADER.size) // _RECORD.size
+
+    def __iter__(self):
+        with open(self.path, "rb") as fh:
+            fh.seek(_HEADER.size)
+            while chunk := fh.read(_RECORD.size * _CHUNK):
+                yield from _RECORD.iter_unpack(chunk)
+
+
+# --------------------------------------------------------------------------- #
+#  Recording                                                                  #
+# --------------------------------------------------------------------------- #
+def record_trace(sim: RV32ISim, path: str | os.PathLike, digest: str,
+                 max_steps: int | None = None) -> int:
+    """Run *sim* to completion, writing one record per retired instruction."""
+    written, rf = sim.written, sim.rf
+    budget = -1 if max_steps is None else max_steps
+    steps  = 0
+    with TraceWriter(path, digest) as tw:
+        while steps != budget and not sim.halted():
+            rd = written[sim.pc >> 2]
+            sim.step()
+            tw.append(sim.pc, rd, rf[rd])
+            steps += 1
+    return steps
+
+
+def ensure_trace(hex_lines: list[str], cache_dir: str | os.PathLike = "trace_cache",
+                 mem_size: int = RV32ISim.MEM_SIZE) -> Path:
+    """Return the cached trace for *hex_lines*, recording it first if needed."""
+    digest = image_hash(hex_lines)
+    path   = Path(cache_dir) / f"{trace_key(hex_lines, mem_size)}.rvgt"
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        record_trace(RV32ISim(hex_lines, mem_size), tmp, digest)
+        os.replace(tmp, path)              # atomic: parallel runs never see half a file
+    return path
+
+
+# --------------------------------------------------------------------------- #
+#  CLI                                                                        #
+# --------------------------------------------------------------------------- #
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Record or inspect a golden trace.")
+    ap.add_argument("hex", nargs="?", default="Instructions.hex")
+    ap.add_argument("--cache-dir", default="trace_cache")
+    ap.add_argument("--dump", action="store_true", help="print the records")
+    args = ap.parse_args(argv)
+
+    path = ensure_trace(read_file_to_list(args.hex), args.cache_dir)
+    reader = TraceReader(path)
+    print(f"{path}  ({len(reader)} cycles)")
+    if args.dump:
+        for cyc, (pc, rd, val) in enumerate(reader, 1):
+            wr = f"x{rd:02d}={val:08x}" if rd else "-"
+            print(f"[{cyc:6d}] PC=0x{pc:08X}  {wr}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""
+Bit-level UART driver / monitor for cocotb
+==========================================
+
+Both coroutines work in simulated time rather than clock edges: after a start
+bit is seen, the monitor only wakes up at bit centres (``Timer``), and the
+driver holds each bit for one bit time.  A frame therefore costs ~10 Python
+wake-ups, independent of how many clock cycles the baud divisor implies.
+
+Note the board-perspective port names on ``Single_Cycle_Computer``: the
+peripheral's serial *output* is the ``uart_rx`` port and its serial *input*
+is the ``uart_tx`` port (see the ``datapath_i`` instance).
+
+Public API
+----------
+bit_time(dut, clk_period)              -> one bit in clk_period units
+UartTxMonitor(signal, bit_time, units) -> collects bytes sent by the DUT
+UartRxDriver(signal, bit_time, units)  -> sends bytes into the DUT
+"""
+
+from __future__ import annotations
+
+import cocotb
+from cocotb.queue import Queue
+from cocotb.triggers import FallingEdge, Timer
+
+
+def bit_time(dut, clk_period: int) -> int:
+    """``BAUD_DIV`` of the elaborated peripheral times the uart_clk period."""
+    return int(dut.datapath_i.uart.BAUD_DIV.value) * clk_period
+
+
+class UartTxMonitor:
+    """Decodes 8N1 frames on *signal*; bytes land in ``received``."""
+
+    def __init__(self, signal, bit_time: int, units: str = "us"):
+        self.signal   = signal
+        self.bit_time = bit_time
+        self.units    = units
+        self.received = bytearray()
+        self.framing_errors = 0
+        self._queue: Queue[int] = Queue()
+        self._task = None
+
+    def start(self) -> "UartTxMonitor":
+        if self._task is None:
+            self._task = cocotb.start_soon(self._run())
+        return self
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.kill()
+            self._task = None
+
+    async def _run(self):
+        bt, units = self.bit_time, self.units
+        while True:
+            await FallingEdge(self.signal)
+            await Timer(bt // 2, units)         # centre of the start bit
+            if self.signal.value.binstr != "0":
+                continue                        # glitch / X, not a start bit
+            byte = 0
+            for i in range(8):                  # LSB first
+                await Timer(bt, units)
+                byte |= (self.signal.value.binstr == "1") << i
+            await Timer(bt, units)              # stop bit
+            if self.signal.value.binstr != "1":
+                self.framing_errors += 1
+                continue
+            self.received.append(byte)
+            self._queue.put_nowait(byte)
+
+    async def recv(self, n: int = 1) -> bytes:
+        """Wait for the next *n* bytes."""
+        return bytes([await self._queue.get() for _ in range(n)])
+
+
+class UartRxDriver:
+    """Drives 8N1 frames onto *signal* (idle high)."""
+
+    def __init__(self, signal, bit_time: int, units: str = "us"):
+        self.signal   = signal
+        self.bit_time = bit_time
+        self.units    = units
+        signal.value  = 1
+
+    async def send(self, data: bytes, gap_bits: int = 0) -> None:
+        for byte in data:
+            for bit in [0, *((byte >> i) & 1 for i in range(8)), 1]:
+                self.signal.value = bit
+                await Timer(self.bit_time, self.units)
+            if gap_bits:
+                await Timer(self.bit_time * gap_bits, self.units)
@@ -0,0 +1,299 @@
+"""
+Columnar per-cycle signal traces
+================================
+
+A wave directory holds one append-only binary file per signal plus
+``meta.json``::
+
+    wave/
+      meta.json          {"version": 1, "columns": [["cycle", "<u8"], ["PC", "<u4"], ...]}
+      cycle.bin          little-endian uint64, one value per recorded cycle
+      PC.bin             fixed width by signal size: u1 / u2 / u4 / u8
+      ...
+
+``WaveWriter`` buffers rows in memory and appends every column in chunks,
+so a run costs one ``array.extend`` per cycle and a handful of writes per
+few thousand cycles.  ``meta.json`` is written up front: the files of an
+interrupted run are still readable, the row count is that of the shortest
+column.
+
+``WaveReader`` maps the columns read-only (``np.memmap``); a cycle range
+becomes a ``searchsorted`` on the cycle column and zero-copy slices of the
+others, so only the pages touched by a query are read from disk.
+``where()`` takes conditions such as ``"PCSrc == 1 and ALUResult > 0x400"``
+(``and`` binds tighter than ``or``; no parentheses) and returns the
+matching cycles.
+
+Values are unsigned; the test-bench stores X/Z bits as 0.  NumPy is needed
+for this module only.
+
+Public API
+----------
+WaveWriter(path, columns, chunk)       -> writer, columns = [(name, bits), ...]
+WaveWriter.append(cycle, values)       -> one row; cycles must not decrease
+WaveWriter.flush() / close()           -> write buffered rows to the files
+WaveReader(path)                       -> read-only, memory-mapped columns
+WaveReader.column(name)                -> all values of one column
+WaveReader.window(first, last)         -> {name: values} for cycles first..last
+WaveReader.where(cond, first, last)    -> cycles at which *cond* holds
+parse_condition(text)                  -> [[(name, op, value), ...], ...] (OR of ANDs)
+main(argv)                             -> CLI, see ``python Helper_Wave.py -h``
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import operator
+import os
+import re
+import sys
+from array import array
+
+try:
+    import numpy as np
+except ImportError:                        # pragma: no cover - optional dependency
+    np = None
+
+WAVE_VERSION = 1
+META_FILE    = "meta.json"
+CYCLE        = "cycle"
+
+_OPS = {
+    "==": operator.eq, "!=": operator.ne,
+    "<":  operator.lt, "<=": operator.le,
+    ">":  operator.gt, ">=": operator.ge,
+}
+_CLAUSE = re.compile(r"\s*([A-Za-z_]\w*)\s*(==|!=|<=|>=|<|>)\s*(-?(?:0[xX][0-9a-fA-F_]+|0[bB][01_]+|\d[\d_]*))\s*$")
+_OR     = re.compile(r"\s+or\s+|\s*\|\|?\s*")
+_AND    = re.compile(r"\s+and\s+|\s*&&?\s*")
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("Helper_Wave needs NumPy (pip install numpy)")
+
+
+def dtype_for(bits: int) -> str:
+    """Narrowest little-endian unsigned type holding *bits* bits."""
+    if bits <= 0 or bits > 64:
+        raise ValueError(f"signal width {bits} not in 1..64")
+    for width, code in ((8, "u1"), (16, "<u2"), (32, "<u4")):
+        if bits <= width:
+            return code
+    return "<u8"
+
+
+def _column_file(path: str, name: str) -> str:
+    return os.path.join(path, name + ".bin")
+
+
+# --------------------------------------------------------------------------- #
+#  Writing                                                                    #
+# --------------------------------------------------------------------------- #
+class WaveWriter:
+    """Append-only writer of one wave directory; rows are flushed every *chunk*."""
+
+    __slots__ = ("path", "names", "dtypes", "chunk", "_buf", "_files", "_width")
+
+    def __init__(self, path: str | os.PathLike, columns, chunk: int = 4096):
+        _require_numpy()
+        if chunk <= 0:
+            raise ValueError("chunk must be positive")
+        self.path   = os.fspath(path)
+        self.names  = [CYCLE] + [name for name, _ in columns]
+        self.dtypes = ["<u8"] + [dtype_for(bits) for _, bits in columns]
+        if len(set(self.names)) != len(self.names):
+            raise ValueError(f"duplicate column names in {self.names}")
+        for name in self.names:
+            if not re.fullmatch(r"[A-Za-z_]\w*", name):
+                raise ValueError(f"column name {name!r} is not an identifier")
+        self.chunk  = chunk
+        self._width = len(self.names)
+        self._buf   = array("Q")
+
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, META_FILE), "w") as fh:
+            json.dump({"version": WAVE_VERSION,
+                       "columns": [list(c) for c in zip(self.names, self.dtypes)]},
+                      fh, indent=1)
+        self._files = [open(_column_file(self.path, n), "wb") for n in self.names]
+
+    def append(self, cycle: int, values) -> None:
+        buf = self._buf
+        buf.append(cycle)
+        buf.extend(values)
+        if len(buf) >= self.chunk * self._width:
+            self.flush()
+
+    def flush(self) -> None:
+        buf = self._buf
+        if not buf:
+            return
+        if len(buf) % self._width:
+            raise ValueError(f"a row has the wrong number of values "
+                             f"(expected {self._width - 1} per cycle)")
+        rows = np.frombuffer(buf, dtype=np.uint64).reshape(-1, self._width)
+        for j, (fh, dtype) in enumerate(zip(self._files, self.dtypes)):
+            rows[:, j].astype(dtype).tofile(fh)
+            fh.flush()
+        del rows
+        self._buf = array("Q")
+
+    def close(self) -> None:
+        if self._files:
+            try:
+                self.flush()
+            finally:
+                for fh in self._files:
+                    fh.close()
+                self._files = []
+
+    def __enter__(self) -> WaveWriter:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# --------------------------------------------------------------------------- #
+#  Reading                                                                    #
+# --------------------------------------------------------------------------- #
+def parse_condition(text: str) -> list[list[tuple[str, str, int]]]:
+    """``"A == 1 and B > 0x400 or C != 0"`` → ``[[(A,==,1), (B,>,1024)], [(C,!=,0)]]``."""
+    terms = []
+    for part in _OR.split(text.strip()):
+        clauses = []
+        for clause in _AND.split(part):
+            m = _CLAUSE.match(clause)
+            if m is None:
+                raise ValueError(f"cannot parse condition {clause.strip()!r} "
+                                 "(expected NAME OP NUMBER)")
+            name, op, value = m.groups()
+            clauses.append((name, op, int(value, 0)))
+        terms.append(clauses)
+    return terms
+
+
+class WaveReader:
+    """Memory-mapped view of a wave directory written by :class:`WaveWriter`."""
+
+    __slots__ = ("path", "names", "dtypes", "rows", "_maps")
+
+    def __init__(self, path: str | os.PathLike):
+        _require_numpy()
+        self.path = os.fspath(path)
+        with open(os.path.join(self.path, META_FILE)) as fh:
+            meta = json.load(fh)
+        if meta.get("version") != WAVE_VERSION:
+            raise ValueError(f"{self.path}: unsupported wave version {meta.get('version')}")
+        self.names  = [name for name, _ in meta["columns"]]
+        self.dtypes = {name: np.dtype(code) for name, code in meta["columns"]}
+        # a run that stopped mid-flush may have written some columns further
+        self.rows = min(os.path.getsize(_column_file(self.path, n)) // self.dtypes[n].itemsize
+                        for n in self.names)
+        self._maps = {}
+        for name in self.names:
+            dtype = self.dtypes[name]
+            if self.rows:
+                self._maps[name] = np.memmap(_column_file(self.path, name), dtype=dtype,
+                                             mode="r", shape=(self.rows,))
+            else:
+                self._maps[name] = np.empty(0, dtype=dtype)
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def column(self, name: str):
+        try:
+            return self._maps[name]
+        except KeyError:
+            raise KeyError(f"no column {name!r} (have: {', '.join(self.names)})") from None
+
+    def _span(self, first: int | None, last: int | None) -> slice:
+        cycles = self._maps[CYCLE]
+        lo = 0 if first is None else int(np.searchsorted(cycles, first, "left"))
+        hi = self.rows if last is None else int(np.searchsorted(cycles, last, "right"))
+        return slice(lo, max(lo, hi))
+
+    def window(self, first: int | None = None, last: int | None = None,
+               names=None) -> dict:
+        """Values of *names* (default: all) for cycles ``first..last`` inclusive."""
+        span = self._span(first, last)
+        return {name: self.column(name)[span] for name in (names or self.names)}
+
+    def mask(self, cond, first: int | None = None, last: int | None = None):
+        """Boolean array over ``window(first, last)`` rows where *cond* holds."""
+        terms = parse_condition(cond) if isinstance(cond, str) else cond
+        span = self._span(first, last)
+        hit = np.zeros(span.stop - span.start, dtype=bool)
+        for clauses in terms:
+            term = np.ones_like(hit)
+            for name, op, value in clauses:
+                term &= _OPS[op](self.column(name)[span], value)
+            hit |= term
+        return hit
+
+    def where(self, cond, first: int | None = None, last: int | None = None):
+        """Cycles in ``first..last`` at which *cond* holds."""
+        span = self._span(first, last)
+        return np.asarray(self._maps[CYCLE][span][self.mask(cond, first, last)])
+
+
+# --------------------------------------------------------------------------- #
+#  Command line                                                               #
+# --------------------------------------------------------------------------- #
+def _cycle_range(text: str) -> tuple[int | None, int | None]:
+    first, sep, last = text.partition(":")
+    if not sep:
+        return int(first, 0), int(first, 0)
+    return (int(first, 0) if first else None), (int(last, 0) if last else None)
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Query a per-cycle wave directory "
+                                             "(TB_WAVE=<dir> make).")
+    ap.add_argument("wave", help="directory written by WaveWriter")
+    ap.add_argument("--where", metavar="COND",
+                    help='e.g. "PCSrc == 1 and ALUResult > 0x400"')
+    ap.add_argument("--cycles", type=_cycle_range, default=(None, None), metavar="A:B",
+                    help="cycle range, inclusive; either end may be left out")
+    ap.add_argument("--show", default=None, metavar="COLS",
+                    help="comma-separated columns to print (default: all)")
+    ap.add_argument("--count", action="store_true", help="only print the number of rows")
+    ap.add_argument("--limit", type=int, default=100,
+                    help="print at most this many rows, 0 = all (default: %(default)s)")
+    args = ap.parse_args(argv)
+
+    wave = WaveReader(args.wave)
+    first, last = args.cycles
+    try:
+        names = [CYCLE] + [n for n in (args.show.split(",") if args.show else wave.names)
+                           if n and n != CYCLE]
+        cols = wave.window(first, last, names)
+        if args.where:
+            hit = wave.mask(args.where, first, last)
+            cols = {name: values[hit] for name, values in cols.items()}
+    except (KeyError, ValueError) as exc:
+        ap.error(str(exc.args[0]))
+
+    rows = len(cols[CYCLE])
+    if args.count:
+        print(rows)
+        return 0
+    widths = {n: max(len(n), 2 + 2 * wave.dtypes[n].itemsize) for n in names}
+    widths[CYCLE] = max(len(CYCLE), len(str(int(cols[CYCLE][-1])) if rows else ""))
+    print("  ".join(f"{n:>{widths[n]}}" for n in names))
+    shown = rows if args.limit <= 0 else min(rows, args.limit)
+    for i in range(shown):
+        cells = [f"{int(cols[CYCLE][i]):>{widths[CYCLE]}}"]
+        cells += [f"{int(cols[n][i]):#0{2 + 2 * wave.dtypes[n].itemsize}x}".rjust(widths[n])
+                  for n in names[1:]]
+        print("  ".join(cells))
+    if shown < rows:
+        print(f"… {rows - shown} more rows (--limit 0 shows all)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
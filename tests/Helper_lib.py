@@ -9,15 +9,24 @@ Public API
 ----------
 read_file_to_list(path)                 -> list[str]
 RISCVInstruction(hex32)                -> decoded instruction object
+RISCVInstruction.encode(opcode, …)     -> fields → 32-bit word
+image_words(hex_lines)                 -> list[int]  (one word per line)
+decode_image(hex_lines)                -> PC-indexed list[RISCVInstruction]
 shift_helper(value, shamt, kind)       -> shifted 32-bit value
 reverse_hex_string_endianness(s)       -> little/endian swap helper
 ByteAddressableMemory(capacity)        -> byte-granular RAM model
+SparseMemory(capacity, page_bits)      -> page-backed RAM for a 32-bit space
 is_signed(val32)                       -> signed view of 32-bit value
 sra(val32, shamt)                      -> arithmetic right shift helper
 """
 
 from __future__ import annotations
 
+import mmap
+import os
+import sys
+from array import array
+
 # --------------------------------------------------------------------------- #
 #  General helpers                                                            #
 # --------------------------------------------------------------------------- #
@@ -82,14 +91,16 @@ class RISCVInstruction:
 
     Attributes
     ----------
+    word : int   raw 32-bit instruction word
     opcode, rd, rs1, rs2, funct3, funct7 : int
     imm   : immediate matching the instruction type
     imm_i, imm_s, imm_b, imm_u, imm_j   : all immediates pre-decoded
     inst_type : str  (R, I, LOAD, STORE, BRANCH, JAL, JALR, AUIPC, LUI, UNKNOWN)
+    binary : str  32-char bit string (built on demand)
     """
 
     __slots__ = (
-        "binary", "opcode", "rd", "rs1", "rs2", "funct3", "funct7",
+        "word", "opcode", "rd", "rs1", "rs2", "funct3", "funct7",
         "imm_i", "imm_s", "imm_b", "imm_u", "imm_j", "inst_type", "imm"
     )
 
@@ -105,10 +116,27 @@ class RISCVInstruction:
         0x37: "LUI",
     }
 
+    # which pre-decoded immediate is the canonical ``imm`` for each type
+    _IMM_ATTR = {
+        "I": "imm_i", "LOAD": "imm_i", "JALR": "imm_i",
+        "STORE": "imm_s",
+        "BRANCH": "imm_b",
+        "LUI": "imm_u", "AUIPC": "imm_u",
+        "JAL": "imm_j",
+    }
+
     def __init__(self, hex32: str):
-        word = int(hex32, 16) & 0xFFFF_FFFF
-        self.binary = f"{word:032b}"
+        self._decode(int(hex32, 16) & 0xFFFF_FFFF)
+
+    @classmethod
+    def from_word(cls, word: int) -> "RISCVInstruction":
+        """Decode an already-parsed 32-bit word (no hex round-trip)."""
+        ins = cls.__new__(cls)
+        ins._decode(word & 0xFFFF_FFFF)
+        return ins
 
+    def _decode(self, word: int) -> None:
+        self.word   = word
         self.opcode =  word        & 0x7F
         self.rd     = (word >>  7) & 0x1F
         self.funct3 = (word >> 12) & 0x07
@@ -134,13 +162,37 @@ class RISCVInstruction:
 
         # --- type & canonical immediate ------------------------------------
         self.inst_type = self._OPCODE_MAP.get(self.opcode, "UNKNOWN")
-        self.imm = {
-            "I": self.imm_i, "LOAD": self.imm_i, "JALR": self.imm_i,
-            "S": self.imm_s, "STORE": self.imm_s,
-            "B": self.imm_b, "BRANCH": self.imm_b,
-            "U": self.imm_u, "LUI": self.imm_u, "AUIPC": self.imm_u,
-            "J": self.imm_j, "JAL": self.imm_j,
-        }.get(self.inst_type, 0)
+        attr = self._IMM_ATTR.get(self.inst_type)
+        self.imm = getattr(self, attr) if attr else 0
+
+    @classmethod
+    def encode(cls, opcode: int, rd: int = 0, funct3: int = 0, rs1: int = 0,
+               rs2: int = 0, funct7: int = 0, imm: int = 0) -> int:
+        """
+        Inverse of decoding: pack the fields into a 32-bit word.  ``imm`` is
+        placed according to the opcode's type and overrides the bits it
+        shares with rs2/funct7 (I-type shifts: ``imm = funct7 << 5 | shamt``).
+        """
+        kind = cls._OPCODE_MAP.get(opcode, "UNKNOWN")
+        word = opcode | rd << 7 | funct3 << 12 | rs1 << 15 | rs2 << 20 | funct7 << 25
+        imm &= 0xFFFF_FFFF
+        if kind in ("I", "LOAD", "JALR"):
+            word = (word & 0x000F_FFFF) | (imm & 0xFFF) << 20
+        elif kind == "STORE":
+            word = (word & 0x01FF_F07F) | (imm & 0x1F) << 7 | (imm >> 5 & 0x7F) << 25
+        elif kind == "BRANCH":
+            word = (word & 0x01FF_F07F) | (imm >> 11 & 1) << 7 | (imm >> 1 & 0xF) << 8 \
+                 | (imm >> 5 & 0x3F) << 25 | (imm >> 12 & 1) << 31
+        elif kind in ("LUI", "AUIPC"):
+            word = (word & 0xFFF) | (imm & 0xFFFFF000)
+        elif kind == "JAL":
+            word = (word & 0xFFF) | (imm >> 12 & 0xFF) << 12 | (imm >> 11 & 1) << 20 \
+                 | (imm >> 1 & 0x3FF) << 21 | (imm >> 20 & 1) << 31
+        return word
+
+    @property
+    def binary(self) -> str:
+        return f"{self.word:032b}"
 
     # ------------------------------------------------------------------ #
     #  utils                                                              #
@@ -161,18 +213,65 @@ class RISCVInstruction:
         )
 
 
+# --------------------------------------------------------------------------- #
+#  Whole-image predecode                                                      #
+# --------------------------------------------------------------------------- #
+
+def image_words(hex_lines: list[str]) -> list[int]:
+    """
+    Parse an ``Instructions.hex`` image (one little-endian word per line,
+    byte-separated or compact) into a list of 32-bit integers.
+    """
+    return [int.from_bytes(bytes.fromhex(h), "little") for h in hex_lines]
+
+
+def decode_image(hex_lines: list[str]) -> list[RISCVInstruction]:
+    """
+    Decode every word of an instruction image once, returning a table that is
+    indexed by ``PC // 4``.  Identical words share a single decoded record, so
+    the NOP/zero padding costs one decode in total.
+    """
+    cache: dict[int, RISCVInstruction] = {}
+    table = []
+    for word in image_words(hex_lines):
+        ins = cache.get(word)
+        if ins is None:
+            ins = cache[word] = RISCVInstruction.from_word(word)
+        table.append(ins)
+    return table
+
+
 # --------------------------------------------------------------------------- #
 #  Simple byte-addressable memory                                             #
 # --------------------------------------------------------------------------- #
 
+# native 32-bit word views are only little-endian on little-endian hosts
+_NATIVE_LE = sys.byteorder == "little" and array("I").itemsize == 4
+
+
+def _map_file(path: str) -> mmap.mmap | bytes:
+    """Private (copy-on-write) mapping of *path*; empty files map to b""."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+
 class ByteAddressableMemory:
-    """A very small, pure-Python byte array that supports word/byte accesses."""
+    """
+    A very small, pure-Python byte array that supports word/byte accesses.
+
+    Aligned word accesses go through a zero-copy ``memoryview`` cast to
+    32-bit words (see :meth:`words`); everything else slices the bytearray.
+    """
 
-    __slots__ = ("mem", "_cap")
+    __slots__ = ("mem", "_cap", "_words")
 
     def __init__(self, size: int):
-        self._cap = size
-        self.mem  = bytearray(size)
+        self._cap   = size
+        self.mem    = bytearray(size)
+        self._words = (memoryview(self.mem).cast("I")
+                       if _NATIVE_LE and size % 4 == 0 else None)
 
     # ---------- helpers ------------------------------------------------ #
     def _check(self, addr: int, length: int):
@@ -188,6 +287,26 @@ class ByteAddressableMemory:
         self._check(address, 4)
         self.mem[address : address + 4] = data.to_bytes(4, "little", signed=False)
 
+    def read_word(self, address: int) -> int:
+        self._check(address, 4)
+        if self._words is not None and not address & 3:
+            return self._words[address >> 2]
+        return int.from_bytes(self.mem[address : address + 4], "little")
+
+    def write_word(self, address: int, data: int) -> None:
+        self._check(address, 4)
+        if self._words is not None and not address & 3:
+            self._words[address >> 2] = data & 0xFFFF_FFFF
+        else:
+            self.mem[address : address + 4] = (data & 0xFFFF_FFFF).to_bytes(4, "little")
+
+    def words(self) -> memoryview | array:
+        """Zero-copy view of the whole memory as 32-bit words (a copy on BE hosts)."""
+        if self._words is not None:
+            return self._words
+        return array("I", [int.from_bytes(self.mem[i:i + 4], "little")
+                           for i in range(0, self._cap - 3, 4)])
+
     # ---------- byte-granular ops -------------------------------------- #
     def read_bytes(self, address: int, size: int) -> bytes:
         self._check(address, size)
@@ -196,3 +315,153 @@ class ByteAddressableMemory:
     def write_bytes(self, address: int, data: bytes) -> None:
         self._check(address, len(data))
         self.mem[address : address + len(data)] = data
+
+    # ---------- bulk images -------------------------------------------- #
+    def load_image(self, data, address: int = 0) -> None:
+        """Copy any bytes-like object (bytes, mmap, memoryview …) in one go."""
+        self.write_bytes(address, memoryview(data).cast("B"))
+
+    def load_file(self, path: str, address: int = 0) -> int:
+        """Memory-map *path* and copy it to *address*; return its length."""
+        data = _map_file(path)
+        try:
+            self.load_image(data, address)
+            return len(data)
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+    def dump(self, address: int = 0, length: int | None = None) -> bytes:
+        length = self._cap - address if length is None else length
+        self._check(address, length)
+        return bytes(self.mem[address : address + length])
+
+    def regions(self):
+        """Yield ``(base, bytes-like)`` for every backed region."""
+        yield 0, self.mem
+
+
+class SparseMemory:
+    """
+    Page-backed memory for a full 32-bit address space.
+
+    Pages are only allocated on first write; reads of untouched pages return
+    zeros.  :meth:`map_file` backs pages directly with a private ``mmap``, so
+    a multi-megabyte image is usable without being read into Python.  The
+    access API matches :class:`ByteAddressableMemory`.
+    """
+
+    __slots__ = ("pages", "_cap", "_shift", "_psize", "_pmask")
+
+    def __init__(self, size: int = 1 << 32, page_bits: int = 12):
+        self._cap   = size
+        self._shift = page_bits
+        self._psize = 1 << page_bits
+        self._pmask = self._psize - 1
+        self.pages: dict[int, bytearray | memoryview] = {}
+
+    _check = ByteAddressableMemory._check
+
+    # ---------- page plumbing ------------------------------------------ #
+    def _page(self, pno: int):
+        page = self.pages.get(pno)
+        if page is None:
+            page = self.pages[pno] = bytearray(self._psize)
+        return page
+
+    def _spans(self, address: int, length: int):
+        """Split an access into (page no, offset, chunk length) pieces."""
+        while length:
+            off   = address & self._pmask
+            chunk = min(length, self._psize - off)
+            yield address >> self._shift, off, chunk
+            address += chunk
+            length  -= chunk
+
+    # ---------- byte-granular ops -------------------------------------- #
+    def read_bytes(self, address: int, size: int) -> bytes:
+        self._check(address, size)
+        off = address & self._pmask
+        if off + size <= self._psize:                     # common case
+            page = self.pages.get(address >> self._shift)
+            return bytes(size) if page is None else bytes(page[off:off + size])
+        out = bytearray()
+        for pno, off, chunk in self._spans(address, size):
+            page = self.pages.get(pno)
+            out += bytes(chunk) if page is None else page[off:off + chunk]
+        return bytes(out)
+
+    def write_bytes(self, address: int, data: bytes) -> None:
+        self._check(address, len(data))
+        data = memoryview(data).cast("B")
+        pos  = 0
+        for pno, off, chunk in self._spans(address, len(data)):
+            self._page(pno)[off:off + chunk] = data[pos:pos + chunk]
+            pos += chunk
+
+    # ---------- word-granular ops (little-endian) ---------------------- #
+    def read(self, address: int) -> bytes:
+        return self.read_bytes(address, 4)
+
+    def write(self, address: int, data: int) -> None:
+        self.write_bytes(address, data.to_bytes(4, "little", signed=False))
+
+    def read_word(self, address: int) -> int:
+        return int.from_bytes(self.read_bytes(address, 4), "little")
+
+    def write_word(self, address: int, data: int) -> None:
+        self.write_bytes(address, (data & 0xFFFF_FFFF).to_bytes(4, "little"))
+
+    # ---------- bulk images -------------------------------------------- #
+    def load_image(self, data, address: int = 0) -> None:
+        self.write_bytes(address, data)
+
+    def map_file(self, path: str, address: int = 0) -> int:
+        """
+        Back the pages at page-aligned *address* with a copy-on-write mmap of
+        *path* (writes never reach the file).  Returns the file length.
+        """
+        if address & self._pmask:
+            raise ValueError(f"map_file needs a page-aligned address, got 0x{address:X}")
+        data = _map_file(path)
+        self._check(address, len(data))
+        self._map_view(memoryview(data), address)
+        return len(data)
+
+    def load_file(self, path: str, address: int = 0) -> int:
+        """
+        Like :meth:`ByteAddressableMemory.load_file`, at any *address*: the
+        whole pages are mapped as in :meth:`map_file`, an unaligned head is
+        copied.  Returns the file length.
+        """
+        data = _map_file(path)
+        self._check(address, len(data))
+        view = memoryview(data)
+        head = min(len(view), -address & self._pmask)
+        if head:
+            self.load_image(view[:head], address)
+        self._map_view(view[head:], address + head)
+        return len(data)
+
+    def _map_view(self, view: memoryview, address: int) -> None:
+        """Share full pages of *view* from page-aligned *address*, copy a short tail."""
+        for pno, off, chunk in self._spans(address, len(view)):
+            pos = (pno << self._shift) - address
+            if chunk == self._psize:
+                self.pages[pno] = view[pos:pos + chunk]
+            else:                                         # short tail page
+                self._page(pno)[:chunk] = view[pos:pos + chunk]
+
+    def dump(self, address: int = 0, length: int | None = None) -> bytes:
+        """
+        *length* bytes from *address*; by default up to the end of the highest
+        allocated page (not the whole address space).
+        """
+        if length is None:
+            end = (max(self.pages) + 1) << self._shift if self.pages else 0
+            length = max(0, end - address)
+        return self.read_bytes(address, length)
+
+    def regions(self):
+        for pno in sorted(self.pages):
+            yield pno << self._shift, self.pages[pno]
@@ -0,0 +1,355 @@
+"""
+Benchmark suite for the verification stack
+==========================================
+
+Throughput of the Python that runs every simulated cycle, stored as JSON so
+a later run can be compared against a saved baseline:
+
+    decode.*     RISCVInstruction, decode_image, Helper_Decode.decode_words
+    memory.*     ByteAddressableMemory / SparseMemory word and byte accesses
+    model.*      RV32ISim.step / run, BlockJIT.run
+    tb.*         TB.model_step with logging off / on / into the off-thread
+                 sink of Helper_Log (needs cocotb importable)
+    cocotb.*     per-cycle cost under Icarus of the clock, model_step,
+                 _compare, logging and the Helper_Student dumps (``--cocotb``,
+                 runs the ``Overhead_bench`` test of tbdeneme.py)
+
+Every result is a rate (higher is better), the best of ``--repeat`` samples
+of at least ``--min-time`` seconds each.
+
+    python bench.py --out bench.json
+    python bench.py --baseline bench_baseline.json        # exit 1 on regressions
+    python bench.py --only model --only tb --cocotb
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+from Helper_Checkpoint import Checkpointer
+from Helper_lib import (
+    ByteAddressableMemory,
+    RISCVInstruction,
+    SparseMemory,
+    decode_image,
+    read_file_to_list,
+)
+from Helper_ISS import RV32ISim
+from Helper_Log import AsyncLogSink, QueuedLogger
+
+VERSION   = 1
+TESTS_DIR = Path(__file__).resolve().parent
+
+
+# --------------------------------------------------------------------------- #
+#  Timing                                                                     #
+# --------------------------------------------------------------------------- #
+def measure(batch, min_time: float, repeat: int) -> float:
+    """Best rate of *repeat* samples; ``batch()`` returns how many ops it did."""
+    best = 0.0
+    for _ in range(repeat):
+        ops, elapsed = 0, 0.0
+        while elapsed < min_time:
+            t0 = time.perf_counter()
+            ops += batch()
+            elapsed += time.perf_counter() - t0
+        best = max(best, ops / elapsed)
+    return best
+
+
+def _from_reset(sim: RV32ISim):
+    """``restore()`` callable that puts *sim* back into its current state."""
+    cpr = Checkpointer(sim)
+    cp0 = cpr.take()
+    return lambda: cpr.restore(cp0)
+
+
+# --------------------------------------------------------------------------- #
+#  Benchmarks – each yields (name, unit, batch)                               #
+# --------------------------------------------------------------------------- #
+def bench_decode(hex_lines: list[str]):
+    words = [h.replace(" ", "") for h in hex_lines if h.strip()]
+    yield "decode.instruction", "instr/s", \
+        lambda: len([RISCVInstruction(w) for w in words])
+    yield "decode.image", "instr/s", lambda: len(decode_image(hex_lines))
+    import Helper_Decode
+    if Helper_Decode.np is None:                # NumPy is optional
+        return
+    parse_hex, decode_words = Helper_Decode.parse_hex, Helper_Decode.decode_words
+    image = "\n".join(hex_lines * max(1, 65536 // len(hex_lines)))
+    arr = parse_hex(image)
+    yield "decode.parse_hex", "instr/s", lambda: len(parse_hex(image))
+    yield "decode.vectorised", "instr/s", lambda: len(decode_words(arr))
+
+
+def bench_memory(size: int = RV32ISim.MEM_SIZE, n: int = 4096):
+    rng   = random.Random(1)
+    words = [rng.randrange(0, size - 3, 4) for _ in range(n)]
+    bytes_ = [rng.randrange(0, size) for _ in range(n)]
+    for label, mem in (("bytemem", ByteAddressableMemory(size)),
+                       ("sparse", SparseMemory(1 << 32))):
+        def write_word(mem=mem):
+            for a in words:
+                mem.write_word(a, a)
+            return n
+
+        def read_word(mem=mem):
+            for a in words:
+                mem.read_word(a)
+            return n
+
+        def write_byte(mem=mem):
+            for a in bytes_:
+                mem.write_bytes(a, b"\x5a")
+            return n
+
+        def read_byte(mem=mem):
+            for a in bytes_:
+                mem.read_bytes(a, 1)
+            return n
+
+        yield f"memory.{label}.write_word", "access/s", write_word
+        yield f"memory.{label}.read_word",  "access/s", read_word
+        yield f"memory.{label}.write_byte", "access/s", write_byte
+        yield f"memory.{label}.read_byte",  "access/s", read_byte
+
+
+def bench_model(hex_lines: list[str], max_steps: int):
+    sim   = RV32ISim(hex_lines)
+    reset = _from_reset(sim)
+
+    def step():
+        reset()
+        n = 0
+        while n != max_steps and not sim.halted():
+            sim.step()
+            n += 1
+        return n
+
+    def run():
+        reset()
+        return sim.run(max_steps)
+
+    yield "model.step", "instr/s", step
+    yield "model.run", "instr/s", run
+
+    from Helper_JIT import BlockJIT
+    jit = BlockJIT(sim)
+
+    def run_jit():
+        reset()
+        return jit.run(max_steps)
+
+    yield "model.jit", "instr/s", run_jit
+
+
+def _drive(coro) -> None:
+    """Run a coroutine that never really awaits (``TB.model_step``)."""
+    try:
+        coro.send(None)
+    except StopIteration:
+        return
+    coro.close()
+    raise RuntimeError("model_step suspended outside a simulator")
+
+
+def bench_tb(hex_lines: list[str], max_steps: int):
+    try:
+        import tbdeneme                     # imports cocotb
+    except ImportError as exc:
+        print(f"tb.* skipped: {exc}", file=sys.stderr)
+        return
+    os.environ["TB_FLIGHT_RECORDER"] = "0"
+    for var in ("TB_PROFILE", "TB_COVERAGE", "TB_DUT_TRACE"):
+        os.environ.pop(var, None)
+    # logging "on" has to format and write: give the logger a real sink
+    lg = logging.getLogger("PerfModel")
+    if not lg.handlers:
+        lg.addHandler(logging.StreamHandler(open(os.devnull, "w")))
+    # model_step never touches the DUT; the handles are only collected
+    regfile = SimpleNamespace(Reg_Out=[None] * 32, write_enable=None, A3=None, WD3=None)
+    tb    = tbdeneme.TB(hex_lines, None, None, regfile)
+    reset = _from_reset(tb.iss)
+
+    def model_step():
+        reset()
+        n = 0
+        while n != max_steps and not tb.iss.halted():
+            _drive(tb.model_step())
+            n += 1
+        return n
+
+    def at_level(level):
+        def batch():
+            tb.log.setLevel(level)
+            return model_step()
+        return batch
+
+    yield "tb.model_step.log_off", "instr/s", at_level(logging.WARNING)
+    yield "tb.model_step.log_on",  "instr/s", at_level(logging.INFO)
+
+    # TB_LOG_FILE: INFO records go to the off-thread sink (Helper_Log); this
+    # is the simulator thread's cost, the writer drains in the background
+    with tempfile.TemporaryDirectory(prefix="bench_") as tmp:
+        sink    = AsyncLogSink(Path(tmp) / "perfmodel.log.gz")
+        console = [(h, h.level) for h in lg.handlers]
+        for h, _ in console:
+            h.setLevel(logging.WARNING)
+        lg.addHandler(sink)
+        plain, tb.log = tb.log, QueuedLogger(lg, sink)
+        try:
+            yield "tb.model_step.log_async", "instr/s", at_level(logging.INFO)
+        finally:
+            tb.log = plain
+            lg.removeHandler(sink)
+            sink.close()
+            for h, level in console:
+                h.setLevel(level)
+
+
+def bench_cocotb(hex_path: Path, reps: int, make_args: list[str]) -> dict:
+    """Run tbdeneme's ``Overhead_bench`` under the Makefile flow."""
+    from regress import compile_once
+
+    compile_once(make_args)
+    with tempfile.TemporaryDirectory(prefix="bench_") as work:
+        out = Path(work) / "bench.json"
+        env = dict(os.environ, TB_BENCH=str(out), TB_BENCH_REPS=str(reps),
+                   PROGRAM_HEX=str(hex_path.resolve()), TESTCASE="Overhead_bench",
+                   COCOTB_RESULTS_FILE=str(Path(work) / "results.xml"))
+        proc = subprocess.run(["make", "-f", str(TESTS_DIR / "Makefile"), *make_args],
+                              cwd=work, env=env, stdout=subprocess.PIPE,
+                              stderr=subprocess.STDOUT, text=True)
+        if not out.exists():
+            raise RuntimeError("Overhead_bench produced no results:\n"
+                               + "\n".join(proc.stdout.splitlines()[-20:]))
+        data = json.loads(out.read_text())
+    return {f"cocotb.{stage}": {"rate": 1e6 / us, "unit": "cycle/s"}
+            for stage, us in data["us_per_cycle"].items()}
+
+
+# --------------------------------------------------------------------------- #
+#  Results                                                                    #
+# --------------------------------------------------------------------------- #
+def _git_revision() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=TESTS_DIR,
+                             capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> tuple[list[str], int]:
+    """Table of new vs. baseline rates and the number of regressions."""
+    rate = lambda r: "-" if r is None else f"{r['rate']:,.0f}"
+    rows = [f"{'benchmark':34} {'baseline':>14} {'now':>14} {'ratio':>7}"]
+    slower = 0
+    for name in sorted(results.keys() | baseline.keys()):
+        new, old = results.get(name), baseline.get(name)
+        if new is None or old is None:                  # added / not run
+            rows.append(f"{name:34} {rate(old):>14} {rate(new):>14}")
+            continue
+        ratio = new["rate"] / old["rate"] if old["rate"] else float("inf")
+        flag  = ""
+        if ratio < 1 - threshold:
+            flag = "  SLOWER"
+            slower += 1
+        elif ratio > 1 + threshold:
+            flag = "  faster"
+        rows.append(f"{name:34} {rate(old):>14} {rate(new):>14} {ratio:7.2f}{flag}")
+    return rows, slower
+
+
+# --------------------------------------------------------------------------- #
+#  CLI                                                                        #
+# --------------------------------------------------------------------------- #
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    make_args: list[str] = []
+    if "--" in argv:
+        idx = argv.index("--")
+        argv, make_args = argv[:idx], argv[idx + 1:]
+
+    ap = argparse.ArgumentParser(description="Benchmark the Python verification stack.")
+    ap.add_argument("hex", nargs="?", default="Instructions.hex",
+                    help="program for the decode/model/tb benchmarks")
+    ap.add_argument("--out", type=Path, default=Path("bench_results.json"),
+                    help="where to write the results (default: %(default)s)")
+    ap.add_argument("--baseline", type=Path, default=None,
+                    help="compare against this earlier result file")
+    ap.add_argument("--threshold", type=float, default=0.10,
+                    help="relative slow-down counted as a regression (default: %(default)s)")
+    ap.add_argument("--only", action="append", default=[], metavar="PREFIX",
+                    help="run only benchmarks whose name starts with PREFIX (repeatable)")
+    ap.add_argument("--min-time", type=float, default=0.2,
+                    help="seconds per sample (default: %(default)s)")
+    ap.add_argument("--repeat", type=int, default=3, help="samples per benchmark")
+    ap.add_argument("--max-steps", type=int, default=100_000,
+                    help="instruction cap per model run")
+    ap.add_argument("--cocotb", action="store_true",
+                    help="also measure per-cycle costs under Icarus (slow)")
+    ap.add_argument("--cocotb-reps", type=int, default=20,
+                    help="program runs per stage in the cocotb benchmark")
+    args = ap.parse_args(argv)
+
+    hex_lines = read_file_to_list(args.hex)
+    suites = (bench_decode(hex_lines), bench_memory(),
+              bench_model(hex_lines, args.max_steps), bench_tb(hex_lines, args.max_steps))
+    wanted = lambda name: not args.only or any(name.startswith(p) for p in args.only)
+
+    results: dict[str, dict] = {}
+    for suite in suites:
+        for name, unit, batch in suite:
+            if not wanted(name):
+                continue
+            rate = measure(batch, args.min_time, args.repeat)
+            results[name] = {"rate": rate, "unit": unit}
+            print(f"{name:34} {rate:14,.0f} {unit}", flush=True)
+    if args.cocotb:
+        for name, res in bench_cocotb(Path(args.hex), args.cocotb_reps, make_args).items():
+            if wanted(name):
+                results[name] = res
+                print(f"{name:34} {res['rate']:14,.0f} {res['unit']}", flush=True)
+
+    args.out.write_text(json.dumps({
+        "version": VERSION,
+        "meta": {
+            "date":     datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": _git_revision(),
+            "python":   platform.python_version(),
+            "machine":  platform.machine(),
+            "program":  args.hex,
+        },
+        "results": results,
+    }, indent=2))
+
+    if args.baseline is None:
+        return 0
+    base = json.loads(args.baseline.read_text())
+    if base.get("version") != VERSION:
+        ap.error(f"{args.baseline}: benchmark file version {base.get('version')}, "
+                 f"expected {VERSION}")
+    rows, slower = compare(results, base["results"], args.threshold)
+    print(f"\nagainst {args.baseline} ({base['meta'].get('revision') or 'unknown revision'}):")
+    print("\n".join(rows))
+    if slower:
+        print(f"{slower} benchmark(s) slower than the baseline by more than "
+              f"{args.threshold:.0%}")
+    return 1 if slower else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
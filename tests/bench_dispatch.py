@@ -0,0 +1,200 @@
+"""
+Micro-benchmark: if/elif + ``match`` interpreter vs. the handler-table ISS
+==========================================================================
+
+``legacy_step`` is a frozen copy of the execute logic ``TB.model_step`` used
+before the dispatch-table engine (operating on the predecoded table, so only
+dispatch cost is compared).  Both engines run the same image repeatedly from
+reset; the final architectural state is cross-checked before timing.
+
+    python bench_dispatch.py [Instructions.hex] [--reps N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+from Helper_lib import is_signed, sra, read_file_to_list
+from Helper_ISS import RV32ISim
+from Helper_MMIO import DeviceBus, UARTDevice
+
+
+# --------------------------------------------------------------------------- #
+#  Old path                                                                   #
+# --------------------------------------------------------------------------- #
+def _wreg(sim, idx: int, val: int) -> None:
+    if idx:                                   # x0 is hard-wired to zero
+        sim.rf[idx] = val & 0xFFFF_FFFF
+
+
+def _rreg(sim, idx: int) -> int:
+    return sim.rf[idx]
+
+
+def legacy_step(sim: RV32ISim) -> None:
+    instr = sim.decoded[sim.pc >> 2]
+
+    next_pc = sim.pc + 4
+    rd, rs1, rs2 = instr.rd, instr.rs1, instr.rs2
+    rv1, rv2     = _rreg(sim, rs1), _rreg(sim, rs2)
+    imm          = instr.imm
+    f3, f7       = instr.funct3, instr.funct7
+
+    if instr.inst_type == "R":
+        match (f3, f7):
+            # custom NOT rd,rs1  (funct7=0x20, funct3=FUNCT3_SLL=1)
+            case (0x1, 0x20):
+                res = (~rv1) & 0xFFFFFFFF
+            case (0x0, 0x00): res = rv1 + rv2
+            case (0x0, 0x20): res = rv1 - rv2
+            case (0x7, _):    res = rv1 & rv2
+            case (0x6, _):    res = rv1 | rv2
+            case (0x4, _):    res = rv1 ^ rv2
+            case (0x1, _):    res = rv1 << (rv2 & 0x1F)
+            case (0x5, 0x00): res = rv1 >> (rv2 & 0x1F)
+            case (0x5, 0x20): res = sra(rv1,  rv2 & 0x1F)
+            case (0x2, _):    res = int(is_signed(rv1) <  is_signed(rv2))
+            case (0x3, _):    res = int(rv1 < rv2)
+            case _: raise AssertionError("Unsupported R-type variant")
+        _wreg(sim, rd, res)
+
+    elif instr.inst_type == "I":
+        match f3:
+            case 0x0: res = rv1 + imm
+            case 0x7: res = rv1 & imm
+            case 0x6: res = rv1 | imm
+            case 0x4: res = rv1 ^ imm
+            case 0x2: res = int(is_signed(rv1) < is_signed(imm))
+            case 0x3: res = int(rv1 < imm)
+            case 0x1: res = rv1 << (imm & 0x1F)
+            case 0x5:
+                res = rv1 >> (imm & 0x1F) if f7 == 0x00 else sra(rv1, imm & 0x1F)
+            case _: raise AssertionError("Unsupported I-type variant")
+        _wreg(sim, rd, res)
+
+    elif instr.inst_type == "LOAD":
+        addr = rv1 + imm
+        if addr == sim.UART_RX:
+            # Simulate UART RX: return 0xFFFFFFFF to indicate FIFO empty
+            val = 0xFFFFFFFF
+        else:
+            if addr + 4 > sim.mem_size:
+                raise ValueError(f"Memory access out of range: {hex(addr)} (+4)")
+            size = {0: 1, 1: 2, 2: 4}[f3 & 0b11]
+            raw  = sim.mem.read_bytes(addr, size)
+            val  = int.from_bytes(raw, "little", signed=(f3 in (0, 1, 2)))
+            if f3 in (4, 5):  # LBU/LHU
+                val &= (1 << (8 * size)) - 1
+        _wreg(sim, rd, val)
+
+    elif instr.inst_type == "STORE":
+        addr = rv1 + imm
+        data = _rreg(sim, rs2)
+        if addr == sim.UART_TX:
+            sim.uart_tx.append(data & 0xFF)
+        else:
+            size = {0: 1, 1: 2, 2: 4}[f3 & 0b11]
+            # mask to the low “size” bytes (e.g. for SH, size=2 → mask=0xFFFF)
+            mask = (1 << (8 * size)) - 1
+            low_bits = data & mask
+            sim.mem.write_bytes(addr, low_bits.to_bytes(size, "little"))
+
+    elif instr.inst_type == "BRANCH":
+        cmp = {
+            0x0: rv1 == rv2,
+            0x1: rv1 != rv2,
+            0x4: is_signed(rv1) <  is_signed(rv2),
+            0x5: is_signed(rv1) >= is_signed(rv2),
+            0x6: rv1 < rv2,
+            0x7: rv1 >= rv2,
+        }[f3]
+        if cmp:
+            next_pc = sim.pc + imm
+
+    elif instr.inst_type == "JAL":
+        _wreg(sim, rd, sim.pc + 4)
+        next_pc = sim.pc + imm
+
+    elif instr.inst_type == "JALR":
+        _wreg(sim, rd, sim.pc + 4)
+        next_pc = (rv1 + imm) & ~1
+
+    elif instr.inst_type == "LUI":
+        _wreg(sim, rd, imm)
+
+    elif instr.inst_type == "AUIPC":
+        _wreg(sim, rd, sim.pc + imm)
+
+    else:
+        raise AssertionError(f"Unsupported instruction type {instr.inst_type}")
+
+    sim.pc = next_pc & 0xFFFF_FFFF  # keep it 32-bit
+    sim.retired += 1
+
+
+def legacy_run(sim: RV32ISim) -> int:
+    start = sim.retired
+    while not sim.halted():
+        legacy_step(sim)
+    return sim.retired - start
+
+
+# --------------------------------------------------------------------------- #
+#  Harness                                                                    #
+# --------------------------------------------------------------------------- #
+def _sim(image: list[str]) -> RV32ISim:
+    """Model whose UART accepts every store: the legacy path has no TX busy time."""
+    bus = DeviceBus()
+    bus.register(UARTDevice(tx_busy=0), RV32ISim.UART_BASE)
+    return RV32ISim(image, bus=bus)
+
+
+_UART_RESET = UARTDevice(tx_busy=0).snapshot()
+
+
+def _reset(sim: RV32ISim) -> None:
+    sim.rf[:] = [0] * 32
+    sim.pc = 0
+    sim.retired = sim.mmio_reads = sim.mmio_writes = 0
+    sim.mem.mem[:] = bytes(len(sim.mem.mem))
+    sim.uart.restore(_UART_RESET)
+
+
+def _time(sim: RV32ISim, run, reps: int) -> tuple[float, int]:
+    """Return (seconds, instructions) for *reps* runs from reset."""
+    instrs = 0
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        _reset(sim)
+        instrs += run(sim)
+    return time.perf_counter() - t0, instrs
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("hex", nargs="?", default="Instructions.hex")
+    ap.add_argument("--reps", type=int, default=20_000,
+                    help="program runs per engine (default: %(default)s)")
+    args = ap.parse_args(argv)
+
+    image = read_file_to_list(args.hex)
+    old, new = _sim(image), _sim(image)
+    legacy_run(old)
+    new.run()
+    assert (old.rf, old.pc, old.mem.mem, old.uart_tx) == \
+           (new.rf, new.pc, new.mem.mem, new.uart_tx), "engines disagree"
+
+    t_old, n_old = _time(old, legacy_run,               args.reps)
+    t_new, n_new = _time(new, lambda sim: sim.run(),    args.reps)
+    ns_old = t_old / n_old * 1e9
+    ns_new = t_new / n_new * 1e9
+    print(f"if/elif + match : {ns_old:8.1f} ns/instr  ({n_old / t_old:12,.0f} instr/s)")
+    print(f"handler table   : {ns_new:8.1f} ns/instr  ({n_new / t_new:12,.0f} instr/s)")
+    print(f"speed-up        : {ns_old / ns_new:8.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
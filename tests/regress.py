@@ -0,0 +1,190 @@
+"""
+Parallel multi-program regression over the cocotb Makefile flow
+===============================================================
+
+Every ``*.hex`` program in a directory gets its own work directory (own
+``results.xml``, summary and log) and its own Icarus process.  Jobs are
+dispatched from a pool sized to the available cores; the pool threads only
+wait on ``make``, the simulations themselves run as separate processes.
+
+The HDL is compiled once up front (``make compile``, cached under
+``sim_cache/<hash>``) and every job passes its program as ``+PROGRAM=``, so
+N programs cost one compile plus N simulations.
+
+    python regress.py programs/ [-j N] [--json report.json] [--junit report.xml]
+
+Extra ``KEY=VALUE`` arguments after ``--`` are passed to every ``make`` run,
+e.g. ``-- TB_MODE=replay``.  ``--coverage db.json`` has every run merge its
+ISA coverage into one database (see ``Helper_Coverage``) and prints the
+uncovered bins at the end.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from Helper_Coverage import report as coverage_report
+
+TESTS_DIR = Path(__file__).resolve().parent
+
+
+@dataclass
+class Result:
+    program: str
+    passed:  bool
+    cycles:  int
+    seconds: float
+    message: str = ""
+
+
+# --------------------------------------------------------------------------- #
+#  One program                                                                #
+# --------------------------------------------------------------------------- #
+def _failure(results_xml: Path) -> str | None:
+    """First failure message in a cocotb results file (None = all passed)."""
+    if not results_xml.exists():
+        return "no results.xml – simulator did not finish"
+    for case in ET.parse(results_xml).getroot().iter("testcase"):
+        for tag in ("failure", "error"):
+            node = case.find(tag)
+            if node is not None:
+                return node.get("message") or tag
+    return None
+
+
+def compile_once(make_args: list[str]) -> None:
+    """Build (or re-use) the cached simulator before the jobs fan out."""
+    subprocess.run(["make", "-f", str(TESTS_DIR / "Makefile"), "compile", *make_args],
+                   cwd=TESTS_DIR, check=True)
+
+
+def run_program(hex_path: Path, work_root: Path, make_args: list[str],
+                timeout: float | None) -> Result:
+    work = work_root / hex_path.stem
+    shutil.rmtree(work, ignore_errors=True)
+    work.mkdir(parents=True)
+
+    env = dict(os.environ,
+               PROGRAM_HEX=str(hex_path),
+               TB_SUMMARY=str(work / "summary.json"),
+               COCOTB_RESULTS_FILE=str(work / "results.xml"))
+    t0 = time.perf_counter()
+    with open(work / "sim.log", "w") as log:
+        try:
+            proc = subprocess.run(["make", "-f", str(TESTS_DIR / "Makefile"), *make_args],
+                                  cwd=work, env=env, stdout=log,
+                                  stderr=subprocess.STDOUT, timeout=timeout)
+            message = _failure(work / "results.xml")
+            if message is None and proc.returncode:
+                message = f"make exited with {proc.returncode}"
+        except subprocess.TimeoutExpired:
+            message = f"timed out after {timeout:.0f}s"
+    seconds = time.perf_counter() - t0
+
+    cycles = 0
+    summary = work / "summary.json"
+    if summary.exists():
+        cycles = json.loads(summary.read_text())["cycles"]
+    return Result(hex_path.name, message is None, cycles, seconds, message or "")
+
+
+# --------------------------------------------------------------------------- #
+#  Reports                                                                    #
+# --------------------------------------------------------------------------- #
+def write_json(results: list[Result], path: Path, wall: float) -> None:
+    path.write_text(json.dumps({
+        "passed":  sum(r.passed for r in results),
+        "failed":  sum(not r.passed for r in results),
+        "cycles":  sum(r.cycles for r in results),
+        "wall_seconds": wall,
+        "programs": [asdict(r) for r in results],
+    }, indent=2))
+
+
+def write_junit(results: list[Result], path: Path, wall: float) -> None:
+    root  = ET.Element("testsuites")
+    suite = ET.SubElement(root, "testsuite", name="regress",
+                          tests=str(len(results)),
+                          failures=str(sum(not r.passed for r in results)),
+                          time=f"{wall:.3f}")
+    for r in results:
+        case = ET.SubElement(suite, "testcase", classname="regress",
+                             name=r.program, time=f"{r.seconds:.3f}")
+        props = ET.SubElement(case, "properties")
+        ET.SubElement(props, "property", name="cycles", value=str(r.cycles))
+        if not r.passed:
+            ET.SubElement(case, "failure", message=r.message)
+    ET.ElementTree(root).write(path, encoding="utf-8", xml_declaration=True)
+
+
+# --------------------------------------------------------------------------- #
+#  CLI                                                                        #
+# --------------------------------------------------------------------------- #
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    make_args: list[str] = []
+    if "--" in argv:
+        idx = argv.index("--")
+        argv, make_args = argv[:idx], argv[idx + 1:]
+
+    ap = argparse.ArgumentParser(description="Run every hex program in a directory.")
+    ap.add_argument("programs", type=Path, help="directory of *.hex programs")
+    ap.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--work-dir", type=Path, default=Path("regress_work"))
+    ap.add_argument("--json",  type=Path, default=None, help="JSON report path")
+    ap.add_argument("--junit", type=Path, default=None, help="JUnit XML report path")
+    ap.add_argument("--coverage", type=Path, default=None,
+                    help="merge ISA coverage of every run into this database")
+    ap.add_argument("--timeout", type=float, default=None,
+                    help="per-program timeout in seconds")
+    args = ap.parse_args(argv)
+
+    programs = sorted(args.programs.glob("*.hex"))
+    if not programs:
+        ap.error(f"no *.hex files in {args.programs}")
+    work_root = args.work_dir.resolve()
+    if args.coverage:
+        # every job's test-bench merges its bins into the same database
+        os.environ["TB_COVERAGE"] = str(args.coverage.resolve())
+    compile_once(make_args)
+
+    results: list[Result] = []
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [pool.submit(run_program, p.resolve(), work_root, make_args, args.timeout)
+                   for p in programs]
+        for fut in as_completed(futures):
+            r = fut.result()
+            results.append(r)
+            status = "PASS" if r.passed else "FAIL"
+            print(f"{status}  {r.program:32} {r.cycles:8d} cycles  {r.seconds:7.2f}s"
+                  + (f"  {r.message}" if r.message else ""), flush=True)
+    wall = time.perf_counter() - t0
+    results.sort(key=lambda r: r.program)
+
+    if args.json:
+        write_json(results, args.json, wall)
+    if args.junit:
+        write_junit(results, args.junit, wall)
+
+    if args.coverage and args.coverage.exists():
+        print(coverage_report(args.coverage))
+
+    failed = sum(not r.passed for r in results)
+    print(f"{len(results) - failed}/{len(results)} passed in {wall:.1f}s "
+          f"({args.jobs} jobs)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,10 @@
 # --------------------------------------------------------------------------- #
 #  Single-cycle RISC-V cocotb test-bench                                       #
 # --------------------------------------------------------------------------- #
+import json
 import logging
+import os
+import time
 from pathlib import Path
 
 import cocotb
@@ -9,21 +12,28 @@ from cocotb.clock import Clock
 from cocotb.result import SimTimeoutError
 from cocotb.triggers import RisingEdge, FallingEdge, ClockCycles, Timer, with_timeout
 
-from Helper_lib import (
-    ByteAddressableMemory,
-    RISCVInstruction,
-    is_signed,
-    sra,
-    read_file_to_list,
-    reverse_hex_string_endianness,
+from Helper_lib import read_file_to_list
+from Helper_Coverage import Coverage, merge as merge_coverage
+from Helper_ISS import RV32ISim
+from Helper_Log import AsyncLogSink, QueuedLogger
+from Helper_MMIO import tx_busy_cycles
+from Helper_Profile import Profile
+from Helper_Trace import TraceReader, TraceWriter, ensure_trace, image_hash
+from Helper_UART import UartRxDriver, UartTxMonitor, bit_time
+from Helper_Student import (
+    FlightRecorder,
+    WAVE_SIGNALS,
+    WaveRecorder,
+    Log_Datapath,
+    Log_Controller,
+    Log_Registers,
 )
-from Helper_Student import Log_Datapath, Log_Controller, Log_Registers
 
 
 # --------------------------------------------------------------------------- #
 #  Tiny diagnostics helpers                                                   #
 # --------------------------------------------------------------------------- #
-def _setup_logger() -> logging.Logger:
+def _setup_logger() -> logging.Logger | QueuedLogger:
     lg = logging.getLogger("PerfModel")
 
     banner_fmt = "%(asctime)s %(levelname)-5s | %(message)s"   # time comes from SimLog
@@ -36,42 +46,111 @@ def _setup_logger() -> logging.Logger:
         h.setFormatter(logging.Formatter(banner_fmt))
         lg.addHandler(h)
 
-    lg.setLevel(logging.INFO)
+    # TB_LOG_FILE=<path>[.gz|.zst]: all records go to an off-thread compressed
+    # sink (formatted on its own thread); the console keeps warnings/errors
+    log_file = os.environ.get("TB_LOG_FILE")
+    sink = next((h for h in lg.handlers if isinstance(h, AsyncLogSink)), None)
+    if log_file and sink is None:
+        for h in lg.handlers:
+            h.setLevel(logging.WARNING)
+        sink = AsyncLogSink(log_file)
+        sink.setFormatter(logging.Formatter(banner_fmt))
+        lg.addHandler(sink)
+
+    # TB_LOG_LEVEL=DEBUG brings back the per-cycle datapath/register dumps
+    lg.setLevel(os.environ.get("TB_LOG_LEVEL", "INFO").upper())
     lg.propagate = False          # prevent duplicates up the root logger
-    return lg
+    return lg if sink is None else QueuedLogger(lg, sink)
+
+
+def _wave_signals():
+    labels = os.environ.get("TB_WAVE_SIGNALS")
+    if not labels:
+        return WAVE_SIGNALS
+    known = dict(WAVE_SIGNALS)
+    wanted = [label.strip() for label in labels.split(",") if label.strip()]
+    unknown = [label for label in wanted if label not in known]
+    if unknown:
+        raise ValueError(f"TB_WAVE_SIGNALS: unknown {unknown}, choose from {list(known)}")
+    return tuple((label, known[label]) for label in wanted)
 
 
 # --------------------------------------------------------------------------- #
 #  Performance-model / reference                                              #
 # --------------------------------------------------------------------------- #
 class TB:
-    MEM_SIZE = 1024  # bytes
+    MEM_SIZE = RV32ISim.MEM_SIZE  # bytes
 
     def __init__(self, instr_hex: list[str], dut, pc_sig, regfile_sig):
         self.dut           = dut
         self.sig_pc        = pc_sig
         self.sig_regfile   = regfile_sig
-        self.instr_hex     = [h.replace(" ", "") for h in instr_hex]
-        
+
         self.log           = _setup_logger()
-        self.rf            = [0] * 32
-        self.pc            = 0
-        self.mem           = ByteAddressableMemory(self.MEM_SIZE)
+        self.iss           = RV32ISim(instr_hex, self.MEM_SIZE)
+        self.iss.uart.on_flush = self._log_uart_tx
         self.cycles        = 0
 
-    # ------------- utilities -------------------------------------------- #
-    def _wreg(self, idx: int, val: int) -> None:
-        if idx:                               # x0 is hard-wired to zero
-            self.rf[idx] = val & 0xFFFF_FFFF
+        # delta compare: only the written register + PC each cycle, all 32
+        # registers every ``sweep_interval`` cycles (1 = always, 0 = at end)
+        self.sweep_interval = int(os.environ.get("TB_SWEEP", 64))
+        self.last_rd        = 0
+        self._reg_handles   = [regfile_sig.Reg_Out[i] for i in range(32)]
+
+        # last TB_FLIGHT_RECORDER cycles of datapath signals, logged on failure;
+        # off by default – it reads every datapath signal on every cycle
+        depth = int(os.environ.get("TB_FLIGHT_RECORDER", 0))
+        self.recorder = FlightRecorder(dut, depth) if depth > 0 else None
+
+        # TB_WAVE=<dir>: every cycle of WAVE_SIGNALS (or the TB_WAVE_SIGNALS
+        # labels) in binary columns, queried afterwards with Helper_Wave.py
+        wave_dir = os.environ.get("TB_WAVE")
+        self.wave = WaveRecorder(dut, wave_dir, _wave_signals()) if wave_dir else None
+
+        # TB_PROFILE=1: model-side counters + hot-block report after run()
+        self.profile = Profile(self.iss) if os.environ.get("TB_PROFILE") else None
+
+        # TB_COVERAGE=<db.json>: ISA coverage bins, merged into the db at the end
+        self.coverage = Coverage(self.iss) if os.environ.get("TB_COVERAGE") else None
+
+        # TB_DUT_TRACE=<file.rvgt>: the DUT's own (PC, written reg, value) per
+        # cycle, for Helper_Bisect; the register-file write port is sampled
+        # just before each edge
+        path = os.environ.get("TB_DUT_TRACE")
+        self.dut_trace = TraceWriter(path, image_hash(instr_hex)) if path else None
+        self._write_port = (regfile_sig.write_enable, regfile_sig.A3, regfile_sig.WD3)
+
+    # ------------- reference-model state (owned by the ISS) ------------- #
+    @property
+    def rf(self) -> list[int]:
+        return self.iss.rf
+
+    @property
+    def pc(self) -> int:
+        return self.iss.pc
 
-    def _rreg(self, idx: int) -> int:
-        return self.rf[idx]
+    @property
+    def mem(self):
+        return self.iss.mem
+
+    @property
+    def instr_hex(self) -> list[str]:
+        return self.iss.instr_hex
+
+    def load_program(self, instr_hex: list[str]) -> None:
+        self.iss.load_program(instr_hex)
+
+    def write_instr(self, index: int, hex_word: str) -> None:
+        self.iss.write_instr(index, hex_word)
+
+    def _log_uart_tx(self, data: bytes) -> None:
+        # one record per flushed line/batch instead of one per byte
+        self.log.info("UART TX → %r (%s)", data.decode("latin-1"), data.hex(" "))
 
     # ------------- main reference step ---------------------------------- #
     async def model_step(self):
         self.cycles += 1
-        raw   = reverse_hex_string_endianness(self.instr_hex[self.pc // 4])
-        instr = RISCVInstruction(raw)
+        instr = self.iss.decoded[self.pc >> 2]
 
         # ─── pretty logging ─────────────────────────────────────────── #
         self.log.info("═══════════ NEW INSTRUCTION ═══════════")
@@ -79,125 +158,59 @@ class TB:
         instr.log(self.log)             # pretty one-liner from Helper_lib
         # ─────────────────────────────────────────────────────────────── #
 
-        next_pc = self.pc + 4
-        rd, rs1, rs2 = instr.rd, instr.rs1, instr.rs2
-        rv1, rv2     = self._rreg(rs1), self._rreg(rs2)
-        imm          = instr.imm
-        f3, f7       = instr.funct3, instr.funct7
-
-        # ---------------------------------------------------------------- #
-        #  Execute                                                         #
-        # ---------------------------------------------------------------- #
-        if instr.inst_type == "R":
-            match (f3, f7):
-                # custom NOT rd,rs1  (funct7=0x20, funct3=FUNCT3_SLL=1)
-                case (0x1, 0x20):
-                    res = (~rv1) & 0xFFFFFFFF
-                case (0x0, 0x00): res = rv1 + rv2
-                case (0x0, 0x20): res = rv1 - rv2
-                case (0x7, _):    res = rv1 & rv2
-                case (0x6, _):    res = rv1 | rv2
-                case (0x4, _):    res = rv1 ^ rv2
-                case (0x1, _):    res = rv1 << (rv2 & 0x1F)
-                case (0x5, 0x00): res = rv1 >> (rv2 & 0x1F)
-                case (0x5, 0x20): res = sra(rv1,  rv2 & 0x1F)
-                case (0x2, _):    res = int(is_signed(rv1) <  is_signed(rv2))
-                case (0x3, _):    res = int(rv1 < rv2)
-                case _: raise AssertionError("Unsupported R-type variant")
-            self._wreg(rd, res)
-
-        elif instr.inst_type == "I":
-            match f3:
-                case 0x0: res = rv1 + imm
-                case 0x7: res = rv1 & imm
-                case 0x6: res = rv1 | imm
-                case 0x4: res = rv1 ^ imm
-                case 0x2: res = int(is_signed(rv1) < is_signed(imm))
-                case 0x3: res = int(rv1 < imm)
-                case 0x1: res = rv1 << (imm & 0x1F)
-                case 0x5:
-                    res = rv1 >> (imm & 0x1F) if f7 == 0x00 else sra(rv1, imm & 0x1F)
-                case _: raise AssertionError("Unsupported I-type variant")
-            self._wreg(rd, res)
-
-        elif instr.inst_type == "LOAD":
-            addr = rv1 + imm
-            if addr == 0x00000404:
-                # Simulate UART RX: return 0xFFFFFFFF to indicate FIFO empty
-                val = 0xFFFFFFFF
-            else:
-                if addr + 4 > self.MEM_SIZE:
-                    raise ValueError(f"Memory access out of range: {hex(addr)} (+4)")
-                size = {0: 1, 1: 2, 2: 4}[f3 & 0b11]
-                raw  = self.mem.read_bytes(addr, size)
-                val  = int.from_bytes(raw, "little", signed=(f3 in (0, 1, 2)))
-                if f3 in (4, 5):  # LBU/LHU
-                    val &= (1 << (8 * size)) - 1
-            self._wreg(rd, val)
-
-        elif instr.inst_type == "STORE":
-            addr = rv1 + imm
-            data = self._rreg(rs2)
-            if addr == 0x00000400:
-                self.log.info(f"UART TX → '{chr(data & 0xFF)}' (0x{data & 0xFF:02X})")
-                # optionally store TX output for further checking
-            else:
-                size = {0: 1, 1: 2, 2: 4}[f3 & 0b11]
-                # mask to the low “size” bytes (e.g. for SH, size=2 → mask=0xFFFF)
-                mask = (1 << (8 * size)) - 1
-                low_bits = data & mask
-                self.mem.write_bytes(addr, low_bits.to_bytes(size, "little"))
-
-        elif instr.inst_type == "BRANCH":
-            cmp = {
-                0x0: rv1 == rv2,
-                0x1: rv1 != rv2,
-                0x4: is_signed(rv1) <  is_signed(rv2),
-                0x5: is_signed(rv1) >= is_signed(rv2),
-                0x6: rv1 < rv2,
-                0x7: rv1 >= rv2,
-            }[f3]
-            if cmp:
-                next_pc = self.pc + imm
-
-        elif instr.inst_type == "JAL":
-            self._wreg(rd, self.pc + 4)
-            next_pc = self.pc + imm
-
-        elif instr.inst_type == "JALR":
-            self._wreg(rd, self.pc + 4)
-            next_pc = (rv1 + imm) & ~1
-
-        elif instr.inst_type == "LUI":
-            self._wreg(rd, imm)
-
-        elif instr.inst_type == "AUIPC":
-            self._wreg(rd, self.pc + imm)
-
-        else:
-            raise AssertionError(f"Unsupported instruction type {instr.inst_type}")
-
-        # ---------------------------------------------------------------- #
-        self.pc = next_pc & 0xFFFF_FFFF  # keep it 32-bit
+        pc = self.pc
+        rs2_val = self.rf[instr.rs2]            # shift amount, before rd is written
+        self.last_rd = self.iss.written[pc >> 2]
+        self.iss.step()
+        if self.profile is not None:
+            self.profile.record(pc, self.pc)
+        if self.coverage is not None:
+            self.coverage.sample(pc, self.pc, rs2_val)
 
     # ------------- DUT check ------------------------------------------- #
-    def _compare(self):
-        dut_pc  = self.sig_pc.value.integer & 0xFFFF_FFFF
-        assert dut_pc == self.pc, f"PC mismatch: model=0x{self.pc:X}, dut=0x{dut_pc:X}"
-
-        mask = 0xFFFF_FFFF
-        for i in range(32):
-            model_val = self.rf[i] & mask
-            # resolve any 'x' bits to zero before int()
-            bv = self.sig_regfile.Reg_Out[i].value    # BinaryValue
-            bitstr = bv.binstr.replace('x','0').replace('X','0')
-            dut_val = int(bitstr, 2) & mask
-            assert model_val == dut_val, (
-                f"x{i} mismatch: model=0x{model_val:X}, dut=0x{dut_val:X}"
-            )
+    @staticmethod
+    def _resolve(bv) -> int:
+        # resolve any 'x' bits to zero before int()
+        bitstr = bv.binstr.replace('x','0').replace('X','0')
+        return int(bitstr, 2) & 0xFFFF_FFFF
+
+    def _read_reg(self, i: int) -> int:
+        return self._resolve(self._reg_handles[i].value)
+
+    def _check_reg(self, i: int) -> None:
+        model_val = self.rf[i] & 0xFFFF_FFFF
+        dut_val   = self._read_reg(i)
+        assert model_val == dut_val, (
+            f"x{i} mismatch: model=0x{model_val:X}, dut=0x{dut_val:X}"
+        )
+
+    def _compare(self, rd: int | None = None, full: bool = False):
+        """
+        Check PC plus register *rd* (the one written this cycle).  All 32
+        registers are swept when *rd* is None, when *full* is set, or every
+        ``sweep_interval`` cycles, which catches writes the model didn't make.
+        """
+        try:
+            dut_pc  = self.sig_pc.value.integer & 0xFFFF_FFFF
+            assert dut_pc == self.pc, f"PC mismatch: model=0x{self.pc:X}, dut=0x{dut_pc:X}"
+
+            every = self.sweep_interval
+            if rd is None or full or (every and self.cycles % every == 0):
+                for i in range(32):
+                    self._check_reg(i)
+            elif rd:
+                self._check_reg(rd)
+        except AssertionError:
+            if self.recorder is not None:
+                self.recorder.dump(self.log)
+            raise
 
     # ------------- pretty print helper --------------------------------- #
     def _dump_dut(self):
+        if self.recorder is not None:
+            self.recorder.snapshot(self.cycles)
+        if self.wave is not None:
+            self.wave.snapshot(self.cycles)
         Log_Datapath(self.dut, self.log)
         Log_Controller(self.dut, self.log)
 
@@ -205,23 +218,58 @@ class TB:
         Log_Registers(self.dut, self.log)
         # nothing: banner at top is enough
 
+    async def _clock(self):
+        """One DUT cycle with the debug dumps (and the DUT trace, if on)."""
+        self._dump_dut()
+        if self.dut_trace is None:
+            await ClockCycles(self.dut.clk, 1)
+            self._dump_dut_register()
+            return
+        we, a3, wd3 = (self._resolve(h.value) for h in self._write_port)
+        rd = a3 & 0x1F if we else 0
+        await ClockCycles(self.dut.clk, 1)
+        self._dump_dut_register()
+        self.dut_trace.append(self._resolve(self.sig_pc.value), rd, wd3 if rd else 0)
+
     # ------------- top-level run --------------------------------------- #
     async def run(self):
         self.log.info("Running reference model for %d instructions …",
                       len(self.instr_hex))
 
         await self.model_step()      # decode & log 1st instr
-        self._dump_dut()             # <--- moved here for symmetry
-        await ClockCycles(self.dut.clk, 1)
-        self._dump_dut_register()             # <--- moved here for symmetry
-        self._compare()
+        await self._clock()
+        self._compare(self.last_rd)
 
-        while int(self.instr_hex[self.pc // 4], 16) != 0:
+        while not self.iss.halted():
             await self.model_step()
-            self._dump_dut()             # <--- moved here for symmetry
-            await ClockCycles(self.dut.clk, 1)
-            self._dump_dut_register()         # <--- moved here for symmetry
-            self._compare()
+            await self._clock()
+            self._compare(self.last_rd)
+        self._compare(full=True)
+        self.iss.bus.flush()
+        if self.profile is not None:
+            source = os.environ.get("TB_PROFILE_SOURCE", "instructions.s")
+            self.log.info("***** PROFILE *****\n%s", self.profile.report(source))
+
+    async def run_replay(self, trace_dir: str = "trace_cache"):
+        """
+        Compare the DUT against a recorded golden trace – the model never
+        executes here, it only mirrors the (PC, rd, value) deltas.
+        """
+        path  = ensure_trace(self.instr_hex, trace_dir, self.MEM_SIZE)
+        trace = TraceReader(path)
+        self.log.info("Replaying golden trace %s (%d cycles) …", path.name, len(trace))
+
+        rf = self.rf
+        for pc, rd, val in trace:
+            self.cycles += 1
+            await self._clock()
+            if self.coverage is not None:
+                prev = self.iss.pc
+                self.coverage.sample(prev, pc, rf[self.iss.decoded[prev >> 2].rs2])
+            self.iss.pc = pc
+            rf[rd] = val                     # rd = 0 carries 0 → x0 untouched
+            self._compare(rd)
+        self._compare(full=True)
 
 
 # --------------------------------------------------------------------------- #
@@ -234,7 +282,9 @@ async def Single_cycle_test(dut):
     await RisingEdge(dut.clk)
     dut.reset.value = 0
     await FallingEdge(dut.clk)
-    instruction_lines = read_file_to_list('Instructions.hex')
+    # PROGRAM_HEX lets the regression runner point at another image
+    program = os.environ.get("PROGRAM_HEX", "Instructions.hex")
+    instruction_lines = read_file_to_list(program)
     # Remove white-space and make one word per list element
     instruction_lines = [h.replace(" ", "") for h in instruction_lines]
 
@@ -245,4 +295,136 @@ async def Single_cycle_test(dut):
     # -------------------------------------------------------------------------
 
     tb = TB(instruction_lines, dut, dut.fetchPC, dut.datapath_i.RF)
-    await tb.run()
+    t0 = time.perf_counter()
+    try:
+        # TB_MODE=replay compares against a cached golden trace instead of
+        # stepping the model every cycle (TB_TRACE_DIR picks the cache)
+        if os.environ.get("TB_MODE", "lockstep") == "replay":
+            await tb.run_replay(os.environ.get("TB_TRACE_DIR", "trace_cache"))
+        else:
+            await tb.run()
+    finally:
+        # TB_SUMMARY: machine-readable result for regress.py
+        summary = os.environ.get("TB_SUMMARY")
+        if summary:
+            Path(summary).write_text(json.dumps({
+                "program": program,
+                "cycles":  tb.cycles,
+                "seconds": time.perf_counter() - t0,
+                **({"profile": tb.profile.counters()} if tb.profile else {}),
+            }))
+        if tb.dut_trace is not None:
+            tb.dut_trace.close()             # keeps the failing cycle too
+        if tb.wave is not None:
+            tb.wave.close()
+        if tb.coverage is not None:
+            merge_coverage(os.environ["TB_COVERAGE"], tb.coverage.bins(),
+                           Path(program).name)
+
+
+# --------------------------------------------------------------------------- #
+#  Per-cycle overhead benchmark (TB_BENCH=<results.json>, run by bench.py)    #
+# --------------------------------------------------------------------------- #
+# stage → logger level; each stage adds one piece of per-cycle work:
+#   clock    bare ClockCycles (the model only steps to know when to stop)
+#   model    + model_step with logging off
+#   compare  + _compare
+#   log      + model_step's INFO records
+#   dumps    + Helper_Student datapath/register dumps (DEBUG)
+BENCH_STAGES = {
+    "clock":   logging.WARNING,
+    "model":   logging.WARNING,
+    "compare": logging.WARNING,
+    "log":     logging.INFO,
+    "dumps":   logging.DEBUG,
+}
+
+
+@cocotb.test(skip=not os.environ.get("TB_BENCH"))
+async def Overhead_bench(dut):
+    await cocotb.start(Clock(dut.clk, 10, 'us').start(start_high=False))
+    program = os.environ.get("PROGRAM_HEX", "Instructions.hex")
+    lines   = [h.replace(" ", "") for h in read_file_to_list(program)]
+    lines  += ['00000000'] * (64 - len(lines))
+    reps    = int(os.environ.get("TB_BENCH_REPS", 20))
+
+    us_per_cycle = {}
+    for stage, level in BENCH_STAGES.items():
+        cycles  = 0
+        elapsed = 0.0
+        for _ in range(reps):
+            dut.reset.value = 1
+            await RisingEdge(dut.clk)
+            dut.reset.value = 0
+            await FallingEdge(dut.clk)
+            tb = TB(lines, dut, dut.fetchPC, dut.datapath_i.RF)
+            tb.log.setLevel(level)
+            t0 = time.perf_counter()
+            while not tb.iss.halted():
+                if stage == "clock":
+                    tb.iss.step()
+                    await ClockCycles(dut.clk, 1)
+                    continue
+                await tb.model_step()
+                if stage == "dumps":
+                    await tb._clock()
+                else:
+                    await ClockCycles(dut.clk, 1)
+                if stage != "model":
+                    tb._compare(tb.last_rd)
+            elapsed += time.perf_counter() - t0
+            cycles  += tb.iss.retired
+        us_per_cycle[stage] = elapsed / cycles * 1e6
+        tb.log.warning("bench %-8s %8.1f us/cycle", stage, us_per_cycle[stage])
+    Path(os.environ["TB_BENCH"]).write_text(json.dumps(
+        {"program": program, "reps": reps, "us_per_cycle": us_per_cycle}))
+
+
+# --------------------------------------------------------------------------- #
+#  UART bit-level test (needs shortened frames, see Makefile)                  #
+# --------------------------------------------------------------------------- #
+@cocotb.test(skip=not (os.environ.get("UART_CLK_FREQ") or os.environ.get("UART_BAUD_RATE")))
+async def Uart_stream_test(dut):
+    log = _setup_logger()
+    await cocotb.start(Clock(dut.clk, 10, 'us').start(start_high=False))
+    await cocotb.start(Clock(dut.uart_clk, 10, 'us').start(start_high=False))
+    bt = bit_time(dut, 10)
+    # the CPU's own RX pops (first few dozen cycles) must be over before the
+    # first driven byte lands ~9.5 bit times after reset
+    assert bt >= 8 * 10, f"bit time {bt}us too short for this test"
+
+    # serial input is the `uart_tx` port (board naming, see Helper_UART)
+    rx  = UartRxDriver(dut.uart_tx, bt)
+    mon = UartTxMonitor(dut.datapath_i.uart.uart_tx, bt).start()
+    dut.reset.value = 1
+    await RisingEdge(dut.clk)
+    dut.reset.value = 0
+
+    # --- TX: the bytes the model's UART accepts at the same frame length ----
+    program  = os.environ.get("PROGRAM_HEX", "Instructions.hex")
+    model    = RV32ISim(read_file_to_list(program))
+    model.uart.tx_busy = tx_busy_cycles(int(dut.datapath_i.uart.CLK_FREQ.value),
+                                        int(dut.datapath_i.uart.BAUD_RATE.value))
+    model.run(max_steps=10_000)
+    expected = bytes(model.uart_tx)
+
+    # --- RX: stream one FIFO's worth of bytes ----------------------------
+    payload = bytes(range(0x41, 0x41 + 16))
+    t0 = time.perf_counter()
+    await rx.send(payload)
+    await Timer(2 * bt, 'us')                   # stop bit + synchroniser
+    wall = time.perf_counter() - t0
+
+    uart = dut.datapath_i.uart
+    assert int(uart.fifo_count.value) == len(payload), \
+        f"RX FIFO holds {int(uart.fifo_count.value)} bytes, expected {len(payload)}"
+    got = bytes(int(uart.fifo[i].value) for i in range(len(payload)))
+    assert got == payload, f"RX FIFO {got!r} != sent {payload!r}"
+    log.info("UART RX: %d bytes in %.2fs wall (%d bit-times each)",
+             len(payload), wall, bt // 10)
+
+    if expected:
+        got_tx = await with_timeout(mon.recv(len(expected)),
+                                    12 * bt * len(expected), 'us')
+        assert got_tx == expected, f"UART TX {got_tx!r} != model {expected!r}"
+    mon.stop()
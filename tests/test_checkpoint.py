@@ -0,0 +1,182 @@
+"""
+Checkpoints and the first-divergence search: a restored checkpoint must
+replay to the same registers, memory and UART state as an uninterrupted
+run, and ``Helper_Bisect`` must name the exact cycle a DUT trace goes wrong.
+
+    cd tests && python -m pytest -q test_checkpoint.py
+"""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from Helper_Bisect import find_divergence, main as bisect_main, read_dut_trace
+from Helper_Checkpoint import Checkpointer
+from Helper_ISS import RV32ISim
+from Helper_JIT import BlockJIT
+from Helper_MMIO import DeviceBus, UARTDevice
+from Helper_Trace import TraceReader, TraceWriter, image_hash, record_trace
+from Helper_lib import RISCVInstruction
+
+enc = RISCVInstruction.encode
+OP_I, OP_R, OP_LOAD, OP_STORE, OP_BRANCH = 0x13, 0x33, 0x03, 0x23, 0x63
+LOOPS = 600
+
+# x1 = UART, x2 = buffer; each pass pops RX, folds it into x4, stores x4 to
+# buffer[x5 & 63] and to TX
+WORDS = [
+    enc(OP_I, rd=1, imm=0x400), enc(OP_I, rd=2, imm=0x100), enc(OP_I, rd=5, imm=LOOPS),
+    enc(OP_LOAD, rd=3, funct3=2, rs1=1, imm=4),                     # lw   x3, 4(x1)
+    enc(OP_R, rd=4, rs1=4, rs2=3),                                  # add  x4, x4, x3
+    enc(OP_I, rd=4, rs1=4, imm=37),                                 # addi x4, x4, 37
+    enc(OP_I, rd=6, funct3=7, rs1=5, imm=63),                       # andi x6, x5, 63
+    enc(OP_R, rd=7, rs1=2, rs2=6),                                  # add  x7, x2, x6
+    enc(OP_STORE, funct3=0, rs1=7, rs2=4),                          # sb   x4, 0(x7)
+    enc(OP_STORE, funct3=0, rs1=1, rs2=4),                          # sb   x4, 0(x1)
+    enc(OP_I, rd=5, rs1=5, imm=-1),
+    enc(OP_BRANCH, funct3=1, rs1=5, rs2=0, imm=-32),                # bne  x5, x0, loop
+    0,
+]
+PROGRAM = [w.to_bytes(4, "little").hex(" ").upper() for w in WORDS]
+CYCLES  = 3 + 9 * LOOPS
+
+
+def _sim(rx_source=None) -> RV32ISim:
+    bus = DeviceBus()
+    bus.register(UARTDevice(rx_source, rx_interval=7, tx_busy=20), RV32ISim.UART_BASE)
+    return RV32ISim(PROGRAM, bus=bus)
+
+
+def _state(sim: RV32ISim):
+    uart = sim.uart
+    return (sim.pc, sim.retired, list(sim.rf), sim.mem.dump(), sim.mmio_reads,
+            sim.mmio_writes, bytes(uart.transmitted), uart.tx_dropped, uart.rx_dropped,
+            tuple(uart.fifo), uart.read_data)
+
+
+@pytest.fixture
+def rx_file(tmp_path):
+    path = tmp_path / "rx.bin"
+    path.write_bytes(os.urandom(2000))
+    return str(path)
+
+
+# --------------------------------------------------------------------------- #
+#  Checkpointer                                                               #
+# --------------------------------------------------------------------------- #
+@pytest.mark.parametrize("jit", [False, True], ids=["interp", "jit"])
+def test_restore_and_rerun_reproduce_the_run(rx_file, jit):
+    ref = _sim(rx_file)
+    ref.run()
+    assert ref.retired == CYCLES and ref.uart.tx_dropped and ref.uart.rx_dropped
+
+    sim = _sim(rx_file)
+    engine = BlockJIT(sim) if jit else sim
+    cpr = Checkpointer(sim, interval=500, page_size=64)
+    cpr.run(engine=engine)
+    assert _state(sim) == _state(ref)
+
+    for cp in (cpr.checkpoints[0], cpr.checkpoints[3], cpr.checkpoints[-2]):
+        cpr.restore(cp)
+        engine.run()
+        assert _state(sim) == _state(ref)
+
+
+@pytest.mark.parametrize("cycle", [0, 1, 1234, 2500, CYCLES])
+def test_seek_matches_a_fresh_run(rx_file, cycle):
+    sim = _sim(rx_file)
+    cpr = Checkpointer(sim, interval=500)
+    cpr.run()
+    cpr.seek(cycle)
+
+    fresh = _sim(rx_file)
+    fresh.run(cycle)
+    assert _state(sim) == _state(fresh)
+
+
+def test_restore_raises_when_the_rx_source_cannot_rewind():
+    r, w = os.pipe()
+    os.write(w, bytes(range(200)))
+    try:
+        with os.fdopen(r, "rb", closefd=False) as src:
+            sim = _sim(src)
+            cpr = Checkpointer(sim, interval=500)
+            cpr.run(2000)
+            before = _state(sim)
+            cpr.restore(cpr.checkpoints[-1])       # nothing read since: fine
+            assert _state(sim) == before
+            with pytest.raises(ValueError, match="cannot be rewound"):
+                cpr.restore(cpr.checkpoints[1])
+            assert _state(sim) == before           # checked before anything changed
+            sim.uart.close()
+    finally:
+        os.close(r)
+        os.close(w)
+
+
+def test_unchanged_pages_are_shared():
+    sim = _sim()
+    cpr = Checkpointer(sim, interval=500, page_size=64)
+    cpr.run()
+    first, last = cpr.checkpoints[1], cpr.checkpoints[-1]
+    # the loop only writes the 64-byte buffer at 0x100
+    assert all(first.pages[a] is last.pages[a] for a in first.pages if a != 0x100)
+    assert cpr.footprint() < len(cpr.checkpoints) * 64 + sim.mem_size
+
+
+# --------------------------------------------------------------------------- #
+#  Bisection                                                                  #
+# --------------------------------------------------------------------------- #
+def _golden(path) -> list[tuple]:
+    record_trace(RV32ISim(PROGRAM), path, image_hash(PROGRAM))
+    return list(TraceReader(path))
+
+
+def _corrupt(records: list[tuple], cycle: int) -> list[tuple]:
+    """A spurious write of x29 (never written by the program) at *cycle*."""
+    records = list(records)
+    pc, rd, _ = records[cycle - 1]
+    assert rd == 0
+    records[cycle - 1] = (pc, 29, 0xDEAD)
+    return records
+
+
+def _stores(records) -> list[int]:
+    return [n for n, (_, rd, _) in enumerate(records, 1) if rd == 0]
+
+
+@pytest.mark.parametrize("interval", [1, 64, 1000, 10_000])
+def test_bisect_finds_the_corrupted_cycle(tmp_path, interval):
+    records = _golden(tmp_path / "golden.rvgt")
+    assert find_divergence(RV32ISim(PROGRAM), records, interval)[0] is None
+    for cycle in (_stores(records)[0], 2345, _stores(records)[-1]):
+        cycle = next(n for n in _stores(records) if n >= cycle)
+        div, _ = find_divergence(RV32ISim(PROGRAM), _corrupt(records, cycle), interval)
+        assert div.cycle == cycle
+        assert div.model[1][29] == 0 and div.dut[1][29] == 0xDEAD
+
+
+def test_bisect_cli_reports_the_cycle(tmp_path, capsys):
+    records = _golden(tmp_path / "golden.rvgt")
+    cycle = next(n for n in _stores(records) if n >= 4000)
+    bad = tmp_path / "dut.rvgt"
+    with TraceWriter(bad, image_hash(PROGRAM)) as tw:
+        for rec in _corrupt(records, cycle):
+            tw.append(*rec)
+    hex_path = tmp_path / "prog.hex"
+    hex_path.write_text("\n".join(PROGRAM) + "\n")
+
+    assert read_dut_trace(bad) == _corrupt(records, cycle)
+    assert bisect_main([str(hex_path), str(bad), "--interval", "500", "--jit"]) == 1
+    out = capsys.readouterr().out
+    assert f"first divergence at cycle {cycle} " in out
+    assert "x29  model=0x00000000  dut=0x0000DEAD" in out
+
+
+def test_model_halting_before_the_dut_trace_ends(tmp_path):
+    records = _golden(tmp_path / "golden.rvgt")
+    records.append((0x34, 0, 0))
+    div, _ = find_divergence(RV32ISim(PROGRAM), records, 500)
+    assert div.cycle == CYCLES + 1 and div.model is None
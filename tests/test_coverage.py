@@ -0,0 +1,93 @@
+"""
+ISA coverage: bins sampled from the model, merging runs into one database
+and the greedy set cover behind the redundant-program report.
+
+    cd tests && python -m pytest -q test_coverage.py
+"""
+
+from __future__ import annotations
+
+import json
+from collections import Counter
+
+import pytest
+
+from Helper_Coverage import ALL_BINS, Coverage, merge, report
+from Helper_ISS import RV32ISim
+from Helper_lib import RISCVInstruction
+
+enc = RISCVInstruction.encode
+
+
+def _hex(words: list[int]) -> list[str]:
+    return [w.to_bytes(4, "little").hex(" ").upper() for w in words]
+
+
+def _db(path) -> dict:
+    return json.loads(path.read_text())
+
+
+def test_sampled_bins():
+    words = [enc(0x13, rd=1, imm=-3),                                # addi x1, x0, -3
+             enc(0x13, rd=2, imm=31),                                # addi x2, x0, 31
+             enc(0x33, rd=3, funct3=1, rs1=1, rs2=2),                # sll  x3, x1, x2
+             enc(0x13, rd=1, rs1=1, imm=1),                          # addi x1, x1, 1
+             enc(0x63, funct3=1, rs1=1, imm=-4),                     # bne  x1, x0, -4
+             0]
+    cov = Coverage(RV32ISim(_hex(words)))
+    assert cov.collect() == 3 + 3 * 2
+    bins = cov.bins()
+    assert bins["op:addi"] == 2 + 3
+    assert bins["imm:addi:neg"] == 1 and bins["imm:addi:pos"] == 4
+    assert bins["shamt:sll:31"] == 1
+    assert bins["br:bne:taken"] == 2 and bins["br:bne:not_taken"] == 1
+    assert bins["imm:bne:neg"] == 3
+    assert set(bins) <= set(ALL_BINS)
+
+
+def test_merged_databases_hold_the_union(tmp_path):
+    a = Counter({"op:add": 3, "op:sub": 1, "br:beq:taken": 2})
+    b = Counter({"op:add": 1, "op:lw": 5})
+    merge(tmp_path / "a.json", a, "a.hex")
+    merge(tmp_path / "b.json", b, "b.hex")
+    merge(tmp_path / "ab.json", a, "a.hex")
+    merge(tmp_path / "ab.json", b, "b.hex")
+
+    da, db, dab = (_db(tmp_path / f"{n}.json") for n in ("a", "b", "ab"))
+    assert dab["runs"] == da["runs"] + db["runs"] == 2
+    assert Counter(dab["bins"]) == Counter(da["bins"]) + Counter(db["bins"])
+    assert set(dab["bins"]) == set(a) | set(b)
+    assert dab["programs"] == {**da["programs"], **db["programs"]}
+
+
+def test_merging_a_program_again_ors_its_mask(tmp_path):
+    db = tmp_path / "cov.json"
+    merge(db, Counter({"op:add": 1}), "p.hex")
+    merge(db, Counter({"op:sub": 1}), "p.hex")
+    merge(db, Counter({"op:sub": 1}), "p.hex")
+    mask = int(_db(db)["programs"]["p.hex"], 16)
+    assert mask == (1 << ALL_BINS.index("op:add")) | (1 << ALL_BINS.index("op:sub"))
+
+
+def test_set_cover_marks_redundant_programs(tmp_path):
+    db = tmp_path / "cov.json"
+    merge(db, Counter({"op:add": 1}), "small.hex")                  # inside big.hex
+    merge(db, Counter({"op:add": 1, "op:sub": 1, "op:lw": 1}), "big.hex")
+    merge(db, Counter({"op:sw": 1}), "store.hex")
+    merge(db, Counter({"op:sw": 1, "op:lw": 1}), "overlap.hex")     # big + store
+    text = report(db)
+    assert "programs not needed for this coverage: 2/4" in text
+    assert text.splitlines()[-2:] == ["  overlap.hex", "  small.hex"]
+    assert f"coverage: 4/{len(ALL_BINS)} bins" in text
+    uncovered_ops = next(l for l in text.splitlines() if l.startswith("  op ")).split()
+    assert "beq" in uncovered_ops and "add" not in uncovered_ops
+
+
+def test_database_from_another_bin_space_is_rejected(tmp_path):
+    db = tmp_path / "cov.json"
+    merge(db, Counter({"op:add": 1}))
+    data = _db(db)
+    data["space"] = "0" * 16
+    db.write_text(json.dumps(data))
+    with pytest.raises(ValueError, match="different bin space"):
+        merge(db, Counter({"op:add": 1}))
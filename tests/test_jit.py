@@ -0,0 +1,184 @@
+"""
+BlockJIT against the interpreter: every program must leave the model in the
+same architectural state (PC, retired count, registers, memory, MMIO) whether
+it runs under ``RV32ISim.run`` or ``BlockJIT.run``.
+
+    cd tests && python -m pytest -q test_jit.py
+"""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from Helper_ISS import RV32ISim
+from Helper_JIT import BlockJIT
+from Helper_lib import RISCVInstruction, SparseMemory
+
+enc = RISCVInstruction.encode
+SEED = 20
+
+OP_R, OP_I, OP_LOAD, OP_STORE = 0x33, 0x13, 0x03, 0x23
+OP_BRANCH, OP_JAL, OP_JALR, OP_LUI, OP_AUIPC = 0x63, 0x6F, 0x67, 0x37, 0x17
+
+# (funct3, funct7) of every R-type variant; (1, 0x20) is the custom NOT
+_R_VARIANTS = ((0, 0x00), (0, 0x20), (1, 0x00), (2, 0x00), (3, 0x00), (4, 0x00),
+               (5, 0x00), (5, 0x20), (6, 0x00), (7, 0x00), (1, 0x20))
+DATA, LOOP = 20, 21                         # x20: data pointer, x21: loop counter
+
+
+def _hex(words: list[int]) -> list[str]:
+    return [w.to_bytes(4, "little").hex(" ").upper() for w in words]
+
+
+def _straight(rng: random.Random) -> int:
+    """One instruction that neither redirects nor faults; writes x1..x15."""
+    rd, rs1, rs2 = rng.randrange(1, 16), rng.randrange(16), rng.randrange(16)
+    k = rng.random()
+    if k < 0.35:
+        f3, f7 = rng.choice(_R_VARIANTS)
+        return enc(OP_R, rd, f3, rs1, rs2, f7)
+    if k < 0.45:
+        f3 = rng.choice((1, 5))
+        f7 = 0x20 if f3 == 5 and rng.random() < 0.5 else 0
+        return enc(OP_I, rd, f3, rs1, imm=f7 << 5 | rng.randrange(32))
+    if k < 0.65:
+        return enc(OP_I, rd, rng.choice((0, 2, 3, 4, 6, 7)), rs1, imm=rng.randint(-2048, 2047))
+    if k < 0.80:                                # any alignment within 64 bytes of x20
+        return enc(OP_STORE, 0, rng.choice((0, 1, 2)), DATA, rs2, imm=rng.randrange(64))
+    if k < 0.95:
+        return enc(OP_LOAD, rd, rng.choice((0, 1, 2, 4, 5)), DATA, imm=rng.randrange(64))
+    return enc(rng.choice((OP_LUI, OP_AUIPC)), rd, imm=rng.getrandbits(32))
+
+
+def _random_words(rng: random.Random, length: int = 56) -> list[int]:
+    """Straight-line code with forward skips and counted loops, then the zero word."""
+    words = [_addi(DATA, 0, 0x200)]
+    while len(words) < length - 7:
+        k = rng.random()
+        if k < 0.12:                            # branch / jump over 1..3 instructions
+            n, j = rng.randint(1, 3), rng.random()
+            if j < 0.6:
+                words.append(enc(OP_BRANCH, 0, rng.choice((0, 1, 4, 5, 6, 7)),
+                                 rng.randrange(16), rng.randrange(16), imm=4 * (n + 1)))
+            elif j < 0.8:
+                words.append(enc(OP_JAL, rng.randrange(16), imm=4 * (n + 1)))
+            else:
+                words.append(enc(OP_JALR, rng.randrange(16), 0, 0,
+                                 imm=4 * (len(words) + n + 1)))
+            words += [_straight(rng) for _ in range(n)]
+        elif k < 0.20:
+            n = rng.randint(1, 4)
+            words.append(_addi(LOOP, 0, rng.randint(1, 6)))
+            words += [_straight(rng) for _ in range(n)]
+            words += [_addi(LOOP, LOOP, -1),
+                      enc(OP_BRANCH, 0, 1, LOOP, 0, imm=-4 * (n + 1))]
+        else:
+            words.append(_straight(rng))
+    return words + [0]
+
+
+def _program(index: int, seed: int = SEED) -> list[str]:
+    return _hex(_random_words(random.Random(f"{seed}:{index}")))
+
+
+def _state(sim: RV32ISim):
+    uart = sim.uart
+    return (sim.pc, sim.retired, list(sim.rf), sim.mem.dump(0, sim.mem_size),
+            bytes(uart.transmitted), uart.tx_dropped, sim.mmio_reads, sim.mmio_writes)
+
+
+def _both(lines: list[str], **kwargs) -> tuple[RV32ISim, RV32ISim]:
+    return RV32ISim(lines, **kwargs), RV32ISim(lines, **kwargs)
+
+
+def _addi(rd, rs1, imm):
+    return enc(OP_I, rd=rd, rs1=rs1, imm=imm)
+
+
+# --------------------------------------------------------------------------- #
+#  Random programs                                                            #
+# --------------------------------------------------------------------------- #
+@pytest.mark.parametrize("index", range(200))
+def test_random_program(index):
+    ref, sim = _both(_program(index))
+    ref.run()
+    BlockJIT(sim).run()
+    assert _state(sim) == _state(ref)
+
+
+@pytest.mark.parametrize("index", range(0, 200, 10))
+def test_random_program_in_slices(index):
+    """``max_steps`` budgets that end mid-block stop on the same instruction."""
+    ref, sim = _both(_program(index))
+    jit   = BlockJIT(sim)
+    rng   = random.Random(index)
+    while not ref.halted():
+        n = rng.randint(1, 40)
+        assert jit.run(n) == ref.run(n)
+        assert _state(sim) == _state(ref)
+    assert sim.halted()
+
+
+@pytest.mark.parametrize("index", range(0, 200, 10))
+def test_random_program_sparse_memory(index):
+    """Without a word view every memory access goes through the handlers."""
+    lines = _program(index)
+    ref = RV32ISim(lines, 1024, mem=SparseMemory(1024))
+    sim = RV32ISim(lines, 1024, mem=SparseMemory(1024))
+    ref.run()
+    BlockJIT(sim).run()
+    assert _state(sim) == _state(ref)
+
+
+# --------------------------------------------------------------------------- #
+#  Hand-written corner cases                                                  #
+# --------------------------------------------------------------------------- #
+def test_subword_sign_extension_and_unaligned_halfwords():
+    words = [
+        enc(OP_LUI, rd=1, imm=0x8765_4000), _addi(1, 1, 0x321),     # x1 = 0x87654321
+        _addi(2, 0, 0x100),
+        enc(OP_STORE, funct3=2, rs1=2, rs2=1, imm=0),               # sw x1, 0(x2)
+        enc(OP_STORE, funct3=0, rs1=2, rs2=1, imm=5),               # sb x1, 5(x2)
+        enc(OP_STORE, funct3=1, rs1=2, rs2=1, imm=7),               # sh x1, 7(x2)
+        *(enc(OP_LOAD, rd=3 + i, funct3=f3, rs1=2, imm=off)         # lb lh lbu lhu
+          for i, (f3, off) in enumerate(((0, 3), (1, 2), (4, 3), (5, 1), (1, 7), (0, 8)))),
+        enc(OP_LOAD, rd=0, funct3=0, rs1=2, imm=0),                 # lb x0: no effect
+        _addi(31, 31, 1), enc(OP_BRANCH, funct3=4, rs1=31, rs2=2, imm=-44),
+        0,
+    ]
+    ref, sim = _both(_hex(words))
+    ref.run()
+    BlockJIT(sim).run()
+    assert _state(sim) == _state(ref)
+    assert ref.rf[3] == 0xFFFF_FF87 and ref.rf[6] == 0x6543
+
+
+def test_out_of_range_load_faults_on_the_same_instruction():
+    words = [_addi(1, 0, 0x7FC), _addi(2, 2, 1),
+             enc(OP_LOAD, rd=3, funct3=4, rs1=1, imm=0),             # lbu 0x7FC + ...
+             _addi(1, 1, 0x100),
+             enc(OP_BRANCH, funct3=1, rs1=2, rs2=0, imm=-12), 0]
+    ref, sim = _both(_hex(words), mem_size=0x900)
+    with pytest.raises(ValueError):
+        ref.run()
+    with pytest.raises(ValueError):
+        BlockJIT(sim).run()
+    assert _state(sim) == _state(ref)
+
+
+def test_uart_mmio_in_a_loop():
+    words = [_addi(1, 0, 0x400), _addi(2, 0, 0x41), _addi(5, 0, 20),
+             enc(OP_STORE, funct3=0, rs1=1, rs2=2, imm=0),           # sb to TX
+             enc(OP_STORE, funct3=0, rs1=1, rs2=2, imm=0),           # dropped: busy
+             enc(OP_LOAD, rd=3, funct3=2, rs1=1, imm=4),             # lw RX
+             enc(OP_LOAD, rd=4, funct3=4, rs1=1, imm=4),             # lbu RX
+             _addi(2, 2, 1), _addi(5, 5, -1),
+             enc(OP_BRANCH, funct3=1, rs1=5, rs2=0, imm=-24), 0]
+    ref, sim = _both(_hex(words))
+    ref.uart.tx_busy = sim.uart.tx_busy = 10
+    ref.run()
+    BlockJIT(sim).run()
+    assert _state(sim) == _state(ref)
+    assert ref.uart.tx_dropped and ref.mmio_reads == 40
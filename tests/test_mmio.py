@@ -0,0 +1,153 @@
+"""
+UARTDevice against the behaviour of ``UART_Peripheral.v``: registered RX
+reads, RX arrival and overflow, TX busy time, and the RX source's
+descriptor mode.
+
+    cd tests && python -m pytest -q test_mmio.py
+"""
+
+from __future__ import annotations
+
+import io
+import os
+
+import pytest
+
+from Helper_ISS import RV32ISim
+from Helper_MMIO import DeviceBus, UARTDevice, tx_busy_cycles
+from Helper_lib import RISCVInstruction
+
+EMPTY = UARTDevice.EMPTY
+TX, RX = 0, 4
+
+
+def _pop(uart: UARTDevice, n: int, now: int = 0) -> list[int]:
+    return [uart.read(RX, 4, now) for _ in range(n)]
+
+
+# --------------------------------------------------------------------------- #
+#  RX                                                                         #
+# --------------------------------------------------------------------------- #
+def test_registered_read_lags_the_pop_by_one():
+    uart = UARTDevice(io.BytesIO(b"abc"))
+    assert _pop(uart, 5) == [EMPTY, ord("a"), ord("b"), ord("c"), EMPTY]
+
+
+def test_unregistered_read_returns_the_popped_byte():
+    uart = UARTDevice(io.BytesIO(b"abc"), registered_read=False)
+    assert _pop(uart, 4) == [ord("a"), ord("b"), ord("c"), EMPTY]
+
+
+def test_bytes_arriving_while_the_fifo_is_full_are_dropped():
+    data = bytes(range(40))
+    uart = UARTDevice(io.BytesIO(data), rx_interval=10, registered_read=False)
+    assert uart.read(RX, 4, 5) == EMPTY                  # nothing has arrived yet
+    # 20 bytes arrived by cycle 200, the FIFO kept the first 16
+    assert uart.read(RX, 4, 200) == 0
+    assert uart.rx_dropped == 20 - UARTDevice.FIFO_DEPTH
+    assert _pop(uart, 15, 200) == list(range(1, 16))
+    assert uart.fifo_empty
+    # the dropped bytes are gone; arrivals continue with the next one
+    assert uart.read(RX, 4, 210) == 20
+
+
+def test_rx_interval_zero_keeps_the_fifo_topped_up():
+    uart = UARTDevice(io.BytesIO(bytes(100)), registered_read=False)
+    assert len(_pop(uart, 100)) == 100
+    assert uart.rx_dropped == 0 and uart.read(RX, 4, 0) == EMPTY
+
+
+# --------------------------------------------------------------------------- #
+#  TX                                                                         #
+# --------------------------------------------------------------------------- #
+def test_store_while_busy_is_dropped():
+    uart = UARTDevice(tx_busy=10)
+    for now, byte in ((0, b"A"), (5, b"B"), (10, b"C"), (11, b"D"), (21, b"E")):
+        uart.write(TX, 1, byte[0], now)
+    assert bytes(uart.transmitted) == b"AD"
+    assert uart.tx_dropped == 3
+
+
+def test_tx_busy_zero_accepts_every_byte():
+    uart = UARTDevice(tx_busy=0)
+    for byte in b"hello":
+        uart.write(TX, 1, byte, 7)
+    assert bytes(uart.transmitted) == b"hello" and uart.tx_dropped == 0
+
+
+def test_default_busy_time_is_the_rtls():
+    assert UARTDevice().tx_busy == tx_busy_cycles(100_000_000, 9_600) == 11 * 10_417
+
+
+def test_lines_are_flushed_to_the_stream():
+    out = io.BytesIO()
+    uart = UARTDevice(tx_busy=0, tx_stream=out)
+    for byte in b"ab\ncd":
+        uart.write(TX, 1, byte, 0)
+    assert out.getvalue() == b"ab\n"
+    uart.flush()
+    assert out.getvalue() == b"ab\ncd"
+
+
+@pytest.mark.parametrize("tx_busy, sent", [(None, b"A"), (0, b"AB")])
+def test_back_to_back_stores_from_a_program(tx_busy, sent):
+    enc = RISCVInstruction.encode
+    words = [enc(0x13, rd=1, imm=0x400), enc(0x13, rd=2, imm=ord("A")),
+             enc(0x23, funct3=0, rs1=1, rs2=2),                 # sb x2, 0(x1)
+             enc(0x13, rd=2, rs1=2, imm=1),
+             enc(0x23, funct3=0, rs1=1, rs2=2), 0]
+    bus = DeviceBus()
+    bus.register(UARTDevice(tx_busy=tx_busy), RV32ISim.UART_BASE)
+    sim = RV32ISim([w.to_bytes(4, "little").hex() for w in words], bus=bus)
+    sim.run()
+    assert bytes(sim.uart_tx) == sent
+    assert sim.uart.tx_dropped == 2 - len(sent)
+
+
+# --------------------------------------------------------------------------- #
+#  RX source                                                                  #
+# --------------------------------------------------------------------------- #
+def test_close_restores_the_blocking_mode_of_a_pipe():
+    r, w = os.pipe()
+    try:
+        with os.fdopen(r, "rb", buffering=0, closefd=False) as src:
+            uart = UARTDevice(src, registered_read=False)
+            assert not os.get_blocking(r)
+            assert uart.read(RX, 4, 0) == EMPTY                 # nothing written: no stall
+            os.write(w, b"z")
+            assert uart.read(RX, 4, 1) == ord("z")
+            uart.close()
+            assert os.get_blocking(r)
+            assert uart.read(RX, 4, 2) == EMPTY                 # no input after close
+    finally:
+        os.close(r)
+        os.close(w)
+
+
+def test_a_non_blocking_source_is_left_alone():
+    r, w = os.pipe()
+    os.set_blocking(r, False)
+    try:
+        with os.fdopen(r, "rb", buffering=0, closefd=False) as src:
+            UARTDevice(src).close()
+            assert not os.get_blocking(r)
+    finally:
+        os.close(r)
+        os.close(w)
+
+
+def test_close_closes_a_file_it_opened(tmp_path):
+    path = tmp_path / "rx.bin"
+    path.write_bytes(b"q")
+    uart = UARTDevice(str(path), registered_read=False)
+    src = uart._rx
+    assert uart.read(RX, 4, 0) == ord("q")
+    uart.close()
+    assert src.closed
+
+
+def test_bus_rejects_overlapping_devices():
+    bus = DeviceBus()
+    bus.register(UARTDevice(), 0x400)
+    with pytest.raises(ValueError, match="already mapped"):
+        bus.register(UARTDevice(), 0x404)
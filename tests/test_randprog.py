@@ -0,0 +1,101 @@
+"""
+The contract of ``Helper_RandProg``: every program fits the 64-word
+instruction memory, halts, and never reads data memory it has not written.
+The same programs also cross-check ``BlockJIT`` against the interpreter.
+
+    cd tests && python -m pytest -q test_randprog.py
+"""
+
+from __future__ import annotations
+
+import random
+from collections import Counter
+
+import pytest
+
+from Helper_Coverage import Coverage
+from Helper_ISS import RV32ISim
+from Helper_JIT import BlockJIT
+from Helper_RandProg import ProgramGenerator, to_hex_lines
+from Helper_lib import ByteAddressableMemory
+
+SEED = 16
+
+
+class _WatchedMemory(ByteAddressableMemory):
+    """Records every load of a byte that no store has written yet."""
+
+    __slots__ = ("written", "unwritten_reads")
+
+    def __init__(self, size: int):
+        super().__init__(size)
+        self.written: set[int] = set()
+        self.unwritten_reads: list[int] = []
+
+    def _read(self, address: int, size: int) -> None:
+        self.unwritten_reads += [a for a in range(address, address + size)
+                                 if a not in self.written]
+
+    def read_bytes(self, address, size):
+        self._read(address, size)
+        return super().read_bytes(address, size)
+
+    def read_word(self, address):
+        self._read(address, 4)
+        return super().read_word(address)
+
+    def write_bytes(self, address, data):
+        self.written.update(range(address, address + len(data)))
+        super().write_bytes(address, data)
+
+    def write_word(self, address, data):
+        self.written.update(range(address, address + 4))
+        super().write_word(address, data)
+
+
+def _words(index: int) -> list[int]:
+    return ProgramGenerator(random.Random(f"{SEED}:{index}")).generate()
+
+
+@pytest.mark.parametrize("index", range(200))
+def test_program_contract(index):
+    words = _words(index)
+    assert len(words) <= 64 and words[-1] == 0
+
+    mem = _WatchedMemory(RV32ISim.MEM_SIZE)
+    sim = RV32ISim(to_hex_lines(words), mem=mem)
+    sim.run(100_000)
+    assert sim.halted()
+    assert sim.pc == 4 * (len(words) - 1)             # through the final zero word
+    assert mem.unwritten_reads == []
+    assert sim.mmio_reads == sim.mmio_writes == 0     # UART window is avoided
+
+
+def test_programs_depend_only_on_seed_and_index():
+    assert _words(7) == _words(7)
+    assert _words(7) != _words(8)
+
+
+def test_word_budget_is_honoured():
+    for index in range(20):
+        words = ProgramGenerator(random.Random(index), words=16).generate()
+        assert len(words) <= 16 and words[-1] == 0
+
+
+def test_sltiu_immediates_are_never_negative():
+    bins: Counter[str] = Counter()
+    for index in range(200):
+        cov = Coverage(RV32ISim(to_hex_lines(_words(index))))
+        cov.collect()
+        bins.update(cov.bins())
+    assert bins["op:sltiu"] and not bins["imm:sltiu:neg"]
+
+
+@pytest.mark.parametrize("index", range(0, 200, 4))
+def test_jit_matches_the_interpreter(index):
+    lines = to_hex_lines(_words(index))
+    ref, sim = RV32ISim(lines), RV32ISim(lines)
+    ref.run()
+    BlockJIT(sim).run()
+    assert (sim.pc, sim.retired, sim.rf, sim.mem.dump()) == \
+           (ref.pc, ref.retired, ref.rf, ref.mem.dump())
@@ -0,0 +1,108 @@
+"""
+Golden traces: TraceWriter/TraceReader round trips, the cache key and
+``ensure_trace``.
+
+    cd tests && python -m pytest -q test_trace.py
+"""
+
+from __future__ import annotations
+
+import random
+import struct
+from pathlib import Path
+
+import pytest
+
+import Helper_Trace
+from Helper_ISS import RV32ISim
+from Helper_Trace import (
+    MAGIC, VERSION, TraceReader, TraceWriter, ensure_trace, image_hash, trace_key,
+)
+from Helper_lib import read_file_to_list
+
+CHUNK   = 4096
+DIGEST  = "ab" * 32
+PROGRAM = read_file_to_list(Path(__file__).with_name("Instructions.hex"))
+PADDING = ["00 00 00 00"] * 8
+
+
+def _records(n: int, seed: int = 0) -> list[tuple[int, int, int]]:
+    rng = random.Random(seed)
+    return [(rng.getrandbits(32), rng.randrange(32), rng.getrandbits(32)) for _ in range(n)]
+
+
+# --------------------------------------------------------------------------- #
+#  File format                                                                #
+# --------------------------------------------------------------------------- #
+@pytest.mark.parametrize("n", [0, 1, CHUNK - 1, CHUNK, CHUNK + 1, 2 * CHUNK + 3])
+def test_round_trip_across_chunk_boundaries(tmp_path, n):
+    path = tmp_path / "t.rvgt"
+    records = _records(n, seed=n)
+    with TraceWriter(path, DIGEST) as tw:
+        for rec in records:
+            tw.append(*rec)
+    assert tw.count == n
+
+    reader = TraceReader(path)
+    assert reader.digest == DIGEST
+    assert len(reader) == n
+    assert list(reader) == records
+
+
+@pytest.mark.parametrize("magic, version, rec_size", [
+    (b"RVGX", VERSION, 9),
+    (MAGIC, VERSION + 1, 9),
+    (MAGIC, VERSION, 8),
+])
+def test_reader_rejects_a_wrong_header(tmp_path, magic, version, rec_size):
+    path = tmp_path / "bad.rvgt"
+    path.write_bytes(struct.pack("<4sHH32s", magic, version, rec_size, bytes(32)))
+    with pytest.raises(ValueError, match="not a v1 golden trace"):
+        TraceReader(path)
+
+
+# --------------------------------------------------------------------------- #
+#  Cache key                                                                  #
+# --------------------------------------------------------------------------- #
+def test_key_ignores_trailing_zero_padding():
+    assert image_hash(PROGRAM + PADDING) == image_hash(PROGRAM)
+    assert trace_key(PROGRAM + PADDING) == trace_key(PROGRAM)
+    assert trace_key(["13 00 00 00"] + PROGRAM[1:]) != trace_key(PROGRAM)
+
+
+def test_key_changes_with_mem_size():
+    assert trace_key(PROGRAM, 1024) != trace_key(PROGRAM, 2048)
+    assert trace_key(PROGRAM) == trace_key(PROGRAM, RV32ISim.MEM_SIZE)
+
+
+def test_key_changes_with_the_model(monkeypatch):
+    before = trace_key(PROGRAM)
+    Helper_Trace.model_hash.cache_clear()
+    monkeypatch.setattr(Helper_Trace, "VERSION", VERSION + 1)
+    try:
+        assert trace_key(PROGRAM) != before
+    finally:
+        Helper_Trace.model_hash.cache_clear()
+
+
+# --------------------------------------------------------------------------- #
+#  ensure_trace                                                               #
+# --------------------------------------------------------------------------- #
+def test_ensure_trace_records_the_model_once(tmp_path, monkeypatch):
+    path = ensure_trace(PROGRAM, tmp_path)
+    assert path.name == f"{trace_key(PROGRAM)}.rvgt"
+
+    sim, expected = RV32ISim(PROGRAM), []
+    while not sim.halted():
+        rd = sim.written[sim.pc >> 2]
+        sim.step()
+        expected.append((sim.pc, rd, sim.rf[rd]))
+    reader = TraceReader(path)
+    assert reader.digest == image_hash(PROGRAM)
+    assert list(reader) == expected
+
+    # a padded image hits the same file, without recording again
+    monkeypatch.setattr(Helper_Trace, "record_trace",
+                        lambda *a, **k: pytest.fail("trace recorded twice"))
+    assert ensure_trace(PROGRAM + PADDING, tmp_path) == path
+    assert [p.name for p in tmp_path.iterdir()] == [path.name]
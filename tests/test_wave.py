@@ -0,0 +1,126 @@
+"""
+Columnar wave files: WaveWriter/WaveReader round trips over several
+chunks, cycle-range windows and ``where()`` queries.
+
+    cd tests && python -m pytest -q test_wave.py
+"""
+
+from __future__ import annotations
+
+import random
+
+import pytest
+
+pytest.importorskip("numpy")                    # Helper_Wave needs NumPy
+
+from Helper_Wave import WaveReader, WaveWriter, main, parse_condition  # noqa: E402
+
+COLUMNS = [("PC", 32), ("PCSrc", 1), ("ALUResult", 32), ("Imm", 12), ("Wide", 40)]
+ROWS    = 100
+CHUNK   = 7                                     # ROWS is not a multiple of it
+
+
+def _rows(seed: int = 0) -> list[tuple[int, list[int]]]:
+    """Cycles 3, 5, 7, ... (gaps on purpose) with random values of each width."""
+    rng = random.Random(seed)
+    return [(3 + 2 * i, [rng.getrandbits(bits) for _, bits in COLUMNS]) for i in range(ROWS)]
+
+
+@pytest.fixture
+def wave(tmp_path):
+    rows = _rows()
+    with WaveWriter(tmp_path / "wave", COLUMNS, chunk=CHUNK) as ww:
+        for cycle, values in rows:
+            ww.append(cycle, values)
+    return WaveReader(tmp_path / "wave"), rows
+
+
+def _expected(rows, pred, first=None, last=None) -> list[int]:
+    return [c for c, v in rows
+            if (first is None or c >= first) and (last is None or c <= last)
+            and pred(dict(zip((n for n, _ in COLUMNS), v)))]
+
+
+# --------------------------------------------------------------------------- #
+#  Round trip                                                                 #
+# --------------------------------------------------------------------------- #
+def test_round_trip_over_several_chunks(wave):
+    reader, rows = wave
+    assert len(reader) == ROWS
+    assert reader.column("cycle").tolist() == [c for c, _ in rows]
+    for j, (name, _) in enumerate(COLUMNS):
+        assert reader.column(name).tolist() == [v[j] for _, v in rows]
+    assert [reader.dtypes[n].itemsize for n, _ in COLUMNS] == [4, 1, 4, 2, 8]
+
+
+def test_rows_are_readable_before_close(tmp_path):
+    ww = WaveWriter(tmp_path / "wave", COLUMNS, chunk=CHUNK)
+    for cycle, values in _rows()[:20]:
+        ww.append(cycle, values)
+    assert len(WaveReader(tmp_path / "wave")) == 2 * CHUNK      # flushed chunks only
+    ww.close()
+    assert len(WaveReader(tmp_path / "wave")) == 20
+
+
+def test_a_column_written_further_is_cut_to_the_shortest(tmp_path, wave):
+    reader, _ = wave
+    with open(tmp_path / "wave" / "PC.bin", "ab") as fh:
+        fh.write(bytes(4 * 3))
+    assert len(WaveReader(tmp_path / "wave")) == len(reader)
+
+
+def test_writer_rejects_bad_input(tmp_path):
+    with pytest.raises(ValueError, match="duplicate"):
+        WaveWriter(tmp_path / "a", [("PC", 32), ("PC", 32)])
+    with pytest.raises(ValueError, match="not an identifier"):
+        WaveWriter(tmp_path / "b", [("a.b", 1)])
+    with pytest.raises(ValueError, match="not in 1..64"):
+        WaveWriter(tmp_path / "c", [("X", 65)])
+    ww = WaveWriter(tmp_path / "d", [("PC", 32)])
+    ww.append(0, [1, 2])
+    with pytest.raises(ValueError, match="wrong number of values"):
+        ww.flush()
+
+
+# --------------------------------------------------------------------------- #
+#  Queries                                                                    #
+# --------------------------------------------------------------------------- #
+@pytest.mark.parametrize("first, last", [(None, None), (3, 3), (4, 4), (50, 120),
+                                         (None, 10), (190, None), (300, 400)])
+def test_window_is_inclusive(wave, first, last):
+    reader, rows = wave
+    got = reader.window(first, last, ["cycle", "PC"])
+    want = [(c, v[0]) for c, v in rows
+            if (first is None or c >= first) and (last is None or c <= last)]
+    assert list(zip(got["cycle"].tolist(), got["PC"].tolist())) == want
+
+
+@pytest.mark.parametrize("cond, pred", [
+    ("PCSrc == 1", lambda r: r["PCSrc"] == 1),
+    ("PCSrc == 1 and ALUResult > 0x80000000",
+     lambda r: r["PCSrc"] == 1 and r["ALUResult"] > 0x8000_0000),
+    ("Imm < 100 or Wide >= 0xF0_0000_0000",
+     lambda r: r["Imm"] < 100 or r["Wide"] >= 0xF0_0000_0000),
+    ("PCSrc != 0 and Imm <= 2047 || PC < 0x1000_0000",
+     lambda r: (r["PCSrc"] != 0 and r["Imm"] <= 2047) or r["PC"] < 0x1000_0000),
+])
+@pytest.mark.parametrize("first, last", [(None, None), (40, 150)])
+def test_where(wave, cond, pred, first, last):
+    reader, rows = wave
+    want = _expected(rows, pred, first, last)
+    assert want                                 # the query is not trivially empty
+    assert reader.where(cond, first, last).tolist() == want
+
+
+def test_parse_condition():
+    assert parse_condition("A == 1 and B > 0x400 or C != 0b10") == \
+        [[("A", "==", 1), ("B", ">", 0x400)], [("C", "!=", 2)]]
+    with pytest.raises(ValueError, match="cannot parse"):
+        parse_condition("A = 1")
+
+
+def test_cli_counts_matching_rows(tmp_path, wave, capsys):
+    reader, rows = wave
+    assert main([str(tmp_path / "wave"), "--where", "PCSrc == 1",
+                 "--cycles", "10:", "--count"]) == 0
+    assert int(capsys.readouterr().out) == len(_expected(rows, lambda r: r["PCSrc"] == 1, 10))